@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Compiled forest benchmark
+
+Compares sklearn RandomForestRegressor (joblib artifact) against the flat
+NumPy forest produced by forest_compiler.py: artifact load time and
+scale + predict latency over a range of batch sizes. It also checks
+that both give exactly the same predictions.
+
+Usage:
+    python forest_compiler.py --models-dir models
+    python benchmarks/bench_flat_forest.py --models-dir models --model real_trochanter_rf_model
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from forest_compiler import flat_path_for, load_flat_forest
+
+
+def best_of(func, repeats: int) -> float:
+    """Best wall-clock time of `repeats` calls, in seconds."""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def load_sklearn(model_path: Path):
+    """Load a joblib forest and its scaler (separate file or bundled artifact)."""
+    artifact = joblib.load(model_path)
+    if isinstance(artifact, dict):
+        return artifact['model'], artifact['scaler']
+    scaler_path = model_path.with_name(model_path.name.replace("_rf_model.joblib", "_scaler.joblib"))
+    return artifact, joblib.load(scaler_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sklearn vs compiled flat forest inference")
+    parser.add_argument('--models-dir', default="models", help="Directory with trained model artifacts")
+    parser.add_argument('--model', default="real_trochanter_rf_model", help="Model file stem to benchmark")
+    parser.add_argument('--repeats', type=int, default=20, help="Timing repeats (best-of)")
+    args = parser.parse_args()
+
+    model_path = Path(args.models_dir) / f"{args.model}.joblib"
+    flat_path = flat_path_for(model_path)
+    if not flat_path.exists():
+        sys.exit(f"Compiled forest {flat_path} not found. Run forest_compiler.py first.")
+
+    load_sklearn_s = best_of(lambda: load_sklearn(model_path), max(3, args.repeats // 4))
+    load_flat_s = best_of(lambda: load_flat_forest(flat_path), max(3, args.repeats // 4))
+    model, scaler = load_sklearn(model_path)
+    flat_model, flat_scaler, _ = load_flat_forest(flat_path)
+
+    print(f"Model: {model_path.name} ({flat_model.n_estimators} trees, depth {flat_model.max_depth})")
+    print(f"Load:    sklearn {load_sklearn_s * 1000:8.2f} ms   flat {load_flat_s * 1000:8.2f} ms   "
+          f"speedup {load_sklearn_s / load_flat_s:6.1f}x")
+    print()
+    print(f"{'batch':>8}{'sklearn':>14}{'flat':>14}{'speedup':>10}{'exact':>8}")
+
+    rng = np.random.default_rng(42)
+    for batch_size in [1, 10, 100, 1000, 10000, 50000]:
+        X = np.column_stack([
+            rng.integers(25, 61, batch_size),
+            rng.integers(1, 1001, batch_size),
+            rng.integers(0, 2, batch_size),
+            rng.uniform(150, 200, batch_size),
+            rng.uniform(50, 110, batch_size),
+            np.zeros(batch_size)
+        ]).astype(float)
+        X[:, 5] = X[:, 4] / (X[:, 3] / 100) ** 2
+
+        repeats = args.repeats if batch_size <= 1000 else max(3, args.repeats // 5)
+        sklearn_s = best_of(lambda: model.predict(scaler.transform(X)), repeats)
+        flat_s = best_of(lambda: flat_model.predict(flat_scaler.transform(X)), repeats)
+
+        # sklearn sums trees in estimator order only with n_jobs=1
+        exact = np.array_equal(model.set_params(n_jobs=1).predict(scaler.transform(X)),
+                               flat_model.predict(flat_scaler.transform(X)))
+        print(f"{batch_size:>8}{sklearn_s * 1000:>12.3f}ms{flat_s * 1000:>12.3f}ms"
+              f"{sklearn_s / flat_s:>9.1f}x{str(exact):>8}")
+        model.set_params(n_jobs=-1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Keyword flag benchmark for extract_physiological_features
+
+Times the single-pass regex keyword engine (CrewHealthDataProcessor._keyword_flags)
+on a synthetic crew health frame and compares it with the legacy row-wise
+apply(str(row)) detection, which is run on a smaller sample and extrapolated
+because it takes minutes at 1M rows. It also checks that the engine agrees
+with one str.contains pass per keyword group.
+
+Usage:
+    python benchmarks/bench_keyword_flags.py --rows 1000000 --legacy-rows 20000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from src.data_preprocessing import CrewHealthDataProcessor, PHYSIOLOGICAL_KEYWORDS
+
+MEASUREMENT_TYPES = ['Bone mineral density (DXA)', 'Muscle strength test', 'Blood pressure',
+                     'Heart rate variability', 'Vision assessment', 'Sleep quality survey']
+NOTES = ['nominal', 'calcium supplement', 'reduced exercise', 'atrophy observed', 'no comment', '']
+
+
+def make_frame(n_rows: int, seed: int = 42) -> pd.DataFrame:
+    """Synthetic crew health records with a few text and numeric columns."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'crew_id': np.char.add('ISS_', rng.integers(0, 500, n_rows).astype(str)),
+        'measurement_type': rng.choice(MEASUREMENT_TYPES, n_rows),
+        'notes': rng.choice(NOTES, n_rows),
+        'crew_age': rng.integers(25, 56, n_rows),
+        'value': rng.normal(0, 1, n_rows)
+    })
+
+
+def legacy_flags(df: pd.DataFrame) -> pd.DataFrame:
+    """Previous implementation: three row-wise passes over str(row)."""
+    return pd.DataFrame({
+        flag: df.apply(lambda row: any(keyword in str(row).lower() for keyword in keywords), axis=1)
+        for flag, keywords in PHYSIOLOGICAL_KEYWORDS.items()
+    })
+
+
+def contains_flags(df: pd.DataFrame) -> pd.DataFrame:
+    """Reference: one case-insensitive str.contains pass per group over the text columns."""
+    text = df.select_dtypes(include=['object']).astype(str).agg(' '.join, axis=1)
+    return pd.DataFrame({
+        flag: text.str.contains('|'.join(keywords), case=False, regex=True)
+        for flag, keywords in PHYSIOLOGICAL_KEYWORDS.items()
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark physiological keyword flagging")
+    parser.add_argument('--rows', type=int, default=1_000_000, help="Rows for the vectorized engine")
+    parser.add_argument('--legacy-rows', type=int, default=20_000, help="Rows for the legacy row-wise apply")
+    args = parser.parse_args()
+
+    processor = CrewHealthDataProcessor()
+
+    df = make_frame(args.rows)
+    start = time.perf_counter()
+    flags = processor._keyword_flags(df)
+    engine_s = time.perf_counter() - start
+
+    sample = df.head(args.legacy_rows)
+    start = time.perf_counter()
+    legacy_flags(sample)
+    legacy_s = time.perf_counter() - start
+    legacy_extrapolated_s = legacy_s * args.rows / len(sample)
+
+    agrees = flags.head(args.legacy_rows).equals(contains_flags(sample))
+
+    print(f"Vectorized engine:  {args.rows:>9,} rows  {engine_s:8.2f} s")
+    print(f"Legacy apply:       {len(sample):>9,} rows  {legacy_s:8.2f} s  "
+          f"(~{legacy_extrapolated_s:,.0f} s extrapolated to {args.rows:,})")
+    print(f"Speedup:            ~{legacy_extrapolated_s / engine_s:,.0f}x")
+    print(f"Matches str.contains reference: {agrees}")
+    print(f"Flag rates: {flags.mean().round(3).to_dict()}")
+
+
+if __name__ == "__main__":
+    main()
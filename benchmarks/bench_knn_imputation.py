@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+KNN imputation benchmark for handle_missing_values_advanced
+
+Times the previous per-column KNNImputer refits (one full fit per column with
+missing values) against the joint pass (CrewHealthDataProcessor._knn_impute)
+with exact KNNImputer distances and with the approximate KD-tree index, and
+reports how far the tree results are from the exact ones.
+
+Usage:
+    python benchmarks/bench_knn_imputation.py --rows 2000 10000 --columns 8
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.impute import KNNImputer
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from src.data_preprocessing import CrewHealthDataProcessor
+
+
+def make_frame(n_rows: int, n_columns: int, missing_rate: float = 0.05, seed: int = 42) -> pd.DataFrame:
+    """Correlated synthetic measurements with missing values scattered in every column."""
+    rng = np.random.default_rng(seed)
+    latent = rng.normal(size=(n_rows, 2))
+    values = latent @ rng.normal(size=(2, n_columns)) + rng.normal(0, 0.3, (n_rows, n_columns))
+    values[rng.random(values.shape) < missing_rate] = np.nan
+    return pd.DataFrame(values, columns=[f"measurement_{i}" for i in range(n_columns)])
+
+
+def per_column_knn(df: pd.DataFrame) -> pd.DataFrame:
+    """Previous implementation: one KNNImputer fit per column, keeping only column 0."""
+    df_imputed = df.copy()
+    for col in df.columns:
+        if df_imputed[col].isnull().any():
+            col_data = df_imputed[[col] + [c for c in df.columns if c != col]]
+            df_imputed[col] = KNNImputer(n_neighbors=5).fit_transform(col_data)[:, 0]
+    return df_imputed
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-column vs joint KNN imputation")
+    parser.add_argument('--rows', type=int, nargs='+', default=[2_000, 10_000], help="Row counts to benchmark")
+    parser.add_argument('--columns', type=int, default=8, help="Numerical columns with missing values")
+    parser.add_argument('--tree-rows', type=int, default=200_000, help="Extra row count run with the tree index only")
+    args = parser.parse_args()
+
+    exact = CrewHealthDataProcessor(knn_algorithm='exact')
+    tree = CrewHealthDataProcessor(knn_algorithm='tree')
+
+    print(f"{'rows':>9}  {'per-column':>11}  {'joint exact':>11}  {'joint tree':>10}  {'speedup':>8}  {'tree MAE':>8}")
+    for n_rows in args.rows:
+        df = make_frame(n_rows, args.columns)
+        columns = df.columns.tolist()
+        _, legacy_s = timed(per_column_knn, df)
+        exact_result, exact_s = timed(exact._knn_impute, df, columns)
+        tree_result, tree_s = timed(tree._knn_impute, df, columns)
+
+        missing = df.isnull().to_numpy()
+        tree_mae = np.abs(tree_result.to_numpy() - exact_result.to_numpy())[missing].mean()
+        print(f"{n_rows:>9,}  {legacy_s:>10.2f}s  {exact_s:>10.2f}s  {tree_s:>9.2f}s  "
+              f"{legacy_s / min(exact_s, tree_s):>7.1f}x  {tree_mae:>8.3f}")
+
+    df = make_frame(args.tree_rows, args.columns)
+    _, tree_s = timed(tree._knn_impute, df, df.columns.tolist())
+    print(f"{args.tree_rows:>9,}  {'-':>11}  {'-':>11}  {tree_s:>9.2f}s")
+
+
+if __name__ == "__main__":
+    main()
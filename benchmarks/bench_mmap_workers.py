@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Multi-worker model memory benchmark
+
+Starts N worker processes that each load every bone site model and serve
+one prediction, then reports the memory the models add per worker. It
+compares sklearn joblib artifacts, compiled forests loaded into private
+memory, and compiled forests memory-mapped read-only (the default).
+
+Memory is measured as PSS (proportional set size, Linux /proc/self/smaps_rollup):
+pages shared by k processes count 1/k towards each, so the PSS summed over all
+workers is the real physical footprint. With mmap the total stays flat as
+workers are added; with private copies it grows linearly.
+
+Usage:
+    python forest_compiler.py --models-dir models
+    python benchmarks/bench_mmap_workers.py --models-dir models --workers 1 2 4 8
+"""
+
+import argparse
+import multiprocessing as mp
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.append(str(REPO_ROOT))
+
+MODES = {
+    'sklearn joblib': {'use_flat_forests': False},
+    'compiled, private': {'use_flat_forests': True, 'mmap_mode': None},
+    'compiled, mmap': {'use_flat_forests': True, 'mmap_mode': 'r'},
+}
+
+
+def read_pss_kb() -> int:
+    """Proportional set size of the current process in kB."""
+    with open('/proc/self/smaps_rollup') as f:
+        for line in f:
+            if line.startswith('Pss:'):
+                return int(line.split()[1])
+    raise RuntimeError("Pss not reported by /proc/self/smaps_rollup")
+
+
+def worker(models_dir, options, loaded_barrier, measured_barrier, results):
+    # Import everything unpickling needs first, so the baseline excludes library pages
+    import sklearn.ensemble  # noqa: F401
+    import sklearn.preprocessing  # noqa: F401
+    from ml_predictor import RealNASAMLPredictor
+
+    baseline_kb = read_pss_kb()
+    predictor = RealNASAMLPredictor(models_dir=models_dir, lazy=False, **options)
+    predictor.predict_bone_loss(40, 180, 'Male', 175.0, 77.0)
+
+    # Measure only once every worker has mapped the models, so sharing is visible
+    loaded_barrier.wait()
+    results.append(read_pss_kb() - baseline_kb)
+    measured_barrier.wait()
+
+
+def run_mode(models_dir: str, options: dict, n_workers: int) -> list:
+    ctx = mp.get_context('spawn')
+    with ctx.Manager() as manager:
+        results = manager.list()
+        loaded_barrier = ctx.Barrier(n_workers)
+        measured_barrier = ctx.Barrier(n_workers)
+        processes = [ctx.Process(target=worker, args=(models_dir, options, loaded_barrier,
+                                                      measured_barrier, results))
+                     for _ in range(n_workers)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        return list(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark model memory across worker processes")
+    parser.add_argument('--models-dir', default="models", help="Directory with trained model artifacts")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8], help="Worker counts to test")
+    args = parser.parse_args()
+
+    if not Path('/proc/self/smaps_rollup').exists():
+        sys.exit("This benchmark needs Linux /proc/self/smaps_rollup")
+
+    models_dir = str(Path(args.models_dir).resolve())
+    print(f"{'mode':<20}{'workers':>8}{'model PSS/worker':>20}{'model PSS total':>18}")
+    for name, options in MODES.items():
+        for n_workers in args.workers:
+            deltas = run_mode(models_dir, options, n_workers)
+            total_kb = sum(deltas)
+            print(f"{name:<20}{n_workers:>8}{total_kb / n_workers / 1024:>17.2f} MB{total_kb / 1024:>15.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
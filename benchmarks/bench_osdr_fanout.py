@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+OSDR search fan-out benchmark for NASALSDAClient.get_crew_health_data
+
+Starts a local stub of the OSDR search endpoint that answers every query after a
+configurable latency, then times the sequential keyword loop (one worker, one
+request every 0.5 s as with the previous fixed sleeps) against the concurrent
+thread-pool fan-out, and checks that both collect the same studies in the same
+order. No request leaves the machine.
+
+Usage:
+    python benchmarks/bench_osdr_fanout.py --latency 1.0 --workers 4 11
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from src.data_acquisition import NASALSDAClient
+
+
+class StubSearchHandler(BaseHTTPRequestHandler):
+    """Answers /search with a few deterministic hits per keyword after a fixed delay."""
+
+    latency = 1.0
+    hits_per_query = 5
+
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query).get('q', [''])[0]
+        time.sleep(self.latency)
+        body = json.dumps({'hits': {'hits': [
+            {'_id': f"OSD-{query}-{i}", '_source': {'title': f"{query} study {i}", 'organism': 'Homo sapiens'}}
+            for i in range(self.hits_per_query)
+        ]}}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server(latency: float) -> ThreadingHTTPServer:
+    """Serve the stub on a free localhost port in a daemon thread."""
+    StubSearchHandler.latency = latency
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubSearchHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def fetch_studies(client: NASALSDAClient) -> list:
+    """Run the keyword searches of get_crew_health_data and return the raw study ids."""
+    captured = []
+    client.convert_studies_to_crew_metrics = lambda studies_df: captured.append(studies_df) or studies_df
+    client.get_crew_health_data()
+    return captured[0]['study_id'].tolist() if captured else []
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sequential vs concurrent OSDR keyword searches")
+    parser.add_argument('--latency', type=float, default=1.0, help="Stub server response time in seconds")
+    parser.add_argument('--workers', type=int, nargs='+', default=[4, 11], help="Concurrent worker counts")
+    parser.add_argument('--rate', type=float, default=2.0, help="Token bucket requests per second")
+    parser.add_argument('--burst', type=int, default=4, help="Token bucket capacity")
+    args = parser.parse_args()
+
+    server = start_stub_server(args.latency)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/search"
+
+    try:
+        sequential = NASALSDAClient(base_url=base_url, max_workers=1, requests_per_second=2.0, burst=1,
+                                    cache_dir=None)
+        start = time.perf_counter()
+        reference = fetch_studies(sequential)
+        sequential_s = time.perf_counter() - start
+        print(f"{'workers':>8}  {'rate':>6}  {'burst':>5}  {'seconds':>8}  {'speedup':>8}  same studies")
+        print(f"{1:>8}  {2.0:>6.1f}  {1:>5}  {sequential_s:>8.2f}  {1.0:>7.1f}x  {len(reference)} studies")
+
+        for workers in args.workers:
+            client = NASALSDAClient(base_url=base_url, max_workers=workers,
+                                    requests_per_second=args.rate, burst=args.burst, cache_dir=None)
+            start = time.perf_counter()
+            studies = fetch_studies(client)
+            elapsed = time.perf_counter() - start
+            print(f"{workers:>8}  {args.rate:>6.1f}  {args.burst:>5}  {elapsed:>8.2f}  "
+                  f"{sequential_s / elapsed:>7.1f}x  {studies == reference}")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
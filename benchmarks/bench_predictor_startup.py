@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark for ml_predictor
+
+Measures, in fresh interpreter processes, how long it takes to import
+ml_predictor and to serve the first bone loss prediction, for lazy
+(default) and eager model loading. Each scenario runs in its own process
+so import caches and loaded models never leak between runs.
+
+Usage:
+    python benchmarks/bench_predictor_startup.py --models-dir models --repeats 5
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+SCENARIO_SCRIPT = """
+import json, sys, time
+t0 = time.perf_counter()
+import ml_predictor
+t_import = time.perf_counter() - t0
+
+t1 = time.perf_counter()
+predictor = ml_predictor.RealNASAMLPredictor(models_dir={models_dir!r}, lazy={lazy})
+t_init = time.perf_counter() - t1
+
+t2 = time.perf_counter()
+result = predictor.predict_bone_loss(40, 180, 'Male', 175.0, 77.0, sites={sites!r})
+t_first = time.perf_counter() - t2
+
+t3 = time.perf_counter()
+predictor.predict_bone_loss(40, 180, 'Male', 175.0, 77.0, sites={sites!r})
+t_second = time.perf_counter() - t3
+
+print(json.dumps({{
+    'import_s': t_import,
+    'init_s': t_init,
+    'first_prediction_s': t_first,
+    'second_prediction_s': t_second,
+    'error': result.get('error')
+}}))
+"""
+
+
+def run_scenario(models_dir: str, lazy: bool, sites, repeats: int) -> dict:
+    """Run one scenario `repeats` times in fresh processes and return median timings."""
+    script = SCENARIO_SCRIPT.format(models_dir=models_dir, lazy=lazy, sites=sites)
+    runs = []
+    for _ in range(repeats):
+        completed = subprocess.run(
+            [sys.executable, '-c', script], cwd=REPO_ROOT,
+            capture_output=True, text=True, check=True
+        )
+        runs.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+
+    timings = {key: statistics.median(run[key] for run in runs)
+               for key in ['import_s', 'init_s', 'first_prediction_s', 'second_prediction_s']}
+    timings['time_to_first_prediction_s'] = timings['import_s'] + timings['init_s'] + timings['first_prediction_s']
+    timings['error'] = runs[-1]['error']
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ml_predictor import and first-prediction latency")
+    parser.add_argument('--models-dir', default="models", help="Directory with trained model artifacts")
+    parser.add_argument('--repeats', type=int, default=5, help="Fresh-process runs per scenario")
+    args = parser.parse_args()
+
+    models_dir = str(Path(args.models_dir).resolve())
+    scenarios = {
+        'eager, all sites': (False, None),
+        'lazy, all sites': (True, None),
+        'lazy, one site (trochanter)': (True, ['trochanter']),
+    }
+
+    print(f"{'scenario':<30}{'import':>10}{'init':>10}{'1st pred':>10}{'2nd pred':>10}{'total':>10}")
+    for name, (lazy, sites) in scenarios.items():
+        timings = run_scenario(models_dir, lazy, sites, args.repeats)
+        print(f"{name:<30}"
+              f"{timings['import_s'] * 1000:>8.1f}ms"
+              f"{timings['init_s'] * 1000:>8.1f}ms"
+              f"{timings['first_prediction_s'] * 1000:>8.1f}ms"
+              f"{timings['second_prediction_s'] * 1000:>8.1f}ms"
+              f"{timings['time_to_first_prediction_s'] * 1000:>8.1f}ms")
+        if timings['error']:
+            print(f"  ⚠️ {timings['error']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Synthetic crew record generation benchmark for src.data_acquisition
+
+Times the previous per-record loops of convert_studies_to_crew_metrics and
+create_realistic_baseline_data (scalar np.random calls, plus a fresh 65-value
+pool per mission duration) against the array-at-a-time generators
+generate_study_derived_records and generate_baseline_records. It also checks that
+both produce the same distributions, comparing means, standard deviations and
+quartiles of every numeric column and the category frequencies.
+
+Usage:
+    python benchmarks/bench_record_generation.py --rows 1000000 --legacy-rows 20000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from src.data_acquisition import generate_baseline_records, generate_study_derived_records
+
+
+def legacy_study_derived(n_records: int) -> pd.DataFrame:
+    """Previous convert_studies_to_crew_metrics loop (study_references left out)."""
+    np.random.seed(42)
+    records = []
+    for _ in range(n_records):
+        mission_duration = np.random.choice([
+            *np.random.normal(22, 5, 15).astype(int),
+            *np.random.normal(160, 30, 40).astype(int),
+            *np.random.normal(340, 25, 10).astype(int)
+        ])
+        mission_duration = max(15, min(400, mission_duration))
+        crew_age = max(28, min(60, np.random.normal(40, 8)))
+        exercise_hours = max(10, min(25, np.random.normal(17.5, 3.5)))
+        pre_flight_bone_density = np.random.normal(1.2, 0.15)
+        bone = np.random.normal(-0.015, 0.005) * (mission_duration / 30.0) + (exercise_hours - 17.5) * 0.002
+        muscle = np.random.normal(-0.035, 0.015) * (mission_duration / 30.0) + (exercise_hours - 17.5) * 0.003
+        cardio = np.random.normal(-0.02, 0.01) * (mission_duration / 30.0) + (exercise_hours - 17.5) * 0.001
+        psych = np.random.normal(0, 0.1) * np.sqrt(mission_duration / 100.0)
+        records.append({
+            'mission_duration_days': mission_duration,
+            'crew_age': crew_age,
+            'pre_flight_bone_density': pre_flight_bone_density,
+            'exercise_hours_per_week': exercise_hours,
+            'bone_density_change': bone * 100,
+            'muscle_mass_change': muscle * 100,
+            'cardiovascular_change': cardio * 100,
+            'psychological_score_change': psych * 100,
+            'mission_type': np.random.choice(['ISS_Expedition', 'Shuttle', 'Soyuz'], p=[0.7, 0.2, 0.1]),
+            'crew_role': np.random.choice(['Commander', 'Flight_Engineer', 'Pilot', 'Mission_Specialist'],
+                                          p=[0.2, 0.4, 0.2, 0.2])
+        })
+    return pd.DataFrame(records)
+
+
+def legacy_baseline(n_records: int) -> pd.DataFrame:
+    """Previous create_realistic_baseline_data loop (constant columns left out)."""
+    np.random.seed(42)
+    records = []
+    for _ in range(n_records):
+        mission_type = np.random.choice(['short', 'standard', 'long'], p=[0.15, 0.70, 0.15])
+        if mission_type == 'short':
+            mission_duration = np.random.randint(15, 50)
+        elif mission_type == 'standard':
+            mission_duration = np.random.randint(120, 200)
+        else:
+            mission_duration = np.random.randint(300, 400)
+        crew_age = max(28, min(58, np.random.normal(42, 7)))
+        exercise_hours = max(12, min(24, np.random.normal(17.5, 2.5)))
+        pre_flight_bone = np.random.normal(1.18, 0.12)
+        months = mission_duration / 30.0
+        records.append({
+            'mission_duration_days': mission_duration,
+            'crew_age': crew_age,
+            'pre_flight_bone_density': pre_flight_bone,
+            'exercise_hours_per_week': exercise_hours,
+            'bone_density_change': np.random.normal(-1.5 * months, 0.8) + (exercise_hours - 17.5) * 0.15,
+            'muscle_mass_change': np.random.normal(-3.2 * months, 1.2) + (exercise_hours - 17.5) * 0.25,
+            'cardiovascular_change': np.random.normal(-1.8 * months, 1.0) + (exercise_hours - 17.5) * 0.12,
+            'psychological_score_change': np.random.normal(0, 8) * np.sqrt(months),
+            'mission_type': f'ISS_Expedition_{mission_type}',
+            'crew_role': np.random.choice(['CDR', 'FE1', 'FE2', 'FE3'], p=[0.25, 0.25, 0.25, 0.25])
+        })
+    return pd.DataFrame(records)
+
+
+def compare(legacy: pd.DataFrame, vectorized: pd.DataFrame) -> None:
+    """Print summary statistics of both generators side by side."""
+    print(f"  {'column':<28} {'statistic':<9} {'legacy':>10} {'vectorized':>10}")
+    for col in legacy.select_dtypes(include='number').columns:
+        for name, legacy_value, new_value in [
+            ('mean', legacy[col].mean(), vectorized[col].mean()),
+            ('std', legacy[col].std(), vectorized[col].std()),
+            ('q25/q75', legacy[col].quantile(0.25), vectorized[col].quantile(0.25)),
+            ('', legacy[col].quantile(0.75), vectorized[col].quantile(0.75))
+        ]:
+            print(f"  {col if name == 'mean' else '':<28} {name:<9} {legacy_value:>10.3f} {new_value:>10.3f}")
+    for col in ['mission_type', 'crew_role']:
+        legacy_freq = legacy[col].value_counts(normalize=True)
+        new_freq = vectorized[col].value_counts(normalize=True).reindex(legacy_freq.index)
+        print(f"  {col:<28} max frequency difference {np.abs(legacy_freq - new_freq).max():.4f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-record vs vectorized crew record generation")
+    parser.add_argument('--rows', type=int, default=1_000_000, help="Rows for the vectorized generators")
+    parser.add_argument('--legacy-rows', type=int, default=20_000, help="Rows for the legacy loops")
+    args = parser.parse_args()
+
+    for name, legacy_function, generator in [
+        ('convert_studies_to_crew_metrics', legacy_study_derived, generate_study_derived_records),
+        ('create_realistic_baseline_data', legacy_baseline, generate_baseline_records)
+    ]:
+        start = time.perf_counter()
+        legacy = legacy_function(args.legacy_rows)
+        legacy_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        vectorized = generator(args.rows, np.random.default_rng(42))
+        vectorized_s = time.perf_counter() - start
+        legacy_extrapolated_s = legacy_s * args.rows / args.legacy_rows
+
+        print(f"{name}")
+        print(f"  legacy loop: {args.legacy_rows:>11,} rows {legacy_s:8.2f} s "
+              f"(~{legacy_extrapolated_s:,.0f} s extrapolated to {args.rows:,})")
+        print(f"  vectorized:  {args.rows:>11,} rows {vectorized_s:8.2f} s  "
+              f"speedup ~{legacy_extrapolated_s / vectorized_s:,.0f}x  "
+              f"{vectorized.memory_usage(deep=True).sum() / 1e6:.0f} MB")
+        compare(legacy, vectorized)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Prediction Grid Builder for ISS Crew Health Analysis
+
+Evaluates RealNASAMLPredictor over the whole input space used by the web
+simulators and writes a compact lookup table, so the web API can answer
+bone loss predictions by index lookup without calling Python at request time.
+
+Grid axes:
+- age: integers 25-60
+- mission_duration_days: integers 1-1000
+- gender: Female / Male
+- height_cm and weight_kg: coarse bins (the API interpolates between them)
+
+Output (web/public/data/prediction_grid/):
+- manifest.json: axes, site order, value encoding and shard file names
+- one binary shard per (gender, height, weight) bin: little-endian int16
+  bone loss in hundredths of a percent, laid out [age][duration][site]
+
+Usage:
+    python build_prediction_grid.py --models-dir models
+
+Author: AI Assistant
+Date: 2024
+License: NASA Open Data
+"""
+
+import argparse
+import json
+import logging
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+from ml_predictor import RealNASAMLPredictor
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+GRID_FORMAT_VERSION = 1
+
+AGES = np.arange(25, 61)
+MISSION_DURATIONS = np.arange(1, 1001)
+GENDERS = ['Female', 'Male']
+# Bins are centered on the web defaults (175 cm, 77 kg) so they are served exactly
+HEIGHT_BINS_CM = [155.0, 165.0, 175.0, 185.0, 195.0]
+WEIGHT_BINS_KG = [57.0, 67.0, 77.0, 87.0, 97.0, 107.0]
+
+# Predictions are stored as int16 hundredths of a percent (same precision as the API)
+VALUE_SCALE = 100
+
+
+def shard_name(gender: str, height_cm: float, weight_kg: float) -> str:
+    """File name of the shard holding one (gender, height, weight) bin."""
+    return f"{gender.lower()}_h{height_cm:g}_w{weight_kg:g}.bin"
+
+
+def build_shard(predictor: RealNASAMLPredictor, gender: str, height_cm: float, weight_kg: float) -> np.ndarray:
+    """Predict every (age, duration) pair for one bin; returns int16 [age, duration, site]."""
+    ages, durations = np.meshgrid(AGES, MISSION_DURATIONS, indexing='ij')
+    results = predictor.predict_bone_loss_batch({
+        'age': ages.ravel(),
+        'mission_duration_days': durations.ravel(),
+        'gender': np.full(ages.size, gender),
+        'height_cm': np.full(ages.size, height_cm),
+        'weight_kg': np.full(ages.size, weight_kg)
+    })
+
+    values = results[[f"{site}_bone_loss_percent" for site in predictor.bone_sites]].to_numpy()
+    scaled = np.rint(values * VALUE_SCALE)
+    if np.abs(scaled).max() > np.iinfo(np.int16).max:
+        raise ValueError(f"Prediction out of int16 range for {gender}, {height_cm} cm, {weight_kg} kg")
+
+    return scaled.astype('<i2').reshape(len(AGES), len(MISSION_DURATIONS), len(predictor.bone_sites))
+
+
+def build_prediction_grid(models_dir: str = "models", output_dir: str = "web/public/data/prediction_grid") -> dict:
+    """Evaluate the predictor over the full grid and write the shards plus manifest."""
+    predictor = RealNASAMLPredictor(models_dir=models_dir, lazy=False)
+    if not predictor.models:
+        raise RuntimeError("Models not loaded. Please run train_real_ml_model.py first.")
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    shards = {}
+    for gender in GENDERS:
+        for height_cm in HEIGHT_BINS_CM:
+            for weight_kg in WEIGHT_BINS_KG:
+                name = shard_name(gender, height_cm, weight_kg)
+                build_shard(predictor, gender, height_cm, weight_kg).tofile(output_dir / name)
+                shards[f"{gender}|{height_cm:g}|{weight_kg:g}"] = name
+        logger.info(f"✅ Built {gender} shards")
+
+    metadata = predictor.metadata or {}
+    manifest = {
+        'format_version': GRID_FORMAT_VERSION,
+        'generated_at': datetime.now(timezone.utc).isoformat(),
+        'model_trained_on': metadata.get('trained_on'),
+        'data_sources': metadata.get('data_sources', []),
+        'sites': list(predictor.bone_sites),
+        'encoding': {'dtype': 'int16', 'byte_order': 'little', 'scale': VALUE_SCALE},
+        'shard_layout': ['age', 'mission_duration_days', 'site'],
+        'axes': {
+            'age': {'start': int(AGES[0]), 'stop': int(AGES[-1]), 'step': 1},
+            'mission_duration_days': {'start': int(MISSION_DURATIONS[0]), 'stop': int(MISSION_DURATIONS[-1]), 'step': 1},
+            'gender': GENDERS,
+            'height_cm': HEIGHT_BINS_CM,
+            'weight_kg': WEIGHT_BINS_KG
+        },
+        'shards': shards
+    }
+
+    # Manifest last: the API only uses the grid once it is complete
+    with open(output_dir / "manifest.json", 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    total_bytes = sum((output_dir / name).stat().st_size for name in shards.values())
+    logger.info(f"✅ Prediction grid written to {output_dir} ({len(shards)} shards, {total_bytes / 1e6:.1f} MB)")
+    return manifest
+
+
+def main():
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Precompute the bone loss prediction lookup grid for the web app")
+    parser.add_argument('--models-dir', default="models", help="Directory with trained model artifacts")
+    parser.add_argument('--output-dir', default="web/public/data/prediction_grid", help="Where to write the grid")
+    args = parser.parse_args()
+
+    build_prediction_grid(args.models_dir, args.output_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+Random Forest Compiler for ISS Crew Health Analysis
+
+Exports the Random Forests trained by train_real_ml_model.py and
+train_advanced_ml.py into flat NumPy arrays (feature, threshold, left,
+right and value for every node, trees concatenated with a root offset
+each) and evaluates them with a vectorized NumPy tree walk. This skips
+sklearn's per-call overhead (input validation, joblib thread dispatch),
+which dominates latency for the small batches served by ml_predictor.
+For large batches (above FLAT_FOREST_MAX_BATCH rows) sklearn's compiled
+tree walk is faster, and ml_predictor switches back to it.
+
+Each compiled forest is a directory holding versioned subdirectories of
+raw .npy arrays plus meta.json, and a CURRENT file naming the live version.
+Re-exporting writes a new version and atomically replaces CURRENT, so the
+artifact path never disappears while workers load or reload it. Loading
+memory-maps the arrays read-only, so any number of worker processes share
+one physical copy of the model pages.
+
+Predictions match RandomForestRegressor.predict exactly. Inputs are cast
+to float32 like sklearn, and tree outputs are summed in estimator order,
+as sklearn does with n_jobs=1.
+
+Usage:
+    python forest_compiler.py --models-dir models
+
+Author: AI Assistant
+Date: 2024
+License: NASA Open Data
+"""
+
+import argparse
+import json
+import logging
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Optional
+
+import joblib
+import numpy as np
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+FLAT_SUFFIX = ".flat"
+FLAT_META = "meta.json"
+# Pointer file naming the live version subdirectory of a compiled artifact
+FLAT_CURRENT = "CURRENT"
+# Versions kept on disk: the live one plus the previous one, for readers that
+# resolved CURRENT just before it was swapped
+FLAT_KEEP_VERSIONS = 2
+# Attempts made by load_flat_forest when a version is removed under it
+FLAT_LOAD_ATTEMPTS = 3
+FLAT_FORMAT_VERSION = 1
+
+# sklearn leaf marker in tree_.children_left / children_right
+TREE_LEAF = -1
+
+# Rows evaluated per block, bounding the (n_trees x rows) working arrays
+DEFAULT_BLOCK_SIZE = 4096
+
+# Above this many rows sklearn's C tree walk beats the NumPy evaluator
+FLAT_FOREST_MAX_BATCH = 500
+
+
+class FlatForest:
+    """Random Forest stored as flat node arrays (all trees concatenated, one root offset per tree)."""
+
+    def __init__(self, feature, threshold, left, right, value, roots, max_depth: int, n_features: int):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.max_depth = int(max_depth)
+        self.n_features_in_ = int(n_features)
+        self.n_outputs_ = value.shape[1]
+
+    @property
+    def n_estimators(self) -> int:
+        return len(self.roots)
+
+    def predict(self, X, block_size: int = DEFAULT_BLOCK_SIZE) -> np.ndarray:
+        """Average the leaf values reached by every tree (same output shape as sklearn)."""
+        # Round through float32 like sklearn, then compare in float64 against the thresholds
+        X = np.asarray(X, dtype=np.float32).astype(np.float64)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f"Expected input of shape (n_samples, {self.n_features_in_}), got {X.shape}")
+
+        predictions = np.empty((X.shape[0], self.n_outputs_), dtype=np.float64)
+        for start in range(0, X.shape[0], block_size):
+            block = X[start:start + block_size]
+            predictions[start:start + len(block)] = self._predict_block(block)
+
+        return predictions[:, 0] if self.n_outputs_ == 1 else predictions
+
+    def _predict_block(self, X: np.ndarray) -> np.ndarray:
+        n_samples = X.shape[0]
+        X_flat = X.ravel()
+        row_offsets = np.arange(n_samples) * self.n_features_in_
+
+        # Walk all trees and samples one level at a time; leaves point to themselves
+        node = np.repeat(self.roots[:, None], n_samples, axis=1)
+        for _ in range(self.max_depth):
+            go_left = X_flat.take(self.feature.take(node) + row_offsets) <= self.threshold.take(node)
+            node = np.where(go_left, self.left.take(node), self.right.take(node))
+
+        leaf_values = self.value[node]
+
+        # Accumulate tree by tree to reproduce sklearn's summation order exactly
+        total = leaf_values[0].copy()
+        for tree_values in leaf_values[1:]:
+            total += tree_values
+        total /= self.n_estimators
+        return total
+
+
+class FlatScaler:
+    """StandardScaler reduced to its mean and scale arrays."""
+
+    def __init__(self, mean, scale):
+        self.mean_ = mean
+        self.scale_ = scale
+
+    def transform(self, X) -> np.ndarray:
+        # Always a private float64 copy: the mapped mean/scale arrays are read-only
+        X = np.array(X, dtype=np.float64)
+        if self.mean_ is not None:
+            X -= self.mean_
+        if self.scale_ is not None:
+            X /= self.scale_
+        return X
+
+
+def compile_forest(model) -> dict:
+    """Convert a fitted sklearn forest regressor into flat node arrays."""
+    if not hasattr(model, 'estimators_'):
+        raise TypeError(f"{type(model).__name__} is not a fitted forest")
+
+    trees = [estimator.tree_ for estimator in model.estimators_]
+    node_counts = np.array([tree.node_count for tree in trees])
+    roots = np.concatenate([[0], np.cumsum(node_counts)[:-1]]).astype(np.intp)
+
+    feature, threshold, left, right, value = [], [], [], [], []
+    for tree, root in zip(trees, roots):
+        # Child ids become global node ids; leaves point to themselves so the walk stays put
+        node_ids = np.arange(tree.node_count, dtype=np.intp) + root
+        is_leaf = tree.children_left == TREE_LEAF
+
+        feature.append(np.where(is_leaf, 0, tree.feature))
+        threshold.append(np.where(is_leaf, 0.0, tree.threshold))
+        left.append(np.where(is_leaf, node_ids, tree.children_left + root))
+        right.append(np.where(is_leaf, node_ids, tree.children_right + root))
+        value.append(tree.value[:, :, 0])
+
+    return {
+        'feature': np.concatenate(feature).astype(np.intp),
+        'threshold': np.concatenate(threshold).astype(np.float64),
+        'left': np.concatenate(left).astype(np.intp),
+        'right': np.concatenate(right).astype(np.intp),
+        'value': np.concatenate(value).astype(np.float64),
+        'roots': roots,
+        'max_depth': np.int64(max(tree.max_depth for tree in trees)),
+        'n_features': np.int64(model.n_features_in_)
+    }
+
+
+def compile_scaler(scaler) -> dict:
+    """Extract the arrays a fitted StandardScaler needs for transform."""
+    return {
+        'scaler_mean': getattr(scaler, 'mean_', None) if scaler.with_mean else None,
+        'scaler_scale': getattr(scaler, 'scale_', None) if scaler.with_std else None
+    }
+
+
+def save_flat_forest(path, model, scaler=None, sites=None) -> Path:
+    """
+    Compile a forest (and optional scaler / multi-output site order) into a new version
+    directory of raw .npy arrays plus meta.json, so it can be memory-mapped read-only.
+
+    The version is complete before CURRENT is pointed at it with os.replace, so a
+    concurrent reader always finds either the previous or the new version; the
+    artifact path itself is never renamed or removed.
+    """
+    arrays = compile_forest(model)
+    meta = {
+        'format_version': FLAT_FORMAT_VERSION,
+        'max_depth': int(arrays.pop('max_depth')),
+        'n_features': int(arrays.pop('n_features')),
+        'sites': list(sites) if sites is not None else None
+    }
+    if scaler is not None:
+        arrays.update({key: value for key, value in compile_scaler(scaler).items() if value is not None})
+    # Listed so a reader opens exactly these files (a glob could race with pruning)
+    meta['arrays'] = sorted(arrays)
+
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    version = f"v{time.time_ns()}-{os.getpid()}"
+    version_path = path / version
+
+    version_path.mkdir()
+    for name, array in arrays.items():
+        np.save(version_path / f"{name}.npy", np.ascontiguousarray(array))
+    with open(version_path / FLAT_META, 'w') as f:
+        json.dump(meta, f, indent=2)
+
+    # Atomic switch: readers see the old or the new CURRENT, never a missing one
+    pointer_tmp = path / f"{FLAT_CURRENT}.{os.getpid()}.tmp"
+    pointer_tmp.write_text(version)
+    os.replace(pointer_tmp, path / FLAT_CURRENT)
+
+    _prune_flat_versions(path, version)
+    return path
+
+
+def _prune_flat_versions(path: Path, current: str) -> None:
+    """Remove versions older than the last FLAT_KEEP_VERSIONS and files of the unversioned layout."""
+    versions = sorted((entry for entry in path.iterdir() if entry.is_dir() and entry.name.startswith('v')),
+                      key=lambda entry: int(entry.name[1:].split('-')[0]))
+    for stale in versions[:-FLAT_KEEP_VERSIONS]:
+        if stale.name != current:
+            # Mapped files may be locked on Windows; leftovers go on the next export
+            shutil.rmtree(stale, ignore_errors=True)
+
+    # Arrays written directly in the artifact directory by exports before versioning
+    for legacy in list(path.glob("*.npy")) + [path / FLAT_META]:
+        try:
+            legacy.unlink()
+        except OSError:
+            pass
+
+
+def _resolve_flat_version(path: Path) -> Path:
+    """Directory holding the live arrays: the CURRENT version, or path itself for unversioned exports."""
+    pointer = path / FLAT_CURRENT
+    if pointer.exists():
+        return path / pointer.read_text().strip()
+    return path
+
+
+def load_flat_forest(path, mmap_mode: Optional[str] = 'r'):
+    """
+    Load a compiled forest, returning (FlatForest, FlatScaler or None, sites or None).
+
+    With mmap_mode='r' (the default) the node arrays are memory-mapped read-only,
+    so every process serving the same artifact shares one copy of the pages. If the
+    version being read is pruned by a concurrent export, CURRENT is resolved again.
+    """
+    path = Path(path)
+    for attempt in range(FLAT_LOAD_ATTEMPTS):
+        version_path = _resolve_flat_version(path)
+        try:
+            with open(version_path / FLAT_META, 'r') as f:
+                meta = json.load(f)
+            names = meta.get('arrays') or [array_path.stem for array_path in version_path.glob("*.npy")]
+            arrays = {name: np.load(version_path / f"{name}.npy", mmap_mode=mmap_mode) for name in names}
+            break
+        except FileNotFoundError:
+            if attempt == FLAT_LOAD_ATTEMPTS - 1:
+                raise
+            logger.warning(f"⚠️ {version_path} was replaced while loading, retrying")
+
+    forest = FlatForest(
+        arrays['feature'], arrays['threshold'], arrays['left'], arrays['right'],
+        arrays['value'], arrays['roots'], meta['max_depth'], meta['n_features']
+    )
+    scaler = None
+    if 'scaler_mean' in arrays or 'scaler_scale' in arrays:
+        scaler = FlatScaler(arrays.get('scaler_mean'), arrays.get('scaler_scale'))
+
+    return forest, scaler, meta['sites']
+
+
+def flat_path_for(model_path) -> Path:
+    """Path of the compiled counterpart of a joblib model file."""
+    model_path = Path(model_path)
+    return model_path.with_name(model_path.name.replace(".joblib", FLAT_SUFFIX))
+
+
+def flat_artifact_mtime(flat_path) -> Optional[float]:
+    """Modification time of a complete compiled artifact, or None if there is none."""
+    flat_path = Path(flat_path)
+    # CURRENT is replaced last on export; unversioned exports mark completion with meta.json
+    for marker in (flat_path / FLAT_CURRENT, flat_path / FLAT_META):
+        try:
+            return marker.stat().st_mtime
+        except OSError:
+            pass
+    return None
+
+
+def export_models(models_dir: str = "models") -> list:
+    """Compile every known forest artifact found in the models directory."""
+    models_dir = Path(models_dir)
+    exported = []
+
+    # (model file, scaler file) pairs written by train_real_ml_model.py and train_advanced_ml.py
+    candidates = [(path, path.with_name(path.name.replace("_rf_model.joblib", "_scaler.joblib")))
+                  for path in sorted(models_dir.glob("real_*_rf_model.joblib"))
+                  if path.name != "real_multi_site_rf_model.joblib"]
+    candidates += [
+        (models_dir / "bone_density_rf_model.joblib", models_dir / "feature_scaler.joblib"),
+        (models_dir / "random_forest_model.joblib", None)
+    ]
+
+    for model_path, scaler_path in candidates:
+        if not model_path.exists():
+            continue
+        scaler = joblib.load(scaler_path) if scaler_path is not None and scaler_path.exists() else None
+        flat_path = save_flat_forest(flat_path_for(model_path), joblib.load(model_path), scaler)
+        exported.append(flat_path)
+        logger.info(f"✅ Compiled {model_path.name} -> {flat_path.name}")
+
+    # Multi-output artifact bundles its own scaler and site order
+    multi_output_path = models_dir / "real_multi_site_rf_model.joblib"
+    if multi_output_path.exists():
+        artifact = joblib.load(multi_output_path)
+        flat_path = save_flat_forest(flat_path_for(multi_output_path), artifact['model'],
+                                     artifact['scaler'], artifact['sites'])
+        exported.append(flat_path)
+        logger.info(f"✅ Compiled {multi_output_path.name} -> {flat_path.name}")
+
+    if not exported:
+        logger.warning(f"⚠️ No Random Forest artifacts found in {models_dir}")
+
+    return exported
+
+
+def main():
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Compile trained Random Forests into flat NumPy arrays")
+    parser.add_argument('--models-dir', default="models", help="Directory with trained model artifacts")
+    args = parser.parse_args()
+
+    export_models(args.models_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,8 @@ import pandas as pd
 import json
 from pathlib import Path
 
+from src.schema import read_compact_csv
+
 def generate_real_astronaut_names():
     """
     Generate real astronaut names based on NASA LSDA data patterns.
@@ -17,7 +19,7 @@ def generate_real_astronaut_names():
     
     # Load real astronaut profiles
     profiles_path = Path(__file__).parent / 'data' / 'real_astronaut_profiles.csv'
-    df = pd.read_csv(profiles_path)
+    df = read_compact_csv(profiles_path, float_dtype=None)
     
     # Real NASA astronaut name patterns based on historical data
     # These follow actual naming conventions from NASA missions
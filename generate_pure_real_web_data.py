@@ -10,16 +10,19 @@ import numpy as np
 from datetime import datetime
 import os
 
+from src.schema import read_compact_csv
+
 def load_real_nasa_data():
     """Load the real NASA astronaut data"""
     print("🚀 Loading ONLY real NASA astronaut data...")
     
     # Load astronaut profiles
-    profiles_df = pd.read_csv('data/real_astronaut_profiles.csv')
+    # Compact categories and integers; float64 kept so published values are unchanged
+    profiles_df = read_compact_csv('data/real_astronaut_profiles.csv', float_dtype=None)
     print(f"✅ Loaded {len(profiles_df)} real astronaut profiles")
     
     # Load bone density measurements  
-    bone_df = pd.read_csv('data/real_bone_density_measurements.csv')
+    bone_df = read_compact_csv('data/real_bone_density_measurements.csv', float_dtype=None)
     print(f"✅ Loaded {len(bone_df)} real bone density measurements")
     
     return profiles_df, bone_df
@@ -136,7 +139,7 @@ def generate_model_metadata_real():
         avg_mae = sum(mae_scores) / len(mae_scores) if mae_scores else 0
         
         # Load real astronaut data for metadata
-        profiles_df = pd.read_csv('data/real_astronaut_profiles.csv')
+        profiles_df = read_compact_csv('data/real_astronaut_profiles.csv', float_dtype=None)
         
         metadata = {
             "model_info": {
@@ -10,13 +10,16 @@ import numpy as np
 from scipy.stats import pearsonr
 from pathlib import Path
 
+from src.schema import read_compact_csv
+
 def calculate_all_real_metrics():
     """Calcula TODOS los valores reales necesarios para el frontend"""
     print("🚨 CALCULATING ALL REAL VALUES TO REPLACE FAKE DATA...")
     
     # Load real datasets
-    profiles_df = pd.read_csv('data/real_astronaut_profiles.csv')
-    bone_df = pd.read_csv('data/real_bone_density_measurements.csv')
+    # Compact categories and integers; float64 kept so published values are unchanged
+    profiles_df = read_compact_csv('data/real_astronaut_profiles.csv', float_dtype=None)
+    bone_df = read_compact_csv('data/real_bone_density_measurements.csv', float_dtype=None)
     
     print(f"📊 Loaded {len(profiles_df)} astronaut profiles")
     print(f"📊 Loaded {len(bone_df)} bone density measurements")
@@ -12,6 +12,7 @@ ISS crew health data using real NASA LSDA datasets.
 
 import pandas as pd
 import numpy as np
+import argparse
 import logging
 from pathlib import Path
 import sys
@@ -24,6 +25,7 @@ from src.data_acquisition import NASALSDAClient, fetch_iss_crew_data
 from src.data_preprocessing import CrewHealthDataProcessor
 from src.exploratory_analysis import CrewHealthEDA
 from src.predictive_modeling import CrewHealthPredictor
+from src.schema import apply_schema, memory_report
 
 # Configure logging
 logging.basicConfig(
@@ -41,17 +43,20 @@ class ISSCrewHealthPipeline:
     """Complete analysis pipeline for ISS crew health data"""
     
     def __init__(self, data_dir: str = "data", models_dir: str = "models", 
-                 reports_dir: str = "reports"):
+                 reports_dir: str = "reports", n_jobs: int = 1, offline: bool = False):
         self.data_dir = Path(data_dir)
         self.models_dir = Path(models_dir)
         self.reports_dir = Path(reports_dir)
+        # Worker processes for model training (1 = sequential, -1 = all cores)
+        self.n_jobs = n_jobs
         
         # Create directories if they don't exist
         for dir_path in [self.data_dir, self.models_dir, self.reports_dir]:
             dir_path.mkdir(exist_ok=True)
         
         # Initialize components
-        self.data_client = NASALSDAClient()
+        # OSDR searches are cached under data/cache; offline runs (CI) use only the cache
+        self.data_client = NASALSDAClient(cache_dir=str(self.data_dir / "cache" / "osdr"), offline=offline)
         self.preprocessor = CrewHealthDataProcessor()
         self.eda_analyzer = CrewHealthEDA()
         self.predictor = CrewHealthPredictor()
@@ -73,7 +78,7 @@ class ISSCrewHealthPipeline:
         logger.info("=" * 50)
         
         # Fetch ISS crew health data
-        raw_data = fetch_iss_crew_data()
+        raw_data = fetch_iss_crew_data(self.data_client)
         
         if save_raw and not raw_data.empty:
             raw_data_path = self.data_dir / "raw_crew_health_data.csv"
@@ -106,6 +111,9 @@ class ISSCrewHealthPipeline:
             processed_data_path = self.data_dir / "processed_crew_health_data.csv"
             processed_data.to_csv(processed_data_path, index=False)
             logger.info(f"Processed data saved to {processed_data_path}")
+            
+            # Fitted state lets new crew records be preprocessed with transform() at serving time
+            self.preprocessor.save_state(self.models_dir / "preprocessing_state.joblib")
         
         logger.info("Data preprocessing completed successfully")
         return processed_data
@@ -177,7 +185,7 @@ class ISSCrewHealthPipeline:
             return {}
         
         # Train models
-        results = self.predictor.train_models(X, y)
+        results = self.predictor.train_models(X, y, n_jobs=self.n_jobs)
         
         # Generate model comparison plots
         self.predictor.plot_model_comparison()
@@ -294,6 +302,11 @@ class ISSCrewHealthPipeline:
                 logger.error("No data available. Falling back to sample data.")
                 raw_data = self.create_sample_data()
             
+            # Compact dtypes (category, float32, small ints) before the copy-heavy steps
+            compact_data = apply_schema(raw_data)
+            memory_report(raw_data, compact_data, label="Raw crew health data")
+            raw_data = compact_data
+            
             results['raw_data'] = raw_data
             
             # Step 2: Data Preprocessing
@@ -357,8 +370,17 @@ class ISSCrewHealthPipeline:
 
 def main():
     """Main execution function"""
+    parser = argparse.ArgumentParser(description="Run the complete ISS crew health analysis pipeline")
+    parser.add_argument('--offline', action='store_true',
+                        default=os.environ.get('ISS_OSDR_OFFLINE', '').lower() in ('1', 'true', 'yes'),
+                        help="Answer NASA OSDR searches from data/cache only, never the network "
+                             "(default: ISS_OSDR_OFFLINE environment variable)")
+    parser.add_argument('--n-jobs', type=int, default=1,
+                        help="Models of the model zoo trained concurrently (-1 = all cores)")
+    args = parser.parse_args()
+    
     # Initialize pipeline
-    pipeline = ISSCrewHealthPipeline()
+    pipeline = ISSCrewHealthPipeline(n_jobs=args.n_jobs, offline=args.offline)
     
     # Run complete analysis (using real NASA LSDA data)
     results = pipeline.run_complete_pipeline(use_sample_data=False)
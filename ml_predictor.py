@@ -20,65 +20,152 @@ import joblib
 import numpy as np
 import pandas as pd
 import json
+import threading
+import time
+import copy
+from collections import OrderedDict
 from pathlib import Path
+from typing import List, Optional
 import logging
 
+from forest_compiler import (FLAT_FOREST_MAX_BATCH, FlatForest, flat_artifact_mtime, flat_path_for,
+                             load_flat_forest)
+
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+class PredictionCache:
+    """Thread-safe LRU cache of prediction results with an optional time-to-live."""
+    
+    def __init__(self, max_entries: int = 1024, ttl_seconds: Optional[float] = None):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+    
+    def get(self, key):
+        """Return the cached value for key (marking it recently used), or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            
+            stored_at, value = entry
+            if self.ttl_seconds is not None and time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+    
+    def put(self, key, value):
+        """Store value under key, evicting the least recently used entries beyond max_entries."""
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def clear(self):
+        """Drop every entry (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self) -> dict:
+        """Size, capacity and hit/miss/eviction counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
 class RealNASAMLPredictor:
     """ML predictor using real NASA astronaut bone density data."""
     
-    def __init__(self):
+    def __init__(self, models_dir: str = "models", prefer_multi_output: bool = True, lazy: bool = True,
+                 use_flat_forests: bool = True, mmap_mode: Optional[str] = 'r',
+                 cache_size: int = 0, cache_ttl: Optional[float] = None):
+        self.models_dir = Path(models_dir)
+        self.prefer_multi_output = prefer_multi_output
+        self.use_flat_forests = use_flat_forests
+        # Compiled forests are memory-mapped so worker processes share their pages
+        self.mmap_mode = mmap_mode
         self.models = {}
         self.scalers = {}
+        self.multi_output_sites = []
         self.metadata = None
         self.feature_names = ['age', 'mission_duration_days', 'gender_encoded', 'height_cm', 'weight_kg', 'bmi']
         self.bone_sites = ['femoral_neck', 'trochanter', 'pelvis', 'lumbar_spine', 'tibia_total']
-        self.load_real_models()
+        self._metadata_loaded = False
+        self._missing_sites = set()
+        self._sklearn_models = {}
+        self._load_lock = threading.RLock()
+        # Opt-in result cache for predict_bone_loss (cache_size=0 disables it)
+        self.cache = PredictionCache(cache_size, cache_ttl) if cache_size > 0 else None
+        
+        # Lazy mode defers all disk I/O until a site is first predicted
+        if not lazy:
+            self.load_real_models()
     
     def load_real_models(self):
-        """Load ML models trained on real NASA data."""
-        models_dir = Path("models")
+        """Load (or reload) every ML model trained on real NASA data."""
+        models_dir = self.models_dir
         
         if not models_dir.exists():
             logger.error("❌ Models directory not found. Please train models first.")
             return False
         
         try:
-            # Load metadata
-            metadata_path = models_dir / "real_ml_model_metadata.json"
-            if metadata_path.exists():
-                with open(metadata_path, 'r') as f:
-                    self.metadata = json.load(f)
-                logger.info("✅ Loaded real NASA ML model metadata")
-                logger.info(f"📚 Data sources: {len(self.metadata.get('data_sources', []))} studies")
-                logger.info(f"🚫 Simulated data: {self.metadata.get('simulated_data', 'Unknown')}")
-            
-            # Load bone site-specific models
-            for site in self.bone_sites:
-                model_path = models_dir / f"real_{site}_rf_model.joblib"
-                scaler_path = models_dir / f"real_{site}_scaler.joblib"
+            with self._load_lock:
+                self.models = {}
+                self.scalers = {}
+                self.multi_output_sites = []
+                self._missing_sites = set()
+                self._sklearn_models = {}
+                self._metadata_loaded = False
+                if self.cache is not None:
+                    self.cache.clear()
+                self._ensure_metadata()
                 
-                if model_path.exists() and scaler_path.exists():
-                    self.models[site] = joblib.load(model_path)
-                    self.scalers[site] = joblib.load(scaler_path)
-                    logger.info(f"✅ Loaded real {site} model")
-                else:
-                    logger.warning(f"⚠️ Model files missing for {site}")
-            
-            # Also load main model for backward compatibility
-            main_model_path = models_dir / "bone_density_rf_model.joblib"
-            main_scaler_path = models_dir / "feature_scaler.joblib"
-            
-            if main_model_path.exists() and main_scaler_path.exists():
-                self.models['main'] = joblib.load(main_model_path)
-                self.scalers['main'] = joblib.load(main_scaler_path)
-                logger.info("✅ Loaded main compatibility model")
+                # Load bone site-specific models (or the multi-output model covering them)
+                self._ensure_sites_loaded(self.bone_sites)
+                
+                # Also load main model for backward compatibility
+                main_model_path = models_dir / "bone_density_rf_model.joblib"
+                main_scaler_path = models_dir / "feature_scaler.joblib"
+                
+                flat_main_path = self._flat_path(main_model_path)
+                
+                if flat_main_path is not None:
+                    self.models['main'], self.scalers['main'], _ = load_flat_forest(
+                        flat_main_path, mmap_mode=self.mmap_mode)
+                    logger.info("✅ Loaded main compatibility model (compiled)")
+                elif main_model_path.exists() and main_scaler_path.exists():
+                    self.models['main'] = joblib.load(main_model_path)
+                    self.scalers['main'] = joblib.load(main_scaler_path)
+                    logger.info("✅ Loaded main compatibility model")
             
             if not self.models:
-                logger.error("❌ No models loaded. Please run train_real_ml_model_new.py first.")
+                logger.error("❌ No models loaded. Please run train_real_ml_model.py first.")
                 return False
             
             logger.info(f"✅ Successfully loaded {len(self.models)} real NASA ML models")
@@ -88,8 +175,96 @@ class RealNASAMLPredictor:
             logger.error(f"❌ Error loading models: {e}")
             return False
     
+    def _ensure_metadata(self):
+        """Load model metadata on first use."""
+        if self._metadata_loaded:
+            return
+        
+        with self._load_lock:
+            metadata_path = self.models_dir / "real_ml_model_metadata.json"
+            if not self._metadata_loaded and metadata_path.exists():
+                with open(metadata_path, 'r') as f:
+                    self.metadata = json.load(f)
+                logger.info("✅ Loaded real NASA ML model metadata")
+                logger.info(f"📚 Data sources: {len(self.metadata.get('data_sources', []))} studies")
+                logger.info(f"🚫 Simulated data: {self.metadata.get('simulated_data', 'Unknown')}")
+            self._metadata_loaded = True
+    
+    def _ensure_sites_loaded(self, sites: list):
+        """Load and cache the models for the requested bone sites on first use.
+
+        Returns True if at least one requested site can be predicted.
+        """
+        pending = [site for site in sites
+                   if site not in self.models and site not in self.multi_output_sites
+                   and site not in self._missing_sites]
+        if pending:
+            self._load_sites(pending)
+        
+        return any(site in self.models or site in self.multi_output_sites for site in sites)
+    
+    def _load_sites(self, pending: List[str]):
+        """Load the model files for the given bone sites into the cache."""
+        with self._load_lock:
+            # A single multi-output artifact covers every bone site in one file. It is only
+            # used when the current metadata names it, so a leftover from an earlier
+            # --multi-output training never shadows newer per-site models.
+            self._ensure_metadata()
+            multi_output_current = bool((self.metadata or {}).get('multi_output'))
+            multi_output_path = self.models_dir / "real_multi_site_rf_model.joblib"
+            flat_multi_output_path = self._flat_path(multi_output_path)
+            if self.prefer_multi_output and multi_output_current and 'multi_output' not in self.models:
+                if flat_multi_output_path is not None:
+                    model, scaler, sites = load_flat_forest(flat_multi_output_path, mmap_mode=self.mmap_mode)
+                    artifact = {'model': model, 'scaler': scaler, 'sites': sites}
+                elif multi_output_path.exists():
+                    artifact = joblib.load(multi_output_path)
+                else:
+                    artifact = None
+                
+                if artifact is not None:
+                    self.scalers['multi_output'] = artifact['scaler']
+                    self.models['multi_output'] = artifact['model']
+                    self.multi_output_sites = artifact['sites']
+                    logger.info(f"✅ Loaded real multi-output model ({len(self.multi_output_sites)} sites)")
+            
+            for site in pending:
+                if site in self.models or site in self.multi_output_sites:
+                    continue
+                
+                model_path = self.models_dir / f"real_{site}_rf_model.joblib"
+                scaler_path = self.models_dir / f"real_{site}_scaler.joblib"
+                flat_path = self._flat_path(model_path)
+                
+                if flat_path is not None:
+                    model, scaler, _ = load_flat_forest(flat_path, mmap_mode=self.mmap_mode)
+                    self.scalers[site] = scaler
+                    self.models[site] = model
+                    logger.info(f"✅ Loaded real {site} model (compiled)")
+                elif model_path.exists() and scaler_path.exists():
+                    self.scalers[site] = joblib.load(scaler_path)
+                    self.models[site] = joblib.load(model_path)
+                    logger.info(f"✅ Loaded real {site} model")
+                else:
+                    self._missing_sites.add(site)
+                    logger.warning(f"⚠️ Model files missing for {site}")
+    
+    def _flat_path(self, model_path: Path) -> Optional[Path]:
+        """Compiled forest for a joblib model, if enabled and not older than the model."""
+        if not self.use_flat_forests:
+            return None
+        
+        flat_path = flat_path_for(model_path)
+        flat_mtime = flat_artifact_mtime(flat_path)
+        if flat_mtime is None:
+            return None
+        if model_path.exists() and model_path.stat().st_mtime > flat_mtime:
+            logger.warning(f"⚠️ {flat_path.name} is older than {model_path.name}, using the joblib model")
+            return None
+        return flat_path
+    
     def predict_bone_loss(self, age: int, mission_duration_days: int, gender: str, 
-                         height_cm: float, weight_kg: float) -> dict:
+                         height_cm: float, weight_kg: float, sites: Optional[List[str]] = None) -> dict:
         """
         Predict bone loss using real NASA astronaut data models.
         
@@ -99,11 +274,28 @@ class RealNASAMLPredictor:
             gender: 'Male' or 'Female'
             height_cm: Height in centimeters
             weight_kg: Weight in kilograms
+            sites: Bone sites to predict (default: all); only their models are loaded
             
         Returns:
             Dictionary with bone loss predictions for each site
         """
-        if not self.models:
+        requested_sites = sites or self.bone_sites
+        
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self._cache_key(age, mission_duration_days, gender, height_cm, weight_kg, requested_sites)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return self._from_cache(cached, age, mission_duration_days, gender, height_cm, weight_kg)
+        
+        try:
+            models_available = self._ensure_sites_loaded(requested_sites)
+            self._ensure_metadata()
+        except Exception as e:
+            logger.error(f"❌ Error loading models: {e}")
+            models_available = False
+        
+        if not models_available:
             return {"error": "Models not loaded. Please train models first."}
         
         try:
@@ -131,13 +323,10 @@ class RealNASAMLPredictor:
             }
             
             # Get predictions for each bone site
+            site_predictions = self._predict_sites(features, requested_sites)
             for site in self.bone_sites:
-                if site in self.models and site in self.scalers:
-                    # Scale features
-                    features_scaled = self.scalers[site].transform(features)
-                    
-                    # Make prediction
-                    prediction = self.models[site].predict(features_scaled)[0]
+                if site in site_predictions:
+                    prediction = site_predictions[site][0]
                     
                     predictions["predictions"][site] = {
                         "bone_loss_percent": round(prediction, 2),
@@ -154,12 +343,169 @@ class RealNASAMLPredictor:
                     "recommendations": self._get_recommendations(avg_loss, mission_duration_days)
                 }
             
+            if cache_key is not None:
+                self.cache.put(cache_key, copy.deepcopy(predictions))
+            
             return predictions
             
         except Exception as e:
             logger.error(f"❌ Prediction error: {e}")
             return {"error": f"Prediction failed: {str(e)}"}
     
+    def _cache_key(self, age, mission_duration_days, gender: str, height_cm, weight_kg, sites) -> tuple:
+        """Normalize prediction inputs into a hashable cache key (same values as the model sees)."""
+        gender_encoded = 1 if gender.lower() == 'male' else 0
+        return (float(age), float(mission_duration_days), gender_encoded,
+                float(height_cm), float(weight_kg), tuple(sites))
+    
+    def _from_cache(self, cached: dict, age, mission_duration_days, gender: str,
+                    height_cm, weight_kg) -> dict:
+        """Private copy of a cached result, echoing this call's own input parameters."""
+        predictions = copy.deepcopy(cached)
+        predictions["input_parameters"].update({
+            "age": age,
+            "mission_duration_days": mission_duration_days,
+            "gender": gender,
+            "height_cm": height_cm,
+            "weight_kg": weight_kg
+        })
+        return predictions
+    
+    def cache_info(self) -> Optional[dict]:
+        """Prediction cache statistics, or None when caching is disabled."""
+        return self.cache.stats() if self.cache is not None else None
+    
+    def predict_bone_loss_batch(self, profiles, sites: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Predict bone loss for many astronaut profiles in one call.
+
+        Each bone site's scaler and model run exactly once over the whole
+        feature matrix, instead of once per profile.
+
+        Args:
+            profiles: DataFrame, dict of arrays or NumPy structured array with
+                age, mission_duration_days and gender (or gender_encoded)
+                columns; height_cm and weight_kg default to 175.0 / 77.0
+            sites: Bone sites to predict (default: all); only their models are loaded
+
+        Returns:
+            DataFrame with one row per profile: bmi, <site>_bone_loss_percent,
+            <site>_severity, average_bone_loss_percent and risk_level columns
+        """
+        requested_sites = sites or self.bone_sites
+        if not self._ensure_sites_loaded(requested_sites):
+            raise RuntimeError("Models not loaded. Please train models first.")
+
+        profiles_df = pd.DataFrame(profiles).reset_index(drop=True)
+        features = self._build_feature_matrix(profiles_df)
+
+        results = pd.DataFrame({
+            'age': features[:, 0],
+            'mission_duration_days': features[:, 1],
+            'gender_encoded': features[:, 2].astype(int),
+            'height_cm': features[:, 3],
+            'weight_kg': features[:, 4],
+            'bmi': np.round(features[:, 5], 1)
+        })
+
+        site_predictions = self._predict_sites(features, requested_sites)
+        site_columns = []
+        for site in self.bone_sites:
+            if site in site_predictions:
+                column = f"{site}_bone_loss_percent"
+                results[column] = np.round(site_predictions[site], 2)
+                results[f"{site}_severity"] = self._classify_severity_array(results[column].to_numpy())
+                site_columns.append(column)
+
+        if site_columns:
+            avg_loss = np.round(results[site_columns].to_numpy().mean(axis=1), 2)
+            results['average_bone_loss_percent'] = avg_loss
+            results['risk_level'] = np.select(
+                [avg_loss >= -3.0, avg_loss >= -5.0, avg_loss >= -7.0],
+                ["Low Risk", "Moderate Risk", "High Risk"],
+                default="Very High Risk"
+            )
+
+        return results
+
+    def _predict_sites(self, features: np.ndarray, sites: List[str]) -> dict:
+        """Predict the requested (and loaded) bone sites for a feature matrix."""
+        site_predictions = {}
+        
+        n_rows = features.shape[0]
+        
+        # Multi-output model: every site from one scaling and one pass over the trees
+        if 'multi_output' in self.models and any(site in self.multi_output_sites for site in sites):
+            model = self._model_for_batch('multi_output', n_rows)
+            predictions = model.predict(self.scalers['multi_output'].transform(features))
+            for i, site in enumerate(self.multi_output_sites):
+                if site in sites:
+                    site_predictions[site] = predictions[:, i]
+        
+        for site in sites:
+            if site not in site_predictions and site in self.models and site in self.scalers:
+                model = self._model_for_batch(site, n_rows)
+                site_predictions[site] = model.predict(self.scalers[site].transform(features))
+        
+        return site_predictions
+    
+    def _model_for_batch(self, key: str, n_rows: int):
+        """Compiled forests win on small batches; sklearn's C tree walk wins on large ones."""
+        model = self.models[key]
+        if not isinstance(model, FlatForest) or n_rows <= FLAT_FOREST_MAX_BATCH:
+            return model
+        
+        if key not in self._sklearn_models:
+            with self._load_lock:
+                if key == 'multi_output':
+                    model_path = self.models_dir / "real_multi_site_rf_model.joblib"
+                else:
+                    model_path = self.models_dir / f"real_{key}_rf_model.joblib"
+                if not model_path.exists():
+                    return model
+                artifact = joblib.load(model_path)
+                self._sklearn_models[key] = artifact['model'] if isinstance(artifact, dict) else artifact
+        
+        return self._sklearn_models[key]
+
+    def _build_feature_matrix(self, profiles_df: pd.DataFrame) -> np.ndarray:
+        """Build the model feature matrix (in feature_names order) from profile columns."""
+        required = ['age', 'mission_duration_days']
+        missing = [col for col in required if col not in profiles_df.columns]
+        if 'gender' not in profiles_df.columns and 'gender_encoded' not in profiles_df.columns:
+            missing.append('gender')
+        if missing:
+            raise ValueError(f"Missing profile columns: {missing}")
+
+        n_profiles = len(profiles_df)
+        if 'gender_encoded' in profiles_df.columns:
+            gender_encoded = profiles_df['gender_encoded'].to_numpy(dtype=float)
+        else:
+            gender_encoded = (profiles_df['gender'].astype(str).str.lower() == 'male').to_numpy(dtype=float)
+
+        height_cm = (profiles_df['height_cm'].to_numpy(dtype=float) if 'height_cm' in profiles_df.columns
+                     else np.full(n_profiles, 175.0))
+        weight_kg = (profiles_df['weight_kg'].to_numpy(dtype=float) if 'weight_kg' in profiles_df.columns
+                     else np.full(n_profiles, 77.0))
+        bmi = weight_kg / (height_cm / 100) ** 2
+
+        return np.column_stack([
+            profiles_df['age'].to_numpy(dtype=float),
+            profiles_df['mission_duration_days'].to_numpy(dtype=float),
+            gender_encoded,
+            height_cm,
+            weight_kg,
+            bmi
+        ])
+
+    def _classify_severity_array(self, bone_loss_percent: np.ndarray) -> np.ndarray:
+        """Vectorized counterpart of _classify_severity."""
+        return np.select(
+            [bone_loss_percent >= -2.0, bone_loss_percent >= -4.0, bone_loss_percent >= -6.0],
+            ["Minimal", "Moderate", "Significant"],
+            default="Severe"
+        )
+
     def _classify_severity(self, bone_loss_percent: float) -> str:
         """Classify bone loss severity based on real NASA data ranges."""
         if bone_loss_percent >= -2.0:  # Less than 2% loss
@@ -214,8 +560,24 @@ class RealNASAMLPredictor:
         
         return recommendations
 
-# Global instance for backwards compatibility
-predictor = RealNASAMLPredictor()
+# Global instance for backwards compatibility, created on first use
+_predictor = None
+_predictor_lock = threading.Lock()
+
+def get_real_predictor() -> RealNASAMLPredictor:
+    """Return the shared predictor, creating it on first call."""
+    global _predictor
+    if _predictor is None:
+        with _predictor_lock:
+            if _predictor is None:
+                _predictor = RealNASAMLPredictor()
+    return _predictor
+
+def __getattr__(name):
+    # Keep `from ml_predictor import predictor` working without building it at import time
+    if name == 'predictor':
+        return get_real_predictor()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def predict_bone_loss(age: int, mission_duration_days: int, gender: str = "Male", 
                      height_cm: float = 175.0, weight_kg: float = 77.0) -> dict:
@@ -223,13 +585,13 @@ def predict_bone_loss(age: int, mission_duration_days: int, gender: str = "Male"
     Legacy function for backward compatibility.
     Now uses real NASA ML models instead of simulated data.
     """
-    return predictor.predict_bone_loss(age, mission_duration_days, gender, height_cm, weight_kg)
+    return get_real_predictor().predict_bone_loss(age, mission_duration_days, gender, height_cm, weight_kg)
 
 # Additional compatibility functions for old API structure
 class BoneDensityPredictor:
     """Legacy compatibility wrapper"""
     def __init__(self):
-        self.predictor = predictor
+        self.predictor = get_real_predictor()
     
     def predict(self, mission_duration_days, crew_age, pre_flight_bone_density=100.0, 
                exercise_hours_per_week=2.5, mission_type="ISS", crew_role="FE1"):
@@ -250,7 +612,7 @@ def get_predictor():
 def predict_bone_density_change(mission_duration_days, crew_age, pre_flight_bone_density=100.0,
                                exercise_hours_per_week=2.5, mission_type="ISS", crew_role="FE1"):
     """Legacy compatibility function"""
-    return predictor.predict_bone_loss(
+    return get_real_predictor().predict_bone_loss(
         age=crew_age,
         mission_duration_days=mission_duration_days,
         gender="Male",
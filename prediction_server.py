@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Resident Prediction Server for ISS Crew Health Analysis
+
+Keeps a single RealNASAMLPredictor loaded in memory and answers bone loss
+predictions over a local HTTP endpoint. The web API calls this server instead
+of spawning a fresh Python interpreter (and re-loading every joblib model)
+for each request.
+
+Endpoints:
+- POST /predict  JSON body with age, mission_duration_days, gender,
+                 height_cm and weight_kg (same arguments as predict_bone_loss)
+- GET  /health   Model load status, request counters and prediction cache stats
+- POST /reload   Reload model artifacts from disk without dropping requests
+
+Sending SIGHUP to the process also triggers a reload (where supported).
+
+Usage:
+    python prediction_server.py --host 127.0.0.1 --port 8765 --cache-size 4096
+
+Author: AI Assistant
+Date: 2024
+License: NASA Open Data
+"""
+
+import argparse
+import json
+import logging
+import signal
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from ml_predictor import RealNASAMLPredictor
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+REQUIRED_FIELDS = ['age', 'mission_duration_days', 'gender']
+
+
+class PredictionService:
+    """Holds the resident predictor and swaps it atomically on reload."""
+
+    def __init__(self, models_dir: str = "models", cache_size: int = 0, cache_ttl: float = None):
+        self.models_dir = models_dir
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self._lock = threading.Lock()
+        self.predictor = None
+        self.loaded_at = None
+        self.requests_served = 0
+        self.reload_count = 0
+        self.reload()
+
+    def reload(self) -> bool:
+        """Load a fresh predictor and swap it in only if models were found."""
+        logger.info(f"Loading models from {self.models_dir}...")
+        # Eager load so a broken reload is detected before it is swapped in
+        candidate = RealNASAMLPredictor(models_dir=self.models_dir, lazy=False,
+                                        cache_size=self.cache_size, cache_ttl=self.cache_ttl)
+
+        if not candidate.models and self.predictor is not None:
+            logger.error("❌ Reload found no models, keeping the current predictor")
+            return False
+
+        with self._lock:
+            self.predictor = candidate
+            self.loaded_at = time.time()
+            self.reload_count += 1
+
+        logger.info(f"✅ Predictor ready with {len(candidate.models)} models")
+        return bool(candidate.models)
+
+    def predict(self, payload: dict) -> dict:
+        """Run a single prediction against the current predictor."""
+        with self._lock:
+            predictor = self.predictor
+            self.requests_served += 1
+
+        return predictor.predict_bone_loss(
+            age=int(payload['age']),
+            mission_duration_days=int(payload['mission_duration_days']),
+            gender=str(payload['gender']),
+            height_cm=float(175.0 if payload.get('height_cm') is None else payload['height_cm']),
+            weight_kg=float(77.0 if payload.get('weight_kg') is None else payload['weight_kg'])
+        )
+
+    def health(self) -> dict:
+        """Summarize the server state for the health endpoint."""
+        with self._lock:
+            predictor = self.predictor
+            return {
+                "status": "ok" if predictor.models else "degraded",
+                "models_loaded": sorted(predictor.models.keys()),
+                "models_dir": str(self.models_dir),
+                "loaded_at": self.loaded_at,
+                "uptime_seconds": round(time.time() - self.loaded_at, 1),
+                "requests_served": self.requests_served,
+                "reload_count": self.reload_count,
+                "cache": predictor.cache_info()
+            }
+
+
+class PredictionRequestHandler(BaseHTTPRequestHandler):
+    """HTTP handler dispatching to the shared PredictionService."""
+
+    service: PredictionService = None
+
+    def do_GET(self):
+        if self.path == '/health':
+            health = self.service.health()
+            self._send_json(200 if health['status'] == 'ok' else 503, health)
+        else:
+            self._send_json(404, {"error": f"Unknown endpoint: {self.path}"})
+
+    def do_POST(self):
+        if self.path == '/predict':
+            self._handle_predict()
+        elif self.path == '/reload':
+            reloaded = self.service.reload()
+            self._send_json(200 if reloaded else 500, {"reloaded": reloaded, **self.service.health()})
+        else:
+            self._send_json(404, {"error": f"Unknown endpoint: {self.path}"})
+
+    def _handle_predict(self):
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            payload = json.loads(self.rfile.read(length) or b'{}')
+        except (ValueError, json.JSONDecodeError) as e:
+            self._send_json(400, {"error": f"Invalid JSON body: {e}"})
+            return
+
+        if not isinstance(payload, dict):
+            self._send_json(400, {"error": "Invalid JSON body: expected an object"})
+            return
+
+        missing = [field for field in REQUIRED_FIELDS if field not in payload or payload[field] is None]
+        if missing:
+            self._send_json(400, {"error": f"Missing required parameters: {', '.join(missing)}"})
+            return
+
+        try:
+            result = self.service.predict(payload)
+        except (TypeError, ValueError) as e:
+            self._send_json(400, {"error": f"Invalid parameter value: {e}"})
+            return
+
+        self._send_json(500 if 'error' in result else 200, result)
+
+    def _send_json(self, status: int, body: dict):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+def serve(host: str = "127.0.0.1", port: int = 8765, models_dir: str = "models",
+          cache_size: int = 0, cache_ttl: float = None):
+    """Start the prediction server and block until it is shut down."""
+    PredictionRequestHandler.service = PredictionService(models_dir=models_dir, cache_size=cache_size,
+                                                         cache_ttl=cache_ttl)
+    server = ThreadingHTTPServer((host, port), PredictionRequestHandler)
+    server.daemon_threads = True
+
+    def _shutdown(signum, frame):
+        logger.info("Shutting down prediction server...")
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    def _reload(signum, frame):
+        threading.Thread(target=PredictionRequestHandler.service.reload, daemon=True).start()
+
+    signal.signal(signal.SIGINT, _shutdown)
+    signal.signal(signal.SIGTERM, _shutdown)
+    if hasattr(signal, 'SIGHUP'):
+        signal.signal(signal.SIGHUP, _reload)
+
+    logger.info(f"🚀 Prediction server listening on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        logger.info("Prediction server stopped")
+
+
+def main():
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Resident NASA bone loss prediction server")
+    parser.add_argument('--host', default="127.0.0.1", help="Interface to bind (default: 127.0.0.1)")
+    parser.add_argument('--port', type=int, default=8765, help="Port to listen on (default: 8765)")
+    parser.add_argument('--models-dir', default="models", help="Directory with trained model artifacts")
+    parser.add_argument('--cache-size', type=int, default=0,
+                        help="Max cached prediction results (default: 0, caching disabled)")
+    parser.add_argument('--cache-ttl', type=float, default=None,
+                        help="Seconds a cached prediction stays valid (default: no expiry)")
+    args = parser.parse_args()
+
+    serve(host=args.host, port=args.port, models_dir=args.models_dir,
+          cache_size=args.cache_size, cache_ttl=args.cache_ttl)
+
+
+if __name__ == "__main__":
+    main()
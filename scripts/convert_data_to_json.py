@@ -11,6 +11,11 @@ import joblib
 from pathlib import Path
 import logging
 from datetime import datetime
+import sys
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from src.schema import read_compact_csv
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -31,7 +36,8 @@ class DataConverter:
         
         try:
             # Read processed data
-            df = pd.read_csv(self.data_path / "processed_crew_health_data.csv")
+            # float64 kept so the published values are unchanged
+            df = read_compact_csv(self.data_path / "processed_crew_health_data.csv", float_dtype=None)
             
             # Convert to JSON-serializable format
             data = {
@@ -66,7 +72,7 @@ class DataConverter:
         
         try:
             # Read raw data
-            df = pd.read_csv(self.data_path / "raw_crew_health_data.csv")
+            df = read_compact_csv(self.data_path / "raw_crew_health_data.csv", float_dtype=None)
             
             # Create simplified structure for raw data
             raw_data = {
@@ -142,7 +148,7 @@ class DataConverter:
         
         try:
             # Read processed data
-            df = pd.read_csv(self.data_path / "processed_crew_health_data.csv")
+            df = read_compact_csv(self.data_path / "processed_crew_health_data.csv", float_dtype=None)
             
             # Calculate key statistics
             stats = {
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Synthetic Cohort Generator for ISS Crew Health Analysis
+
+Builds large synthetic cohorts for load and scale testing of the preprocessing,
+training and web data steps, which only ever see the 50 real astronauts otherwise.
+
+Tables:
+- crew: the crew health frame of NASALSDAClient.create_realistic_baseline_data
+- bone: the columns of data/real_bone_density_measurements.csv, with the femoral
+  neck loss drawn from the baseline bone density model and the other sites scaled
+  by the fixed ratios of the published table
+
+Output (data/synthetic/<table>/ by default):
+- part-00000.csv (or .parquet) ...: one shard per rows_per_shard rows, each
+  written in chunks so memory stays bounded whatever the cohort size
+- manifest.json: seed, row counts and shard names, written last
+
+Shards are generated by worker processes from SeedSequence(seed).spawn(), so the
+output is identical for any worker count.
+
+Usage:
+    python scripts/generate_synthetic_cohort.py --rows 1000000 --table bone --workers 4
+    python scripts/generate_synthetic_cohort.py --rows 100000000 --format parquet --workers -1
+"""
+
+import argparse
+import json
+import logging
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from src.data_acquisition import generate_baseline_records
+from src.data_preprocessing import ChunkWriter
+from src.schema import BONE_SITES, apply_schema
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+TABLES = ['crew', 'bone']
+FORMATS = {'csv': '.csv', 'parquet': '.parquet'}
+
+# In the published table every site loss is a fixed multiple of the femoral neck loss
+# (in 65ths), and recovery times are per-site constants
+SITE_LOSS_RATIOS = {
+    'femoral_neck': 65 / 65,
+    'trochanter': 78 / 65,
+    'pelvis': 77 / 65,
+    'lumbar_spine': 49 / 65,
+    'calcaneus': 29 / 65
+}
+TIBIA_LOSS_RATIOS = {
+    'tibia_failure_load_loss_percent': 15 / 65,
+    'tibia_total_bmd_loss_percent': 16 / 65,
+    'tibia_trabecular_bmd_loss_percent': 18 / 65,
+    'tibia_cortical_bmd_loss_percent': 14 / 65
+}
+RECOVERY_DAYS = {'femoral_neck': 211, 'trochanter': 255, 'pelvis': 97, 'lumbar_spine': 151, 'calcaneus': 163}
+
+# Frequencies of the 50 real astronauts
+GENDER_P = {'Female': 0.14, 'Male': 0.86}
+DATA_SOURCE_P = {'Sibonga_2007_NASA_TR': 0.44, 'Gabel_2022_Nature': 0.36, 'Coulombe_2023_PMC': 0.20}
+
+# Femoral neck loss separating the published recovered (-5.2 %) and incomplete (-8.45 %) groups
+INCOMPLETE_RECOVERY_LOSS = -6.825
+
+
+def _categorical(rng: np.random.Generator, probabilities: dict, n: int) -> pd.Categorical:
+    labels = list(probabilities)
+    return pd.Categorical.from_codes(rng.choice(len(labels), size=n, p=list(probabilities.values())),
+                                     categories=labels)
+
+
+def generate_bone_density_records(n_records: int, rng: np.random.Generator, first_id: int = 0) -> pd.DataFrame:
+    """
+    Generate rows with the schema of real_bone_density_measurements.csv
+
+    Args:
+        n_records: Number of rows
+        rng: Random generator
+        first_id: Number of the first synthetic astronaut ID
+
+    Returns:
+        DataFrame with the bone density measurement columns
+    """
+    baseline = generate_baseline_records(n_records, rng)
+    femoral_neck_loss = baseline['bone_density_change'].to_numpy()
+    ids = np.char.zfill(np.arange(first_id + 1, first_id + n_records + 1).astype(str), 9)
+
+    records = {
+        'astronaut_id': np.char.add('SYN-', ids),
+        'mission_duration_days': baseline['mission_duration_days'].to_numpy(),
+        'age': np.rint(baseline['crew_age'].to_numpy()).astype(int),
+        'gender': _categorical(rng, GENDER_P, n_records)
+    }
+    for site in BONE_SITES:
+        records[f'{site}_bmd_loss_percent'] = femoral_neck_loss * SITE_LOSS_RATIOS[site]
+    for site in BONE_SITES:
+        records[f'{site}_recovery_days'] = np.full(n_records, RECOVERY_DAYS[site])
+    for col, ratio in TIBIA_LOSS_RATIOS.items():
+        records[col] = femoral_neck_loss * ratio
+    records['incomplete_recovery'] = femoral_neck_loss < INCOMPLETE_RECOVERY_LOSS
+    records['primary_data_source'] = _categorical(rng, DATA_SOURCE_P, n_records)
+    records['measurement_method'] = pd.Categorical.from_codes(np.zeros(n_records, dtype=np.int8),
+                                                              categories=['DXA_HR-pQCT'])
+    records['data_quality'] = pd.Categorical.from_codes(np.zeros(n_records, dtype=np.int8),
+                                                        categories=['synthetic'])
+
+    return pd.DataFrame(records)
+
+
+def generate_chunk(table: str, n_records: int, rng: np.random.Generator, first_id: int) -> pd.DataFrame:
+    """One chunk of the requested table in compact dtypes."""
+    if table == 'bone':
+        df = generate_bone_density_records(n_records, rng, first_id)
+    else:
+        df = generate_baseline_records(n_records, rng)
+    return apply_schema(df)
+
+
+def write_shard(table: str, path: str, n_records: int, first_id: int,
+                seed_sequence: np.random.SeedSequence, chunk_size: int) -> dict:
+    """Generate one shard chunk by chunk and append it to its file."""
+    rng = np.random.default_rng(seed_sequence)
+    start = time.perf_counter()
+
+    with ChunkWriter(path) as writer:
+        for offset in range(0, n_records, chunk_size):
+            size = min(chunk_size, n_records - offset)
+            writer.write(generate_chunk(table, size, rng, first_id + offset))
+
+    return {
+        'file': Path(path).name,
+        'rows': n_records,
+        'first_id': first_id + 1,
+        'seconds': round(time.perf_counter() - start, 2)
+    }
+
+
+def generate_cohort(rows: int, table: str = 'bone', output_dir: str = None, file_format: str = 'csv',
+                    rows_per_shard: int = 1_000_000, chunk_size: int = 250_000,
+                    workers: int = 1, seed: int = 42) -> dict:
+    """
+    Write a synthetic cohort as sharded CSV or Parquet files plus a manifest
+
+    Args:
+        rows: Total number of rows
+        table: 'crew' or 'bone'
+        output_dir: Destination directory (default data/synthetic/<table>)
+        file_format: 'csv' or 'parquet' (needs pyarrow)
+        rows_per_shard: Rows per output file
+        chunk_size: Rows generated and written at a time within a shard
+        workers: Worker processes (-1 = all cores)
+        seed: Root seed; each shard gets an independent child seed
+
+    Returns:
+        Manifest dictionary
+    """
+    if table not in TABLES:
+        raise ValueError(f"Unknown table '{table}', expected one of {TABLES}")
+    if file_format not in FORMATS:
+        raise ValueError(f"Unknown format '{file_format}', expected one of {list(FORMATS)}")
+    if file_format == 'parquet':
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError as e:
+            raise ImportError("Parquet output requires pyarrow (pip install pyarrow)") from e
+
+    output_dir = Path(output_dir or Path("data") / "synthetic" / table)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    n_shards = -(-rows // rows_per_shard)
+    seed_sequences = np.random.SeedSequence(seed).spawn(n_shards)
+    tasks = []
+    for shard in range(n_shards):
+        first_id = shard * rows_per_shard
+        path = output_dir / f"part-{shard:05d}{FORMATS[file_format]}"
+        tasks.append(delayed(write_shard)(table, str(path), min(rows_per_shard, rows - first_id), first_id,
+                                          seed_sequences[shard], chunk_size))
+
+    logger.info(f"🧪 Generating {rows:,} synthetic {table} rows in {n_shards} shard(s) with {workers} worker(s)...")
+    start = time.perf_counter()
+    shards = Parallel(n_jobs=workers)(tasks)
+    elapsed = time.perf_counter() - start
+
+    manifest = {
+        'table': table,
+        'format': file_format,
+        'rows': rows,
+        'seed': seed,
+        'rows_per_shard': rows_per_shard,
+        'generated_at': datetime.now(timezone.utc).isoformat(),
+        'shards': shards
+    }
+
+    # Manifest last: readers only use the cohort once it is complete
+    with open(output_dir / "manifest.json", 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    total_bytes = sum((output_dir / shard['file']).stat().st_size for shard in shards)
+    logger.info(f"✅ Wrote {rows:,} rows to {output_dir} in {elapsed:.1f} s "
+                f"({rows / elapsed:,.0f} rows/s, {total_bytes / 1e6:.1f} MB)")
+    return manifest
+
+
+def main():
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Generate a synthetic crew health cohort for scale testing")
+    parser.add_argument('--rows', type=int, default=100_000, help="Total rows to generate")
+    parser.add_argument('--table', choices=TABLES, default='bone',
+                        help="Schema: bone density measurements or the crew health frame")
+    parser.add_argument('--format', dest='file_format', choices=list(FORMATS), default='csv', help="Shard file format")
+    parser.add_argument('--output-dir', default=None, help="Destination directory (default: data/synthetic/<table>)")
+    parser.add_argument('--rows-per-shard', type=int, default=1_000_000, help="Rows per output file")
+    parser.add_argument('--chunk-size', type=int, default=250_000, help="Rows generated per write")
+    parser.add_argument('--workers', type=int, default=1, help="Worker processes (-1 = all cores)")
+    parser.add_argument('--seed', type=int, default=42, help="Root random seed")
+    args = parser.parse_args()
+
+    generate_cohort(args.rows, args.table, args.output_dir, args.file_format,
+                    args.rows_per_shard, args.chunk_size, args.workers, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,8 +7,15 @@ import requests
 import pandas as pd
 import json
 import numpy as np
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 from urllib.parse import urljoin, urlencode
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from pathlib import Path
+import hashlib
+import os
+import queue
+import threading
 import time
 import logging
 
@@ -16,22 +23,224 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+DEFAULT_KEYWORDS = [
+    "bone density", "muscle atrophy", "cardiovascular",
+    "physiology", "microgravity", "crew health",
+    "medical", "biomedical", "space flight",
+    "astronaut", "cosmonauts"
+]
+
+# Study record fields taken from each OSDR hit's _source, in output column order
+STUDY_FIELDS = ['title', 'description', 'organism', 'factor_name', 'factor_value',
+                'assay_type', 'platform']
+STUDY_SOURCE_FIELDS = ['data_source', 'study_type', 'experiment_type']
+STUDY_COLUMNS = ['study_id', *STUDY_FIELDS, 'search_keyword', *STUDY_SOURCE_FIELDS]
+
+class TokenBucket:
+    """Thread-safe token bucket limiting the request rate shared by all workers"""
+    
+    def __init__(self, rate: float, capacity: float = 1.0):
+        """
+        Args:
+            rate: Tokens added per second (sustained requests per second)
+            capacity: Maximum tokens held, i.e. how many requests may start at once
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self) -> float:
+        """
+        Take one token, sleeping until one is available
+        
+        Returns:
+            Seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    return waited
+                delay = (1.0 - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+class ResponseCache:
+    """
+    On-disk cache of JSON search responses keyed on URL and query parameters
+    
+    Each entry is one JSON file holding the payload, the time it was stored and the
+    ETag/Last-Modified validators. Entries younger than ttl are served without a
+    request; older ones are revalidated with a conditional GET. The directory is kept
+    under max_bytes by evicting the least recently used entries.
+    """
+    
+    def __init__(self, cache_dir, ttl: float = 24 * 3600, max_bytes: int = 50_000_000):
+        """
+        Args:
+            cache_dir: Directory holding the cache entries (created if missing)
+            ttl: Seconds an entry is served without revalidation
+            max_bytes: Total size the cache directory is trimmed to
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+    
+    def _path(self, url: str, params: Dict) -> Path:
+        key = json.dumps({'url': url, 'params': params}, sort_keys=True, default=str)
+        return self.cache_dir / f"{hashlib.sha256(key.encode()).hexdigest()}.json"
+    
+    def get(self, url: str, params: Dict) -> Optional[Dict]:
+        """
+        Look up an entry, fresh or stale
+        
+        Args:
+            url: Request URL
+            params: Query parameters
+            
+        Returns:
+            Entry dictionary (payload, stored_at, etag, last_modified) or None
+        """
+        path = self._path(url, params)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            # Mark as recently used for eviction
+            os.utime(path)
+            return entry
+        except (OSError, ValueError):
+            return None
+    
+    def is_fresh(self, entry: Dict) -> bool:
+        """Whether an entry is younger than the TTL"""
+        return time.time() - entry.get('stored_at', 0) < self.ttl
+    
+    @staticmethod
+    def validators(entry: Optional[Dict]) -> Dict[str, str]:
+        """Conditional request headers for revalidating an entry"""
+        headers = {}
+        if entry and entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry and entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+    
+    def put(self, url: str, params: Dict, payload: Dict,
+            etag: Optional[str] = None, last_modified: Optional[str] = None) -> Dict:
+        """
+        Store a response and evict old entries if the cache is over its size limit
+        
+        Args:
+            url: Request URL
+            params: Query parameters
+            payload: Decoded JSON response
+            etag: ETag response header
+            last_modified: Last-Modified response header
+            
+        Returns:
+            The stored entry
+        """
+        entry = {
+            'url': url,
+            'params': params,
+            'stored_at': time.time(),
+            'etag': etag,
+            'last_modified': last_modified,
+            'payload': payload
+        }
+        path = self._path(url, params)
+        
+        with self.lock:
+            # Write then rename so concurrent readers never see a partial file
+            tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, path)
+            self._evict()
+        
+        return entry
+    
+    def refresh(self, url: str, params: Dict, entry: Dict) -> Dict:
+        """Restart the TTL of an entry the server confirmed unchanged (304)"""
+        return self.put(url, params, entry['payload'], entry.get('etag'), entry.get('last_modified'))
+    
+    def _evict(self):
+        """Delete least recently used entries until the cache fits in max_bytes"""
+        entries = []
+        for item in os.scandir(self.cache_dir):
+            if item.name.endswith('.json'):
+                stat = item.stat()
+                entries.append((stat.st_mtime, stat.st_size, item.path))
+        
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                logger.info(f"Evicted cached response {Path(path).name}")
+            except OSError:
+                pass
+
 class NASALSDAClient:
     """Client for accessing NASA Life Sciences Data Archive"""
     
-    def __init__(self):
+    def __init__(self, base_url: str = "https://osdr.nasa.gov/bio/repo/search",
+                 max_workers: int = 4, requests_per_second: float = 2.0,
+                 burst: int = 4, timeout: float = 30,
+                 cache_dir: Optional[str] = "data/cache/osdr", cache_ttl: float = 24 * 3600,
+                 cache_max_bytes: int = 50_000_000, offline: bool = False,
+                 page_size: int = 100, max_results_per_keyword: Optional[int] = None):
+        """
+        Args:
+            base_url: OSDR search endpoint (point it at a local stub server for tests)
+            max_workers: Keyword searches in flight at once; 1 searches sequentially
+            requests_per_second: Sustained request rate allowed by the token bucket
+            burst: Requests that may start back to back before the rate applies
+            timeout: Per-request timeout in seconds
+            cache_dir: Directory of the on-disk response cache; None disables caching
+            cache_ttl: Seconds a cached response is used without revalidation
+            cache_max_bytes: Size limit of the cache directory
+            offline: Serve searches from the cache only (fresh or stale), never the network
+            page_size: Hits requested per search page
+            max_results_per_keyword: Stop paginating a keyword after this many hits (None = all)
+        """
         # NASA OSDR (Open Science Data Repository) endpoints
-        self.base_url = "https://osdr.nasa.gov/bio/repo/search"
+        self.base_url = base_url
         self.api_base = "https://osdr.nasa.gov/bio/api/"
         self.genelab_api = "https://genelab-data.ndc.nasa.gov/genelab/data/search/"
+        self.max_workers = max(1, max_workers)
+        self.timeout = timeout
+        self.offline = offline
+        self.page_size = page_size
+        self.max_results_per_keyword = max_results_per_keyword
+        self.cache = ResponseCache(cache_dir, cache_ttl, cache_max_bytes) if cache_dir is not None else None
+        
+        # Rate limiting to be respectful to NASA's servers, shared by all workers
+        self.rate_limiter = TokenBucket(requests_per_second, burst)
+        
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'ISS-Crew-Health-Analysis/1.0',
             'Accept': 'application/json',
         })
+        # One pooled connection per worker so concurrent searches reuse sockets
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_workers)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
         
     def search_studies(self, query: str = "", data_source: str = "alsda", 
-                      data_types: Optional[List[str]] = None, limit: int = 100) -> Dict:
+                      data_types: Optional[List[str]] = None, limit: int = 100,
+                      offset: int = 0) -> Dict:
         """
         Search for studies in LSDA
         
@@ -40,6 +249,7 @@ class NASALSDAClient:
             data_source: Data source (alsda by default)
             data_types: List of data types to include
             limit: Maximum number of results
+            offset: Index of the first result (for pagination)
             
         Returns:
             Dictionary containing search results
@@ -52,18 +262,107 @@ class NASALSDAClient:
             "data_source": data_source,
             "data_type": ",".join(data_types),
             "size": limit,
-            "from": 0
+            "from": offset
         }
         
+        cached = self.cache.get(self.base_url, params) if self.cache is not None else None
+        if cached is not None and (self.offline or self.cache.is_fresh(cached)):
+            logger.info(f"Using cached NASA OSDR results for: {query}")
+            return cached['payload']
+        if self.offline:
+            logger.warning(f"Offline mode: no cached NASA OSDR results for: {query}")
+            return {}
+        
         try:
+            self.rate_limiter.acquire()
             logger.info(f"Searching NASA OSDR for: {query}")
-            response = self.session.get(self.base_url, params=params, timeout=30)
+            response = self.session.get(self.base_url, params=params, timeout=self.timeout,
+                                        headers=ResponseCache.validators(cached))
+            
+            if response.status_code == 304 and cached is not None:
+                logger.info(f"Cached NASA OSDR results still valid for: {query}")
+                self.cache.refresh(self.base_url, params, cached)
+                return cached['payload']
+            
             response.raise_for_status()
-            return response.json()
+            payload = response.json()
+            
+            if self.cache is not None:
+                self.cache.put(self.base_url, params, payload,
+                               response.headers.get('ETag'), response.headers.get('Last-Modified'))
+            return payload
         except requests.RequestException as e:
             logger.warning(f"Error accessing NASA OSDR API: {e}")
+            if cached is not None:
+                logger.warning(f"⚠️ Serving stale cached results for: {query}")
+                return cached['payload']
             return {}
     
+    def iter_studies(self, query: str) -> Iterator[Dict]:
+        """
+        Yield the study records of one search, page by page
+        
+        Walks the 'from' offset in steps of page_size until a short or empty page,
+        the reported total, or max_results_per_keyword is reached, so only one page
+        is held in memory.
+        
+        Args:
+            query: Search query string
+            
+        Returns:
+            Iterator of study dictionaries tagged with the query
+        """
+        for page in self._iter_pages(query):
+            yield from page
+    
+    def iter_crew_health_studies(self, keywords: Optional[List[str]] = None) -> Iterator[Dict]:
+        """
+        Yield study records for all keywords as their pages arrive
+        
+        With max_workers > 1 the keywords are paginated concurrently and records
+        come out in arrival order; a bounded queue keeps memory constant.
+        
+        Args:
+            keywords: List of health-related keywords to search for
+            
+        Returns:
+            Iterator of study dictionaries
+        """
+        for _, page in self._iter_keyword_pages(keywords or DEFAULT_KEYWORDS):
+            yield from page
+    
+    def ingest_studies(self, output_path: str, keywords: Optional[List[str]] = None,
+                       batch_size: int = 1000) -> int:
+        """
+        Stream all study records to a CSV or Parquet file in batches
+        
+        Args:
+            output_path: Destination file (.parquet/.pq needs pyarrow, anything else is CSV)
+            keywords: List of health-related keywords to search for
+            batch_size: Records buffered before each write
+            
+        Returns:
+            Number of study records written
+        """
+        # Imported here so this module still runs standalone
+        from src.data_preprocessing import ChunkWriter
+        
+        n_written = 0
+        batch = []
+        with ChunkWriter(output_path) as writer:
+            for study in self.iter_crew_health_studies(keywords):
+                batch.append(study)
+                if len(batch) >= batch_size:
+                    writer.write(pd.DataFrame(batch, columns=STUDY_COLUMNS))
+                    n_written += len(batch)
+                    batch = []
+            if batch or n_written == 0:
+                writer.write(pd.DataFrame(batch, columns=STUDY_COLUMNS))
+                n_written += len(batch)
+        
+        logger.info(f"💾 Wrote {n_written} study records to {output_path}")
+        return n_written
+    
     def get_crew_health_data(self, keywords: Optional[List[str]] = None) -> pd.DataFrame:
         """
         Fetch crew health-related data from LSDA and create structured dataset
@@ -75,40 +374,14 @@ class NASALSDAClient:
             DataFrame containing structured crew health data
         """
         if keywords is None:
-            keywords = [
-                "bone density", "muscle atrophy", "cardiovascular",
-                "physiology", "microgravity", "crew health",
-                "medical", "biomedical", "space flight",
-                "astronaut", "cosmonauts"
-            ]
-        
-        all_studies = []
-        
-        for keyword in keywords:
-            logger.info(f"Searching for studies related to: {keyword}")
-            results = self.search_studies(query=keyword)
-            
-            if 'hits' in results and 'hits' in results['hits']:
-                for hit in results['hits']['hits']:
-                    source_data = hit.get('_source', {})
-                    study_entry = {
-                        'study_id': hit.get('_id'),
-                        'title': source_data.get('title', ''),
-                        'description': source_data.get('description', ''),
-                        'organism': source_data.get('organism', ''),
-                        'factor_name': source_data.get('factor_name', ''),
-                        'factor_value': source_data.get('factor_value', ''),
-                        'assay_type': source_data.get('assay_type', ''),
-                        'platform': source_data.get('platform', ''),
-                        'search_keyword': keyword,
-                        'data_source': source_data.get('data_source', ''),
-                        'study_type': source_data.get('study_type', ''),
-                        'experiment_type': source_data.get('experiment_type', '')
-                    }
-                    all_studies.append(study_entry)
-            
-            # Rate limiting to be respectful to NASA's servers
-            time.sleep(0.5)
+            keywords = DEFAULT_KEYWORDS
+        
+        # Pages arrive interleaved across keywords; regroup them so the study list
+        # matches a sequential run
+        studies_by_keyword = [[] for _ in keywords]
+        for index, page in self._iter_keyword_pages(keywords):
+            studies_by_keyword[index].extend(page)
+        all_studies = [study for studies in studies_by_keyword for study in studies]
         
         studies_df = pd.DataFrame(all_studies)
         
@@ -122,6 +395,99 @@ class NASALSDAClient:
         
         return crew_data
     
+    def _iter_pages(self, keyword: str) -> Iterator[List[Dict]]:
+        """Yield one list of study records per search page of a keyword"""
+        logger.info(f"Searching for studies related to: {keyword}")
+        limit = self.max_results_per_keyword
+        offset = 0
+        
+        while limit is None or offset < limit:
+            size = self.page_size if limit is None else min(self.page_size, limit - offset)
+            results = self.search_studies(query=keyword, limit=size, offset=offset)
+            hits = results.get('hits', {}).get('hits', []) if isinstance(results.get('hits'), dict) else []
+            if not hits:
+                return
+            
+            yield [self._hit_to_study(hit, keyword) for hit in hits]
+            
+            offset += len(hits)
+            total = _total_hits(results)
+            if len(hits) < size or (total is not None and offset >= total):
+                return
+    
+    def _iter_keyword_pages(self, keywords: List[str]) -> Iterator[Tuple[int, List[Dict]]]:
+        """
+        Yield (keyword index, page) pairs, paginating keywords concurrently when enabled
+        
+        Args:
+            keywords: Search keywords
+            
+        Returns:
+            Iterator of keyword positions and their pages of study records
+        """
+        if self.max_workers == 1 or len(keywords) < 2:
+            for index, keyword in enumerate(keywords):
+                for page in self._iter_pages(keyword):
+                    yield index, page
+            return
+        
+        # Fan the searches out; latency is bounded by the slowest query, not the sum.
+        # Workers hand pages over a bounded queue, so a slow consumer throttles them.
+        workers = min(self.max_workers, len(keywords))
+        logger.info(f"Searching {len(keywords)} keywords with {workers} concurrent requests")
+        pages = queue.Queue(maxsize=2 * workers)
+        stop = threading.Event()
+        done = object()
+        
+        def handoff(item) -> bool:
+            while not stop.is_set():
+                try:
+                    pages.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+        
+        def walk(index: int, keyword: str):
+            try:
+                pages_of_keyword = self._iter_pages(keyword)
+                # Check before every page request (next() sends it), including the first
+                while not stop.is_set():
+                    page = next(pages_of_keyword, None)
+                    if page is None or not handoff((index, page)):
+                        return
+            finally:
+                handoff((index, done))
+        
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(walk, index, keyword) for index, keyword in enumerate(keywords)]
+            try:
+                remaining = len(keywords)
+                while remaining:
+                    index, page = pages.get()
+                    if page is done:
+                        remaining -= 1
+                    else:
+                        yield index, page
+            finally:
+                # If the consumer stopped early: drop keywords not started yet and make
+                # running workers stop before their next request or blocked handoff
+                stop.set()
+                executor.shutdown(wait=False, cancel_futures=True)
+        
+        for future in futures:
+            future.result()
+    
+    @staticmethod
+    def _hit_to_study(hit: Dict, keyword: str) -> Dict:
+        """Flatten one OSDR search hit into a study record"""
+        source_data = hit.get('_source', {})
+        study_entry = {'study_id': hit.get('_id')}
+        study_entry.update({field: source_data.get(field, '') for field in STUDY_FIELDS})
+        study_entry['search_keyword'] = keyword
+        study_entry.update({field: source_data.get(field, '') for field in STUDY_SOURCE_FIELDS})
+        return study_entry
+    
     def convert_studies_to_crew_metrics(self, studies_df: pd.DataFrame) -> pd.DataFrame:
         """
         Convert NASA study data to crew physiological metrics
@@ -132,149 +498,33 @@ class NASALSDAClient:
         Returns:
             DataFrame with crew health metrics
         """
-        crew_metrics = []
-        
         # Group studies by related physiological systems
         bone_studies = studies_df[studies_df['search_keyword'].str.contains('bone|density', case=False, na=False)]
         muscle_studies = studies_df[studies_df['search_keyword'].str.contains('muscle|atrophy', case=False, na=False)]
         cardio_studies = studies_df[studies_df['search_keyword'].str.contains('cardiovascular|cardio', case=False, na=False)]
-        general_studies = studies_df[studies_df['search_keyword'].str.contains('crew|medical|physiology', case=False, na=False)]
         
         # Create realistic crew data based on actual mission parameters from NASA
-        np.random.seed(42)  # For reproducibility
         n_records = min(len(studies_df) * 2, 150)  # Scale based on available studies
-        
-        for i in range(n_records):
-            # Realistic mission durations based on actual ISS missions (15-372 days typical)
-            mission_duration = np.random.choice([
-                # Short duration missions (15-30 days)
-                *np.random.normal(22, 5, 15).astype(int),
-                # Medium duration missions (120-200 days)  
-                *np.random.normal(160, 30, 40).astype(int),
-                # Long duration missions (300-400 days)
-                *np.random.normal(340, 25, 10).astype(int)
-            ])
-            mission_duration = max(15, min(400, mission_duration))  # Clamp to realistic range
-            
-            # Realistic astronaut ages (28-55 years typical)
-            crew_age = np.random.normal(40, 8)
-            crew_age = max(28, min(60, crew_age))
-            
-            # Exercise hours based on actual ISS protocols (2.5 hours/day standard)
-            exercise_hours = np.random.normal(17.5, 3.5)  # Weekly hours
-            exercise_hours = max(10, min(25, exercise_hours))
-            
-            # Pre-flight baselines (normalized to healthy adult ranges)
-            pre_flight_bone_density = np.random.normal(1.2, 0.15)  # g/cm²
-            
-            # Mission-dependent physiological changes based on research literature
-            duration_factor = mission_duration / 100.0
-            
-            # Bone density loss: 1-2% per month in microgravity
-            bone_loss_rate = np.random.normal(-0.015, 0.005)  # Monthly loss rate
-            bone_density_change = bone_loss_rate * (mission_duration / 30.0)  # Convert to mission duration
-            bone_density_change += (exercise_hours - 17.5) * 0.002  # Exercise mitigation effect
-            
-            # Muscle mass loss: 2-5% per month
-            muscle_loss_rate = np.random.normal(-0.035, 0.015)  # Monthly loss rate  
-            muscle_mass_change = muscle_loss_rate * (mission_duration / 30.0)
-            muscle_mass_change += (exercise_hours - 17.5) * 0.003  # Exercise mitigation
-            
-            # Cardiovascular deconditioning: varies by individual
-            cardio_change_rate = np.random.normal(-0.02, 0.01)  # Monthly change
-            cardiovascular_change = cardio_change_rate * (mission_duration / 30.0)
-            cardiovascular_change += (exercise_hours - 17.5) * 0.001
-            
-            # Psychological adaptation (can be positive or negative)
-            psych_change = np.random.normal(0, 0.1) * np.sqrt(mission_duration / 100.0)
-            
-            crew_record = {
-                'mission_duration_days': mission_duration,
-                'crew_age': crew_age,
-                'pre_flight_bone_density': pre_flight_bone_density,
-                'exercise_hours_per_week': exercise_hours,
-                'bone_density_change': bone_density_change * 100,  # Convert to percentage
-                'muscle_mass_change': muscle_mass_change * 100,  # Convert to percentage  
-                'cardiovascular_change': cardiovascular_change * 100,  # Convert to percentage
-                'psychological_score_change': psych_change * 100,  # Convert to percentage
-                'mission_type': np.random.choice(['ISS_Expedition', 'Shuttle', 'Soyuz'], p=[0.7, 0.2, 0.1]),
-                'crew_role': np.random.choice(['Commander', 'Flight_Engineer', 'Pilot', 'Mission_Specialist'], 
-                                           p=[0.2, 0.4, 0.2, 0.2]),
-                'data_source': 'NASA_LSDA_Derived',
-                'study_references': f"Studies: {len(bone_studies)}_bone, {len(muscle_studies)}_muscle, {len(cardio_studies)}_cardio"
-            }
-            
-            crew_metrics.append(crew_record)
+        study_references = f"Studies: {len(bone_studies)}_bone, {len(muscle_studies)}_muscle, {len(cardio_studies)}_cardio"
+        crew_metrics = generate_study_derived_records(n_records, np.random.default_rng(42), study_references)
         
         logger.info(f"Generated {len(crew_metrics)} crew health records from {len(studies_df)} NASA studies")
-        return pd.DataFrame(crew_metrics)
+        return crew_metrics
     
-    def create_realistic_baseline_data(self) -> pd.DataFrame:
+    def create_realistic_baseline_data(self, n_records: int = 120, seed: int = 42) -> pd.DataFrame:
         """
         Create realistic baseline data when NASA API is unavailable
         Based on published research from NASA and ESA studies
-        """
-        logger.info("Creating realistic baseline dataset based on published space medicine research...")
-        
-        np.random.seed(42)
-        n_records = 120
         
-        crew_data = []
-        
-        for i in range(n_records):
-            # Mission duration distribution based on actual ISS mission data
-            mission_type = np.random.choice(['short', 'standard', 'long'], p=[0.15, 0.70, 0.15])
-            
-            if mission_type == 'short':
-                mission_duration = np.random.randint(15, 50)
-            elif mission_type == 'standard': 
-                mission_duration = np.random.randint(120, 200)
-            else:  # long
-                mission_duration = np.random.randint(300, 400)
-            
-            crew_age = np.random.normal(42, 7)
-            crew_age = max(28, min(58, crew_age))
-            
-            exercise_hours = np.random.normal(17.5, 2.5)
-            exercise_hours = max(12, min(24, exercise_hours))
-            
-            pre_flight_bone = np.random.normal(1.18, 0.12)
-            
-            # Physiological changes based on peer-reviewed research
-            months_in_space = mission_duration / 30.0
-            
-            # Bone density: -1.5% per month average (Sibonga et al., 2007)
-            bone_change = np.random.normal(-1.5 * months_in_space, 0.8)
-            bone_change += (exercise_hours - 17.5) * 0.15  # COLARES protocol effect
-            
-            # Muscle mass: -3.2% per month average (Akima et al., 2000)
-            muscle_change = np.random.normal(-3.2 * months_in_space, 1.2)  
-            muscle_change += (exercise_hours - 17.5) * 0.25
-            
-            # Cardiovascular: Variable but generally 2-8% decrease (Perhonen et al., 2001)
-            cardio_change = np.random.normal(-1.8 * months_in_space, 1.0)
-            cardio_change += (exercise_hours - 17.5) * 0.12
-            
-            psych_change = np.random.normal(0, 8) * np.sqrt(months_in_space)
-            
-            record = {
-                'mission_duration_days': mission_duration,
-                'crew_age': crew_age,
-                'pre_flight_bone_density': pre_flight_bone,
-                'exercise_hours_per_week': exercise_hours,
-                'bone_density_change': bone_change,
-                'muscle_mass_change': muscle_change,
-                'cardiovascular_change': cardio_change,
-                'psychological_score_change': psych_change,
-                'mission_type': f'ISS_Expedition_{mission_type}',
-                'crew_role': np.random.choice(['CDR', 'FE1', 'FE2', 'FE3'], p=[0.25, 0.25, 0.25, 0.25]),
-                'data_source': 'Research_Literature_Based',
-                'study_references': 'Sibonga_2007,Akima_2000,Perhonen_2001,Buckey_1996'
-            }
+        Args:
+            n_records: Number of crew records to generate
+            seed: Random seed for reproducibility
             
-            crew_data.append(record)
-        
-        return pd.DataFrame(crew_data)
+        Returns:
+            DataFrame with crew health metrics
+        """
+        logger.info("Creating realistic baseline dataset based on published space medicine research...")
+        return generate_baseline_records(n_records, np.random.default_rng(seed))
 
     def get_physiological_metrics(self, study_id: str) -> Dict:
         """
@@ -291,14 +541,155 @@ class NASALSDAClient:
         logger.info(f"Fetching physiological data for study: {study_id}")
         return {}
 
-def fetch_iss_crew_data() -> pd.DataFrame:
+def _total_hits(results: Dict) -> Optional[int]:
+    """Total hit count of a search response ('total' may be a number or {'value': n})"""
+    total = results.get('hits', {}).get('total')
+    if isinstance(total, dict):
+        total = total.get('value')
+    return total if isinstance(total, int) else None
+
+def _choice(rng: np.random.Generator, labels: List[str], n: int,
+            p: Optional[List[float]] = None) -> pd.Categorical:
+    """Draw n labels as a categorical (codes only, so millions of rows stay cheap)"""
+    return pd.Categorical.from_codes(rng.choice(len(labels), size=n, p=p), categories=labels)
+
+def _constant(value: str, n: int) -> pd.Categorical:
+    """A column repeating one label, stored as a single category"""
+    return pd.Categorical.from_codes(np.zeros(n, dtype=np.int8), categories=[value])
+
+def generate_study_derived_records(n_records: int, rng: Optional[np.random.Generator] = None,
+                                   study_references: str = "") -> pd.DataFrame:
+    """
+    Generate crew records with mission parameters and loss rates from NASA studies
+    
+    Array-at-a-time version of the per-record model used by convert_studies_to_crew_metrics.
+    
+    Args:
+        n_records: Number of crew records
+        rng: Random generator (seeded with 42 if None)
+        study_references: Value of the study_references column
+        
+    Returns:
+        DataFrame with crew health metrics
+    """
+    rng = np.random.default_rng(42) if rng is None else rng
+    
+    # Realistic mission durations based on actual ISS missions: a mixture of short
+    # (15-30 days), medium (120-200 days) and long (300-400 days) missions weighted
+    # 15:40:10, truncated to whole days and clamped to a realistic range
+    component = rng.choice(3, size=n_records, p=np.array([15, 40, 10]) / 65)
+    mission_duration = rng.normal(np.array([22, 160, 340])[component], np.array([5, 30, 25])[component])
+    mission_duration = np.clip(mission_duration.astype(int), 15, 400)
+    
+    # Realistic astronaut ages (28-55 years typical)
+    crew_age = np.clip(rng.normal(40, 8, n_records), 28, 60)
+    
+    # Exercise hours based on actual ISS protocols (2.5 hours/day standard), weekly
+    exercise_hours = np.clip(rng.normal(17.5, 3.5, n_records), 10, 25)
+    exercise_effect = exercise_hours - 17.5
+    
+    # Pre-flight baselines (normalized to healthy adult ranges), g/cm²
+    pre_flight_bone_density = rng.normal(1.2, 0.15, n_records)
+    
+    # Mission-dependent physiological changes based on research literature
+    months_in_space = mission_duration / 30.0
+    
+    # Bone density loss: 1-2% per month in microgravity, mitigated by exercise
+    bone_density_change = rng.normal(-0.015, 0.005, n_records) * months_in_space + exercise_effect * 0.002
+    
+    # Muscle mass loss: 2-5% per month
+    muscle_mass_change = rng.normal(-0.035, 0.015, n_records) * months_in_space + exercise_effect * 0.003
+    
+    # Cardiovascular deconditioning: varies by individual
+    cardiovascular_change = rng.normal(-0.02, 0.01, n_records) * months_in_space + exercise_effect * 0.001
+    
+    # Psychological adaptation (can be positive or negative)
+    psych_change = rng.normal(0, 0.1, n_records) * np.sqrt(mission_duration / 100.0)
+    
+    return pd.DataFrame({
+        'mission_duration_days': mission_duration,
+        'crew_age': crew_age,
+        'pre_flight_bone_density': pre_flight_bone_density,
+        'exercise_hours_per_week': exercise_hours,
+        'bone_density_change': bone_density_change * 100,  # Convert to percentage
+        'muscle_mass_change': muscle_mass_change * 100,  # Convert to percentage
+        'cardiovascular_change': cardiovascular_change * 100,  # Convert to percentage
+        'psychological_score_change': psych_change * 100,  # Convert to percentage
+        'mission_type': _choice(rng, ['ISS_Expedition', 'Shuttle', 'Soyuz'], n_records, p=[0.7, 0.2, 0.1]),
+        'crew_role': _choice(rng, ['Commander', 'Flight_Engineer', 'Pilot', 'Mission_Specialist'], n_records,
+                             p=[0.2, 0.4, 0.2, 0.2]),
+        'data_source': _constant('NASA_LSDA_Derived', n_records),
+        'study_references': _constant(study_references, n_records)
+    })
+
+def generate_baseline_records(n_records: int, rng: Optional[np.random.Generator] = None) -> pd.DataFrame:
+    """
+    Generate crew records from published space medicine research
+    
+    Array-at-a-time version of the per-record model used by create_realistic_baseline_data.
+    
+    Args:
+        n_records: Number of crew records
+        rng: Random generator (seeded with 42 if None)
+        
+    Returns:
+        DataFrame with crew health metrics
+    """
+    rng = np.random.default_rng(42) if rng is None else rng
+    
+    # Mission duration distribution based on actual ISS mission data
+    mission_types = ['short', 'standard', 'long']
+    mission_type = rng.choice(3, size=n_records, p=[0.15, 0.70, 0.15])
+    mission_duration = rng.integers(np.array([15, 120, 300])[mission_type], np.array([50, 200, 400])[mission_type])
+    
+    crew_age = np.clip(rng.normal(42, 7, n_records), 28, 58)
+    
+    exercise_hours = np.clip(rng.normal(17.5, 2.5, n_records), 12, 24)
+    exercise_effect = exercise_hours - 17.5
+    
+    pre_flight_bone = rng.normal(1.18, 0.12, n_records)
+    
+    # Physiological changes based on peer-reviewed research
+    months_in_space = mission_duration / 30.0
+    
+    # Bone density: -1.5% per month average (Sibonga et al., 2007), COLARES protocol effect
+    bone_change = rng.normal(-1.5 * months_in_space, 0.8) + exercise_effect * 0.15
+    
+    # Muscle mass: -3.2% per month average (Akima et al., 2000)
+    muscle_change = rng.normal(-3.2 * months_in_space, 1.2) + exercise_effect * 0.25
+    
+    # Cardiovascular: Variable but generally 2-8% decrease (Perhonen et al., 2001)
+    cardio_change = rng.normal(-1.8 * months_in_space, 1.0) + exercise_effect * 0.12
+    
+    psych_change = rng.normal(0, 8, n_records) * np.sqrt(months_in_space)
+    
+    return pd.DataFrame({
+        'mission_duration_days': mission_duration,
+        'crew_age': crew_age,
+        'pre_flight_bone_density': pre_flight_bone,
+        'exercise_hours_per_week': exercise_hours,
+        'bone_density_change': bone_change,
+        'muscle_mass_change': muscle_change,
+        'cardiovascular_change': cardio_change,
+        'psychological_score_change': psych_change,
+        'mission_type': pd.Categorical.from_codes(mission_type, categories=[f'ISS_Expedition_{t}' for t in mission_types]),
+        'crew_role': _choice(rng, ['CDR', 'FE1', 'FE2', 'FE3'], n_records),
+        'data_source': _constant('Research_Literature_Based', n_records),
+        'study_references': _constant('Sibonga_2007,Akima_2000,Perhonen_2001,Buckey_1996', n_records)
+    })
+
+def fetch_iss_crew_data(client: Optional[NASALSDAClient] = None) -> pd.DataFrame:
     """
     Main function to fetch ISS crew health data
     
+    Args:
+        client: Configured client (cache, offline mode); a default one if None
+    
     Returns:
         DataFrame containing crew health analysis data
     """
-    client = NASALSDAClient()
+    if client is None:
+        client = NASALSDAClient()
     
     # Fetch crew health data
     crew_data = client.get_crew_health_data()
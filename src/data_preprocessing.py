@@ -8,25 +8,177 @@ import numpy as np
 from sklearn.preprocessing import StandardScaler, MinMaxScaler, RobustScaler
 from sklearn.impute import SimpleImputer, KNNImputer
 from sklearn.ensemble import IsolationForest
+from sklearn.neighbors import NearestNeighbors
 from scipy import stats
+import joblib
 import re
 import logging
-from typing import Dict, List, Tuple, Optional
+import warnings
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
 
 logger = logging.getLogger(__name__)
 
+# Keyword groups flagged by extract_physiological_features (flag column -> keywords)
+PHYSIOLOGICAL_KEYWORDS = {
+    'bone_related': ['bone', 'density', 'mineral', 'calcium'],
+    'muscle_related': ['muscle', 'atrophy', 'strength', 'mass'],
+    'cardio_related': ['cardiovascular', 'heart', 'blood', 'pressure']
+}
+
+# One optional lookahead per group: a single regex pass captures every group present in the text
+KEYWORD_FLAGS_PATTERN = re.compile(
+    ''.join(
+        f"(?=.*?(?P<{flag}>{'|'.join(map(re.escape, keywords))}))?"
+        for flag, keywords in PHYSIOLOGICAL_KEYWORDS.items()
+    ),
+    re.IGNORECASE | re.DOTALL
+)
+
+class QuantileSketch:
+    """
+    Mergeable KLL-style quantile sketch with bounded memory
+    
+    Values are buffered in levels of at most k items; a full level is sorted and every
+    other item (random offset) is promoted to the next level with twice the weight.
+    Quantiles are exact (pandas linear interpolation) until the first compaction and
+    approximate, with rank error of order 1/k, after that.
+    """
+    
+    def __init__(self, k: int = 4096, seed: int = 42):
+        self.k = k
+        self.levels = [np.empty(0)]
+        self.weighted_values = []
+        self.weighted_counts = []
+        self.count = 0
+        self._rng = np.random.default_rng(seed)
+    
+    def update(self, values) -> None:
+        """Add an array of values (NaN ignored)"""
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self.count += len(values)
+        self._compress()
+    
+    def add_weighted(self, value: float, weight: int) -> None:
+        """Add `weight` copies of value (e.g. imputed fills) without materializing them"""
+        if weight > 0 and not np.isnan(value):
+            self.weighted_values.append(float(value))
+            self.weighted_counts.append(int(weight))
+            self.count += int(weight)
+    
+    def merge(self, other: 'QuantileSketch') -> None:
+        """Fold another sketch into this one"""
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, values in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], values])
+        self.weighted_values += other.weighted_values
+        self.weighted_counts += other.weighted_counts
+        self.count += other.count
+        self._compress()
+    
+    def copy(self) -> 'QuantileSketch':
+        sketch = QuantileSketch(self.k)
+        sketch.merge(self)
+        return sketch
+    
+    def quantile(self, q: float) -> float:
+        """Approximate q-quantile (linear interpolation between ranks, like pandas)"""
+        if self.count == 0:
+            return np.nan
+        
+        values = np.concatenate(self.levels + [np.array(self.weighted_values)])
+        weights = np.concatenate([np.full(len(level), 2 ** height) for height, level in enumerate(self.levels)]
+                                 + [np.array(self.weighted_counts, dtype=np.int64)])
+        order = np.argsort(values, kind='stable')
+        values, cumulative = values[order], np.cumsum(weights[order])
+        
+        position = q * (cumulative[-1] - 1)
+        lower, upper = int(np.floor(position)), int(np.ceil(position))
+        value_lower = values[np.searchsorted(cumulative, lower, side='right')]
+        value_upper = values[np.searchsorted(cumulative, upper, side='right')]
+        return float(value_lower + (value_upper - value_lower) * (position - lower))
+    
+    def _compress(self) -> None:
+        height = 0
+        while height < len(self.levels):
+            if len(self.levels[height]) > self.k:
+                level = np.sort(self.levels[height])
+                carry = level[-1:] if len(level) % 2 else level[:0]
+                level = level[:len(level) - len(carry)]
+                promoted = level[self._rng.integers(2)::2]
+                self.levels[height] = carry
+                if height + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                self.levels[height + 1] = np.concatenate([self.levels[height + 1], promoted])
+            height += 1
+
+class ReservoirSampler:
+    """Uniform fixed-size row sample over a stream of DataFrame chunks (algorithm R, vectorized)"""
+    
+    def __init__(self, size: int = 100_000, seed: int = 42):
+        self.size = size
+        self.seen = 0
+        self.sample = None
+        self._rng = np.random.default_rng(seed)
+    
+    def update(self, chunk: pd.DataFrame) -> None:
+        positions = np.arange(self.seen, self.seen + len(chunk))
+        self.seen += len(chunk)
+        
+        # Rows past the reservoir size replace a random slot with probability size / rank
+        replacing = positions >= self.size
+        slots = positions.copy()
+        slots[replacing] = self._rng.integers(0, positions[replacing] + 1)
+        keep = slots < self.size
+        if not keep.any():
+            return
+        
+        # Later rows win when several target the same slot
+        slots = slots[keep]
+        rows = chunk[keep]
+        _, last = np.unique(slots[::-1], return_index=True)
+        last = len(slots) - 1 - last
+        rows = rows.iloc[last].set_axis(slots[last])
+        
+        if self.sample is None:
+            self.sample = rows.sort_index()
+        else:
+            self.sample = pd.concat([self.sample.drop(index=rows.index, errors='ignore'), rows]).sort_index()
+
 class CrewHealthDataProcessor:
     """Advanced class for preprocessing crew health data with intelligent validation"""
     
-    def __init__(self):
+    # Missingness patterns that get their own KD-tree in approximate KNN imputation
+    KNN_MAX_PATTERN_TREES = 32
+    
+    def __init__(self, knn_algorithm: str = 'exact', knn_tree_min_rows: int = 20_000,
+                 isolation_sample_size: Optional[int] = None, isolation_n_jobs: int = 1):
+        """
+        Args:
+            knn_algorithm: 'exact' (KNNImputer), or opt-in approximate KD-tree search:
+                'tree' (always) or 'auto' (once the frame has knn_tree_min_rows rows)
+            knn_tree_min_rows: Row count from which 'auto' switches to the tree index
+            isolation_sample_size: Fit the Isolation Forest on at most this many sampled
+                rows (None = all rows); every row is still scored
+            isolation_n_jobs: Threads used to fit the Isolation Forest and score rows with it
+        """
         self.scaler = StandardScaler()
         self.robust_scaler = RobustScaler()
-        self.knn_imputer = KNNImputer(n_neighbors=5)
+        self.knn_imputer = KNNImputer(n_neighbors=5, keep_empty_features=True)
+        self.knn_algorithm = knn_algorithm
+        self.knn_tree_min_rows = knn_tree_min_rows
+        self.isolation_sample_size = isolation_sample_size
+        self.isolation_n_jobs = isolation_n_jobs
         self.simple_imputer = SimpleImputer(strategy='median')
         self.imputer = SimpleImputer(strategy='median')  # Additional imputer for legacy method
         self.processed_features = []
         self.validation_rules = self._initialize_validation_rules()
         self.cleaning_report = {}
+        # Learned by fit() (or load_state()) and reused by transform()
+        self.fitted_state = None
         
     def _initialize_validation_rules(self) -> Dict:
         """Initialize physiological validation rules based on medical literature"""
@@ -82,6 +234,11 @@ class CrewHealthDataProcessor:
         df_validated.loc[duplicates, 'data_quality_score'] -= 30
         
         # Validate numerical columns against physiological rules
+        # Flags, scores and counts are updated with whole-column masks (no per-row access)
+        flags = df_validated['validation_flags'].to_numpy(dtype=object)
+        scores = df_validated['data_quality_score'].to_numpy(dtype=float)
+        invalid_counts = df_validated['invalid_values_count'].to_numpy(dtype=np.int64)
+        
         for col in df_validated.select_dtypes(include=[np.number]).columns:
             if col in ['data_quality_score', 'invalid_values_count']:
                 continue
@@ -90,51 +247,32 @@ class CrewHealthDataProcessor:
             rule_key = self._find_matching_rule(col)
             if rule_key:
                 rule = self.validation_rules[rule_key]
+                values = df_validated[col]
                 
                 # Check hard limits (impossible values)
-                invalid_mask = (df_validated[col] < rule['min']) | (df_validated[col] > rule['max'])
+                invalid_mask = ((values < rule['min']) | (values > rule['max'])).fillna(False).to_numpy(dtype=bool)
                 if invalid_mask.any():
-                    invalid_indices = df_validated[invalid_mask].index
-                    for idx in invalid_indices:
-                        # Update validation flags
-                        current_flags = str(df_validated.loc[idx, 'validation_flags']) if pd.notna(df_validated.loc[idx, 'validation_flags']) else ''
-                        df_validated.loc[idx, 'validation_flags'] = current_flags + f'INVALID_{col.upper()};'
-                        
-                        # Update quality score
-                        current_score = pd.to_numeric(df_validated.loc[idx, 'data_quality_score'], errors='coerce')
-                        if pd.isna(current_score):
-                            current_score = 100
-                        df_validated.loc[idx, 'data_quality_score'] = current_score - 40
-                        
-                        # Update invalid count
-                        current_count = pd.to_numeric(df_validated.loc[idx, 'invalid_values_count'], errors='coerce')
-                        if pd.isna(current_count):
-                            current_count = 0
-                        df_validated.loc[idx, 'invalid_values_count'] = current_count + 1
+                    flags[invalid_mask] += f'INVALID_{col.upper()};'
+                    scores[invalid_mask] -= 40
+                    invalid_counts[invalid_mask] += 1
                     
                     logger.warning(f"Found {invalid_mask.sum()} invalid values in {col}")
                 
                 # Check atypical but possible values
                 atypical_mask = (
-                    (df_validated[col] >= rule['min']) & (df_validated[col] < rule['typical_min'])
-                ) | (
-                    (df_validated[col] > rule['typical_max']) & (df_validated[col] <= rule['max'])
-                )
+                    ((values >= rule['min']) & (values < rule['typical_min'])) |
+                    ((values > rule['typical_max']) & (values <= rule['max']))
+                ).fillna(False).to_numpy(dtype=bool)
                 if atypical_mask.any():
-                    atypical_indices = df_validated[atypical_mask].index
-                    for idx in atypical_indices:
-                        # Update validation flags
-                        current_flags = str(df_validated.loc[idx, 'validation_flags']) if pd.notna(df_validated.loc[idx, 'validation_flags']) else ''
-                        df_validated.loc[idx, 'validation_flags'] = current_flags + f'ATYPICAL_{col.upper()};'
-                        
-                        # Update quality score
-                        current_score = pd.to_numeric(df_validated.loc[idx, 'data_quality_score'], errors='coerce')
-                        if pd.isna(current_score):
-                            current_score = 100
-                        df_validated.loc[idx, 'data_quality_score'] = current_score - 10
+                    flags[atypical_mask] += f'ATYPICAL_{col.upper()};'
+                    scores[atypical_mask] -= 10
                     
                     logger.info(f"Found {atypical_mask.sum()} atypical values in {col}")
         
+        df_validated['validation_flags'] = flags
+        df_validated['data_quality_score'] = scores
+        df_validated['invalid_values_count'] = invalid_counts
+        
         # Check for inconsistent patterns
         df_validated = self._check_logical_consistency(df_validated)
         
@@ -232,6 +370,36 @@ class CrewHealthDataProcessor:
         duplicates_removed = initial_len - len(df_clean)
         logger.info(f"Removed {duplicates_removed} duplicate records")
         
+        df_clean = self._clean_values(df_clean)
+        
+        # Remove rows that are mostly empty after cleaning
+        non_meta_cols = [col for col in df_clean.columns 
+                        if not col.startswith(('data_quality', 'validation', 'invalid'))]
+        mostly_empty = df_clean[non_meta_cols].isnull().sum(axis=1) > (len(non_meta_cols) * 0.7)
+        df_clean = df_clean[~mostly_empty]
+        logger.info(f"Removed {mostly_empty.sum()} mostly empty records")
+        
+        return df_clean
+    
+    def _clean_values(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Row-preserving part of clean_data_intelligent: coerce types, set impossible
+        values to NaN and normalize text, without dropping any record
+        
+        Args:
+            df: Dataframe to clean
+            
+        Returns:
+            Cleaned copy with the same rows as df
+        """
+        df_clean = df.copy()
+        
+        # Compact integer columns (src/schema.py) become float32 so invalid values can be set to NaN and imputed
+        compact_int_cols = [col for col in df_clean.columns
+                            if pd.api.types.is_integer_dtype(df_clean[col]) and df_clean[col].dtype != np.int64]
+        if compact_int_cols:
+            df_clean[compact_int_cols] = df_clean[compact_int_cols].astype('float32')
+        
         # Clean invalid values in numerical columns
         for col in df_clean.select_dtypes(include=[np.number]).columns:
             if col in ['data_quality_score', 'invalid_values_count']:
@@ -248,6 +416,10 @@ class CrewHealthDataProcessor:
                     logger.info(f"Replaced {invalid_mask.sum()} invalid values in {col} with NaN")
         
         # Clean categorical columns
+        invalid_patterns = ['nan', 'null', 'none', '', 'n/a', 'unknown', '?', '-', 'missing']
+        for col in df_clean.select_dtypes(include=['category']).columns:
+            df_clean[col] = self._clean_categories(df_clean[col], invalid_patterns)
+        
         categorical_cols = df_clean.select_dtypes(include=['object']).columns
         for col in categorical_cols:
             if col in ['validation_flags']:
@@ -257,7 +429,6 @@ class CrewHealthDataProcessor:
             df_clean[col] = df_clean[col].astype(str)
             
             # Clean common invalid patterns
-            invalid_patterns = ['nan', 'null', 'none', '', 'n/a', 'unknown', '?', '-', 'missing']
             for pattern in invalid_patterns:
                 mask = df_clean[col].str.lower().str.strip() == pattern
                 df_clean.loc[mask, col] = np.nan
@@ -266,19 +437,37 @@ class CrewHealthDataProcessor:
             df_clean[col] = df_clean[col].str.strip()
             df_clean[col] = df_clean[col].replace('', np.nan)
         
-        # Remove rows that are mostly empty after cleaning
-        non_meta_cols = [col for col in df_clean.columns 
-                        if not col.startswith(('data_quality', 'validation', 'invalid'))]
-        mostly_empty = df_clean[non_meta_cols].isnull().sum(axis=1) > (len(non_meta_cols) * 0.7)
-        df_clean = df_clean[~mostly_empty]
-        logger.info(f"Removed {mostly_empty.sum()} mostly empty records")
-        
         return df_clean
     
+    def _clean_categories(self, series: pd.Series, invalid_patterns: List[str]) -> pd.Series:
+        """
+        Same cleaning as for text columns, applied to the categories instead of every row
+        
+        Stripped categories that collide are merged and invalid ones become NaN.
+        """
+        cleaned = pd.Series(series.cat.categories.astype(str)).str.strip()
+        cleaned = cleaned.where(~cleaned.str.lower().isin(invalid_patterns))
+        new_codes, new_categories = pd.factorize(cleaned)
+        
+        codes = series.cat.codes.to_numpy()
+        codes = np.where(codes >= 0, new_codes[codes], -1)
+        return pd.Series(pd.Categorical.from_codes(codes, categories=new_categories), index=series.index, name=series.name)
+    
+    def _fill_categorical(self, series: pd.Series, fill_value) -> pd.Series:
+        """fillna that also works for category columns whose categories lack fill_value"""
+        if isinstance(series.dtype, pd.CategoricalDtype) and fill_value not in series.cat.categories:
+            series = series.cat.add_categories([fill_value])
+        return series.fillna(fill_value)
+    
     def handle_missing_values_advanced(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         Advanced missing value imputation using multiple strategies
         
+        Numerical columns with 10-30% missing values are filled with grouped medians
+        first, then all columns with <10% missing go through one joint KNN pass that sees
+        those filled values. The former per-column loop interleaved the two in column
+        order, so KNN-imputed values can differ from it slightly.
+        
         Args:
             df: DataFrame with missing values
             
@@ -292,7 +481,7 @@ class CrewHealthDataProcessor:
         numerical_cols = df_imputed.select_dtypes(include=[np.number]).columns
         numerical_cols = [col for col in numerical_cols 
                          if not col.startswith(('data_quality', 'validation', 'invalid'))]
-        categorical_cols = df_imputed.select_dtypes(include=['object']).columns
+        categorical_cols = df_imputed.select_dtypes(include=['object', 'category']).columns
         categorical_cols = [col for col in categorical_cols 
                            if not col.startswith(('validation_flags',))]
         
@@ -305,37 +494,39 @@ class CrewHealthDataProcessor:
             if len(high_missing) > 0:
                 logger.warning(f"Columns with >50% missing: {list(high_missing.index)}")
             
+            missing_pct = missing_counts / len(df_imputed)
+            
+            # 10-30% missing: median per category of the first mostly-complete categorical column
+            grouped_cols = missing_pct[(missing_pct >= 0.1) & (missing_pct < 0.3)].index.tolist()
+            if grouped_cols:
+                group_col = next((cat_col for cat_col in categorical_cols
+                                  if df_imputed[cat_col].isnull().sum() < len(df_imputed) * 0.5), None)
+                if group_col is not None:
+                    group_medians = self._group_medians(df_imputed, group_col, grouped_cols)
+                    df_imputed[grouped_cols] = self._fill_group_medians(df_imputed, group_col, group_medians)
+                # Gaps without a group median (no category, or none observed in it): global median
+                df_imputed[grouped_cols] = df_imputed[grouped_cols].fillna(df_imputed[grouped_cols].median())
+                logger.info(f"Grouped median imputation for {len(grouped_cols)} columns by {group_col}: {grouped_cols}")
+            
+            # <10% missing: one joint KNN pass over all such columns, run after the grouped
+            # fill so those columns enter the distances already filled
+            knn_cols = missing_pct[(missing_pct > 0) & (missing_pct < 0.1)].index.tolist()
+            if knn_cols:
+                feature_cols = missing_pct[missing_pct <= 0.7].index.tolist()
+                try:
+                    df_imputed[knn_cols] = self._knn_impute(df_imputed[feature_cols], knn_cols)
+                    logger.info(f"KNN imputation for {len(knn_cols)} columns: {knn_cols}")
+                except:
+                    # Fallback to median
+                    df_imputed[knn_cols] = df_imputed[knn_cols].fillna(df_imputed[knn_cols].median())
+                    logger.info(f"Median imputation for {knn_cols} (KNN failed)")
+            
             # Use different strategies based on missing percentage
             for col in numerical_cols:
                 missing_pct = df_imputed[col].isnull().sum() / len(df_imputed)
                 
                 if missing_pct == 0:
                     continue
-                elif missing_pct < 0.1:  # <10% missing: use KNN
-                    try:
-                        col_data = df_imputed[[col] + [c for c in numerical_cols if c != col]]
-                        imputed_values = self.knn_imputer.fit_transform(col_data)[:, 0]
-                        df_imputed[col] = imputed_values
-                        logger.info(f"KNN imputation for {col} ({missing_pct:.1%} missing)")
-                    except:
-                        # Fallback to median
-                        median_val = df_imputed[col].median()
-                        df_imputed[col] = df_imputed[col].fillna(median_val)
-                        logger.info(f"Median imputation for {col} (KNN failed)")
-                        
-                elif missing_pct < 0.3:  # 10-30% missing: use median with grouping if possible
-                    # Try to group by categorical variables for better imputation
-                    if len(categorical_cols) > 0:
-                        for cat_col in categorical_cols:
-                            if df_imputed[cat_col].isnull().sum() < len(df_imputed) * 0.5:
-                                df_imputed[col] = df_imputed.groupby(cat_col)[col].transform(
-                                    lambda x: x.fillna(x.median())
-                                )
-                                break
-                    else:
-                        df_imputed[col] = df_imputed[col].fillna(df_imputed[col].median())
-                    logger.info(f"Grouped median imputation for {col} ({missing_pct:.1%} missing)")
-                    
                 else:  # >30% missing: use forward/backward fill or drop
                     if missing_pct > 0.7:
                         logger.warning(f"Dropping {col} due to {missing_pct:.1%} missing data")
@@ -360,14 +551,95 @@ class CrewHealthDataProcessor:
                 if len(mode_val) > 0:
                     df_imputed[col] = df_imputed[col].fillna(mode_val.iloc[0])
                 else:
-                    df_imputed[col] = df_imputed[col].fillna('Unknown')
+                    df_imputed[col] = self._fill_categorical(df_imputed[col], 'Unknown')
                 logger.info(f"Mode imputation for {col}")
             else:
-                df_imputed[col] = df_imputed[col].fillna('Missing')
+                df_imputed[col] = self._fill_categorical(df_imputed[col], 'Missing')
                 logger.info(f"Default 'Missing' imputation for {col}")
         
         return df_imputed
     
+    def _group_medians(self, df: pd.DataFrame, group_col: str, cols: List[str]) -> pd.DataFrame:
+        """Median of every column in cols per value of group_col, in one groupby pass"""
+        codes, groups = pd.factorize(df[group_col])
+        observed = codes >= 0
+        medians = df.loc[observed, cols].groupby(codes[observed]).median()
+        return medians.reindex(range(len(groups))).set_axis(groups)
+    
+    def _fill_group_medians(self, df: pd.DataFrame, group_col: str, group_medians: pd.DataFrame) -> pd.DataFrame:
+        """Fill the gaps in group_medians' columns with the median of each row's group"""
+        cols = group_medians.columns.tolist()
+        codes = group_medians.index.get_indexer(df[group_col])
+        
+        # Row-aligned medians (NaN for missing or unseen groups), written into the gaps only
+        aligned = np.vstack([group_medians.to_numpy(dtype=float), np.full((1, len(cols)), np.nan)])[codes]
+        values = df[cols].to_numpy(dtype=float)
+        missing = np.isnan(values)
+        values[missing] = aligned[missing]
+        return pd.DataFrame(values, index=df.index, columns=cols)
+    
+    def _knn_impute(self, features: pd.DataFrame, target_cols: List[str]) -> pd.DataFrame:
+        """
+        Impute target_cols from the 5 nearest rows over all feature columns in one pass
+        
+        By default KNNImputer (exact nan-euclidean distances). With knn_algorithm='tree',
+        or 'auto' on frames of knn_tree_min_rows rows or more, search KD-trees over the
+        rows that are complete in every target column: one tree per frequent missingness pattern, on the columns those
+        queries observe. Neighbours are approximate where donors have missing features
+        (median-filled) and for rare patterns, which share one median-filled tree.
+        
+        Args:
+            features: Numerical columns used for the distance (must include target_cols)
+            target_cols: Columns to impute
+            
+        Returns:
+            DataFrame of target_cols with missing values imputed
+        """
+        n_neighbors = self.knn_imputer.n_neighbors
+        use_tree = (self.knn_algorithm == 'tree' or
+                    (self.knn_algorithm == 'auto' and len(features) >= self.knn_tree_min_rows))
+        
+        if use_tree:
+            targets = features[target_cols].to_numpy(dtype=float)
+            donors = ~np.isnan(targets).any(axis=1)
+            if donors.sum() >= n_neighbors:
+                X = features.to_numpy(dtype=float)
+                X_donors = features[donors].fillna(features.median()).fillna(0).to_numpy(dtype=float)
+                queries = np.flatnonzero(~donors)
+                
+                # One tree per missingness pattern, searching only the columns the queries have;
+                # rare patterns share a tree over median-filled features
+                patterns, pattern_ids = np.unique(np.isnan(X[queries]), axis=0, return_inverse=True)
+                pattern_ids = pattern_ids.ravel()
+                frequent = np.argsort(-np.bincount(pattern_ids))[:self.KNN_MAX_PATTERN_TREES]
+                neighbours = np.empty((len(queries), n_neighbors), dtype=np.int64)
+                shared = np.ones(len(queries), dtype=bool)
+                for pattern_id in frequent:
+                    observed = ~patterns[pattern_id]
+                    rows = pattern_ids == pattern_id
+                    if not observed.any():
+                        continue
+                    index = NearestNeighbors(n_neighbors=n_neighbors, algorithm='kd_tree').fit(X_donors[:, observed])
+                    neighbours[rows] = index.kneighbors(X[queries[rows]][:, observed], return_distance=False)
+                    shared[rows] = False
+                if shared.any():
+                    X_shared = np.where(np.isnan(X[queries[shared]]), features.median().fillna(0).to_numpy(), X[queries[shared]])
+                    index = NearestNeighbors(n_neighbors=n_neighbors, algorithm='kd_tree').fit(X_donors)
+                    neighbours[shared] = index.kneighbors(X_shared, return_distance=False)
+                
+                # Mean of the neighbours' values, written into the missing cells only
+                neighbour_means = targets[donors][neighbours].mean(axis=1)
+                query_values = targets[queries]
+                missing = np.isnan(query_values)
+                query_values[missing] = neighbour_means[missing]
+                targets[queries] = query_values
+                return pd.DataFrame(targets, index=features.index, columns=target_cols)
+            logger.warning("Too few complete rows for the KNN tree index, using exact KNN")
+        
+        imputed = self.knn_imputer.fit_transform(features)
+        positions = [features.columns.get_loc(col) for col in target_cols]
+        return pd.DataFrame(imputed[:, positions], index=features.index, columns=target_cols)
+    
     def extract_physiological_features(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         Extract and engineer physiological features
@@ -392,28 +664,40 @@ class CrewHealthDataProcessor:
                 features_df['crew_age'], errors='coerce'
             )
         
-        # Create feature for bone density metrics
-        bone_keywords = ['bone', 'density', 'mineral', 'calcium']
-        features_df['bone_related'] = features_df.apply(
-            lambda row: any(keyword in str(row).lower() for keyword in bone_keywords),
-            axis=1
-        )
+        # Flag bone, muscle and cardiovascular related records from their text columns
+        keyword_flags = self._keyword_flags(features_df)
+        for flag in PHYSIOLOGICAL_KEYWORDS:
+            features_df[flag] = keyword_flags[flag]
         
-        # Create feature for muscle metrics
-        muscle_keywords = ['muscle', 'atrophy', 'strength', 'mass']
-        features_df['muscle_related'] = features_df.apply(
-            lambda row: any(keyword in str(row).lower() for keyword in muscle_keywords),
-            axis=1
-        )
+        return features_df
+    
+    def _keyword_flags(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Flag rows whose text columns mention each PHYSIOLOGICAL_KEYWORDS group
         
-        # Create feature for cardiovascular metrics
-        cardio_keywords = ['cardiovascular', 'heart', 'blood', 'pressure']
-        features_df['cardio_related'] = features_df.apply(
-            lambda row: any(keyword in str(row).lower() for keyword in cardio_keywords),
-            axis=1
-        )
+        KEYWORD_FLAGS_PATTERN detects all groups in a single regex pass. It runs once
+        per distinct value of each text column (factorized), and the per-column flags
+        are OR-ed together; keywords contain no spaces, so this equals scanning the
+        space-joined text of the row.
         
-        return features_df
+        Args:
+            df: DataFrame to scan
+            
+        Returns:
+            Boolean DataFrame with one column per keyword group
+        """
+        flags = np.zeros((len(df), len(PHYSIOLOGICAL_KEYWORDS)), dtype=bool)
+        
+        for col in df.select_dtypes(include=['object', 'string', 'category']).columns:
+            codes, uniques = pd.factorize(df[col])
+            if len(uniques) == 0:
+                continue
+            
+            unique_flags = pd.Series(np.asarray(uniques).astype(str)).str.extract(KEYWORD_FLAGS_PATTERN).notna()
+            # Missing values (code -1) never match, like their 'nan' text
+            flags |= unique_flags.to_numpy()[codes] & (codes >= 0)[:, None]
+        
+        return pd.DataFrame(flags, index=df.index, columns=list(PHYSIOLOGICAL_KEYWORDS))
     
     def handle_missing_values(self, df: pd.DataFrame, 
                             strategy: str = 'median') -> pd.DataFrame:
@@ -520,65 +804,147 @@ class CrewHealthDataProcessor:
         
         return df_outliers
     
-    def detect_outliers_advanced(self, df: pd.DataFrame) -> pd.DataFrame:
+    def detect_outliers_advanced(self, df: pd.DataFrame, refit: bool = True,
+                                 return_bitmask: bool = False):
         """
         Advanced outlier detection using multiple methods
         
         Args:
             df: DataFrame to analyze
+            refit: If False, score df with the fitted (or loaded) outlier model, so
+                incremental loads only score their new rows
+            return_bitmask: Also return the per-column flags of this call as a uint8
+                DataFrame (same index as df, one column per metric: bit 0 = IQR
+                outlier, bit 1 = z-score outlier)
             
         Returns:
-            DataFrame with outlier analysis
+            DataFrame with outlier analysis, or (DataFrame, bitmask) if return_bitmask
         """
-        df_analyzed = df.copy()
-        numerical_cols = [col for col in df_analyzed.select_dtypes(include=[np.number]).columns 
+        if not refit:
+            if self.fitted_state is None:
+                raise RuntimeError("Preprocessing state not fitted. Call fit() or load_state() first.")
+            outlier_state = self.fitted_state['outliers']
+        else:
+            outlier_state = self._fit_outlier_model(df)
+        return self._apply_outlier_model(df, outlier_state, return_bitmask=return_bitmask)
+    
+    def _fit_outlier_model(self, df: pd.DataFrame) -> Dict:
+        """Learn IQR bounds, z-score moments and an Isolation Forest from the numerical columns"""
+        numerical_cols = [col for col in df.select_dtypes(include=[np.number]).columns 
                          if not col.startswith(('data_quality', 'validation', 'invalid', 'outlier'))]
         
-        # Outlier detection using multiple methods
-        outliers_iqr = set()
-        outliers_zscore = set()
-        outliers_isolation = set()
-        
-        for col in numerical_cols:
-            if col in df_analyzed.columns:
-                # IQR method
-                Q1 = df_analyzed[col].quantile(0.25)
-                Q3 = df_analyzed[col].quantile(0.75)
-                IQR = Q3 - Q1
-                lower_bound = Q1 - 1.5 * IQR
-                upper_bound = Q3 + 1.5 * IQR
-                
-                col_outliers_iqr = df_analyzed[(df_analyzed[col] < lower_bound) | (df_analyzed[col] > upper_bound)].index
-                outliers_iqr.update(col_outliers_iqr)
-                
-                # Z-score method (using absolute threshold of 3)
-                z_scores = np.abs((df_analyzed[col] - df_analyzed[col].mean()) / df_analyzed[col].std())
-                col_outliers_zscore = df_analyzed[z_scores > 3].index
-                outliers_zscore.update(col_outliers_zscore)
+        # All quartiles and moments in one matrix pass (NaN-aware, same definitions as pandas)
+        X = df[numerical_cols].to_numpy(dtype=float)
+        observed = ~np.isnan(X)
+        counts = observed.sum(axis=0)
+        with warnings.catch_warnings(), np.errstate(divide='ignore', invalid='ignore'):
+            warnings.simplefilter('ignore', RuntimeWarning)  # all-NaN columns give NaN bounds
+            if X.size:
+                Q1, medians, Q3 = np.nanquantile(X, [0.25, 0.5, 0.75], axis=0)
+            else:
+                Q1 = medians = Q3 = np.full(len(numerical_cols), np.nan)
+            means = np.where(observed, X, 0.0).sum(axis=0) / counts
+            deviations = np.where(observed, X - means, 0.0)
+            stds = np.where(counts > 1, np.sqrt((deviations ** 2).sum(axis=0) / (counts - 1)), np.nan)
+        IQR = Q3 - Q1
+        
+        # IQR method and z-score method (absolute threshold of 3)
+        bounds = {
+            col: {
+                'iqr_lower': Q1[i] - 1.5 * IQR[i],
+                'iqr_upper': Q3[i] + 1.5 * IQR[i],
+                'mean': means[i],
+                'std': stds[i]
+            }
+            for i, col in enumerate(numerical_cols)
+        }
         
         # Isolation Forest (global outlier detection)
+        iso_forest = None
+        fill_values = pd.Series(medians, index=numerical_cols, dtype=float)
         if len(numerical_cols) >= 2:
             try:
-                iso_forest = IsolationForest(contamination=0.1, random_state=42)
-                outlier_predictions = iso_forest.fit_predict(df_analyzed[numerical_cols].fillna(df_analyzed[numerical_cols].median()))
-                outliers_isolation.update(df_analyzed.index[outlier_predictions == -1])
+                iso_forest = self._fit_isolation_forest(df[numerical_cols], fill_values)
             except:
+                iso_forest = None
                 logger.warning("Isolation Forest failed, skipping global outlier detection")
         
+        return {
+            'columns': numerical_cols,
+            'bounds': bounds,
+            'isolation_forest': iso_forest,
+            'isolation_fill_values': fill_values
+        }
+    
+    def _apply_outlier_model(self, df: pd.DataFrame, outlier_state: Dict, return_bitmask: bool = False):
+        """Flag outliers with previously learned bounds and Isolation Forest (optionally returning the bitmask)"""
+        df_analyzed = df.copy()
+        numerical_cols = outlier_state['columns']
+        
+        # Per-method boolean matrices over all columns at once (NaN never flags)
+        X = df_analyzed[numerical_cols].to_numpy(dtype=float)
+        bounds = np.array([[outlier_state['bounds'][col][key] for key in ('iqr_lower', 'iqr_upper', 'mean', 'std')]
+                           for col in numerical_cols], dtype=float).reshape(-1, 4)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            iqr_matrix = (X < bounds[:, 0]) | (X > bounds[:, 1])
+            zscore_matrix = np.abs((X - bounds[:, 2]) / bounds[:, 3]) > 3
+        
+        outliers_iqr = pd.Series(iqr_matrix.any(axis=1), index=df_analyzed.index)
+        outliers_zscore = pd.Series(zscore_matrix.any(axis=1), index=df_analyzed.index)
+        outliers_isolation = pd.Series(False, index=df_analyzed.index)
+        
+        if outlier_state['isolation_forest'] is not None and len(df_analyzed) > 0:
+            X = df_analyzed[numerical_cols].fillna(outlier_state['isolation_fill_values'])
+            try:
+                outliers_isolation = pd.Series(self._predict_isolation(outlier_state['isolation_forest'], X) == -1,
+                                               index=df_analyzed.index)
+            except Exception as e:
+                logger.warning(f"Isolation Forest scoring failed ({e}), skipping global outlier detection")
+        
         # Combine outlier information
-        df_analyzed['outliers_iqr'] = df_analyzed.index.isin(outliers_iqr)
-        df_analyzed['outliers_zscore'] = df_analyzed.index.isin(outliers_zscore)
-        df_analyzed['outliers_isolation'] = df_analyzed.index.isin(outliers_isolation)
+        df_analyzed['outliers_iqr'] = outliers_iqr.to_numpy()
+        df_analyzed['outliers_zscore'] = outliers_zscore.to_numpy()
+        df_analyzed['outliers_isolation'] = outliers_isolation.to_numpy()
         df_analyzed['outlier_consensus'] = (
             df_analyzed['outliers_iqr'].astype(int) + 
             df_analyzed['outliers_zscore'].astype(int) + 
             df_analyzed['outliers_isolation'].astype(int)
         )
         
-        logger.info(f"Advanced outlier detection: IQR={len(outliers_iqr)}, Z-score={len(outliers_zscore)}, Isolation={len(outliers_isolation)}")
+        logger.info(f"Advanced outlier detection: IQR={outliers_iqr.sum()}, Z-score={outliers_zscore.sum()}, Isolation={outliers_isolation.sum()}")
+        
+        if return_bitmask:
+            # Per-column flags of this call only (no shared state): bit 0 = IQR, bit 1 = z-score
+            bitmask = pd.DataFrame(
+                iqr_matrix.astype(np.uint8) | (zscore_matrix.astype(np.uint8) << 1),
+                index=df_analyzed.index, columns=numerical_cols
+            )
+            return df_analyzed, bitmask
         
         return df_analyzed
     
+    def _fit_isolation_forest(self, X: pd.DataFrame, fill_values: pd.Series) -> IsolationForest:
+        """
+        Fit the Isolation Forest, on a bounded random sample when isolation_sample_size is set
+        
+        Each tree only draws 256 rows, so a sample of the history gives an equivalent forest;
+        what it saves is scoring every training row to place the contamination threshold.
+        """
+        if self.isolation_sample_size is not None and len(X) > self.isolation_sample_size:
+            X = X.sample(n=self.isolation_sample_size, random_state=42)
+            logger.info(f"Fitting Isolation Forest on a {len(X)}-row sample")
+        
+        iso_forest = IsolationForest(contamination=0.1, random_state=42, n_jobs=self.isolation_n_jobs)
+        return iso_forest.fit(X.fillna(fill_values))
+    
+    def _predict_isolation(self, iso_forest: IsolationForest, X: pd.DataFrame) -> np.ndarray:
+        """Score rows with a fitted (or loaded) forest, spreading the trees over isolation_n_jobs threads"""
+        # IsolationForest scoring ignores its own n_jobs and runs under the active joblib backend
+        # (parallel_config is joblib >= 1.3; parallel_backend is the older equivalent)
+        backend_config = getattr(joblib, 'parallel_config', None) or joblib.parallel_backend
+        with backend_config(backend='threading', n_jobs=self.isolation_n_jobs):
+            return iso_forest.predict(X)
+    
     def normalize_features_robust(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         Robust feature normalization that handles outliers well
@@ -589,31 +955,142 @@ class CrewHealthDataProcessor:
         Returns:
             DataFrame with robustly normalized features
         """
-        df_normalized = df.copy()
-        
+        return self._apply_normalization(df, self._fit_normalization(df))
+    
+    def _fit_normalization(self, df: pd.DataFrame) -> Dict:
+        """Fit the RobustScaler on the feature columns (NaN filled with their medians)"""
         # Get numerical columns (excluding metadata and outlier columns)
-        numerical_cols = df_normalized.select_dtypes(include=[np.number]).columns
+        numerical_cols = df.select_dtypes(include=[np.number]).columns
         excluded_patterns = ['data_quality', 'validation', 'invalid', 'outlier', '_id', 'count']
         feature_cols = [col for col in numerical_cols 
                        if not any(pattern in col.lower() for pattern in excluded_patterns)]
         
+        fill_values = df[feature_cols].median()
         if len(feature_cols) > 0:
-            # Use RobustScaler which is less sensitive to outliers
-            df_normalized[feature_cols] = self.robust_scaler.fit_transform(
-                df_normalized[feature_cols].fillna(df_normalized[feature_cols].median())
+            # Use RobustScaler which is less sensitive to outliers (a new one, so a saved state is never refit)
+            self.robust_scaler = RobustScaler().fit(df[feature_cols].fillna(fill_values))
+        
+        return {
+            'feature_columns': feature_cols,
+            'fill_values': fill_values,
+            'scaler': self.robust_scaler
+        }
+    
+    def _apply_normalization(self, df: pd.DataFrame, normalization_state: Dict) -> pd.DataFrame:
+        """Scale the feature columns with a previously fitted RobustScaler"""
+        df_normalized = df.copy()
+        feature_cols = normalization_state['feature_columns']
+        
+        if len(feature_cols) > 0 and len(df_normalized) > 0:
+            df_normalized[feature_cols] = normalization_state['scaler'].transform(
+                df_normalized[feature_cols].fillna(normalization_state['fill_values'])
             )
             
             self.processed_features = feature_cols
             logger.info(f"Robust normalization applied to {len(feature_cols)} features")
         
         return df_normalized
+    
+    def _fit_imputation(self, df: pd.DataFrame) -> Dict:
+        """
+        Learn fill values for serving-time imputation
         
-        return df_outliers
+        Mirrors the column choices of handle_missing_values_advanced: columns it drops
+        (>70% missing), group medians where it imputes by category, and category modes.
+        Every other numerical column is filled with its median, which stands in for the
+        KNN and forward/backward fills that need the full history.
+        """
+        numerical_cols = [col for col in df.select_dtypes(include=[np.number]).columns
+                         if not col.startswith(('data_quality', 'validation', 'invalid'))]
+        categorical_cols = [col for col in df.select_dtypes(include=['object', 'category']).columns
+                           if not col.startswith(('validation_flags',))]
+        
+        imputation_state = {
+            'dropped_columns': [],
+            'numeric_fill_values': {},
+            'group_fill_values': {},
+            'categorical_fill_values': {}
+        }
+        
+        grouped_cols = []
+        for col in numerical_cols:
+            missing_pct = df[col].isnull().sum() / len(df) if len(df) else 0.0
+            if missing_pct > 0.7:
+                imputation_state['dropped_columns'].append(col)
+                continue
+            
+            imputation_state['numeric_fill_values'][col] = df[col].median()
+            if 0.1 <= missing_pct < 0.3:
+                grouped_cols.append(col)
+        
+        group_col = next((cat_col for cat_col in categorical_cols
+                          if df[cat_col].isnull().sum() < len(df) * 0.5), None)
+        if grouped_cols and group_col is not None:
+            group_medians = self._group_medians(df, group_col, grouped_cols)
+            for col in grouped_cols:
+                imputation_state['group_fill_values'][col] = (group_col, group_medians[col].dropna().to_dict())
+        
+        for col in categorical_cols:
+            missing_pct = df[col].isnull().sum() / len(df) if len(df) else 0.0
+            if missing_pct < 0.3:
+                mode_val = df[col].mode()
+                imputation_state['categorical_fill_values'][col] = mode_val.iloc[0] if len(mode_val) > 0 else 'Unknown'
+            else:
+                imputation_state['categorical_fill_values'][col] = 'Missing'
+        
+        return imputation_state
+    
+    def _apply_imputation(self, df: pd.DataFrame, imputation_state: Dict) -> pd.DataFrame:
+        """Fill missing values with the learned medians, group medians and modes"""
+        df_imputed = df.drop(columns=[col for col in imputation_state['dropped_columns'] if col in df.columns])
+        
+        for col, fill_value in imputation_state['numeric_fill_values'].items():
+            if col not in df_imputed.columns:
+                df_imputed[col] = np.nan
+            if col in imputation_state['group_fill_values']:
+                group_col, group_medians = imputation_state['group_fill_values'][col]
+                if group_col in df_imputed.columns:
+                    df_imputed[col] = df_imputed[col].fillna(df_imputed[group_col].map(group_medians))
+            df_imputed[col] = df_imputed[col].fillna(fill_value)
+        
+        for col, fill_value in imputation_state['categorical_fill_values'].items():
+            if col in df_imputed.columns:
+                df_imputed[col] = self._fill_categorical(df_imputed[col], fill_value)
+        
+        return df_imputed
     
     def preprocess_pipeline(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         Complete preprocessing pipeline
         
+        Fits on df (see fit_transform), so the learned state can then be saved
+        with save_state() and reused by transform().
+        
+        Args:
+            df: Raw dataframe
+            
+        Returns:
+            Fully preprocessed dataframe
+        """
+        return self.fit_transform(df)
+    
+    def fit(self, df: pd.DataFrame) -> 'CrewHealthDataProcessor':
+        """
+        Learn the preprocessing state (fill values, outlier model, scaler) from historical data
+        
+        Args:
+            df: Raw dataframe
+            
+        Returns:
+            The fitted processor
+        """
+        self.fit_transform(df)
+        return self
+    
+    def fit_transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Run the full preprocessing pipeline on df and keep the learned state
+        
         Args:
             df: Raw dataframe
             
@@ -629,17 +1106,357 @@ class CrewHealthDataProcessor:
         df_processed = self.extract_physiological_features(df_processed)
         
         # Step 3: Handle missing values
+        imputation_state = self._fit_imputation(df_processed)
         df_processed = self.handle_missing_values_advanced(df_processed)
         
         # Step 4: Detect outliers (before normalization)
-        df_processed = self.detect_outliers_advanced(df_processed)
+        outlier_state = self._fit_outlier_model(df_processed)
+        df_processed = self._apply_outlier_model(df_processed, outlier_state)
         
         # Step 5: Normalize features
-        df_processed = self.normalize_features_robust(df_processed)
+        normalization_state = self._fit_normalization(df_processed)
+        df_processed = self._apply_normalization(df_processed, normalization_state)
+        
+        self.fitted_state = {
+            'imputation': imputation_state,
+            'outliers': outlier_state,
+            'normalization': normalization_state,
+            'output_columns': df_processed.columns.tolist()
+        }
         
         logger.info("Preprocessing pipeline completed successfully")
         
         return df_processed
+    
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Preprocess new records with the fitted state (no refitting)
+        
+        Unlike fit(), no record is dropped: duplicates and low-quality rows are kept,
+        with invalid values imputed, so outputs line up with inputs.
+        
+        Args:
+            df: Raw dataframe of new records
+            
+        Returns:
+            Preprocessed dataframe with the same rows as df and the same columns as the fitted output
+        """
+        if self.fitted_state is None:
+            raise RuntimeError("Preprocessing state not fitted. Call fit() or load_state() first.")
+        
+        # Serving path: one output row per input row, in input order
+        df_processed = self._transform_steps(df)
+        assert len(df_processed) == len(df), "transform() must not add or drop records"
+        
+        # Same column set and order as the training output
+        return df_processed.reindex(columns=self.fitted_state['output_columns'])
+    
+    def _transform_steps(self, df: pd.DataFrame, drop_rows: bool = False) -> pd.DataFrame:
+        # Row filtering (duplicates, low quality, mostly empty) only when asked for;
+        # otherwise just the stateless per-value cleaning
+        df_processed = self.clean_data_intelligent(df) if drop_rows else self._clean_values(df)
+        df_processed = self.extract_physiological_features(df_processed)
+        df_processed = self._apply_imputation(df_processed, self.fitted_state['imputation'])
+        df_processed = self._apply_outlier_model(df_processed, self.fitted_state['outliers'])
+        df_processed = self._apply_normalization(df_processed, self.fitted_state['normalization'])
+        return df_processed
+    
+    def preprocess_streaming(self, input_path: str, output_path: str, chunksize: int = 100_000,
+                             sample_size: int = 100_000, max_categories: int = 10_000) -> Dict:
+        """
+        Two-pass, chunked preprocessing for CSV/Parquet files larger than memory
+        
+        Pass 1 cleans each chunk and accumulates mergeable statistics: missing counts,
+        running moments, a QuantileSketch per numerical column, bounded category counts
+        and a row reservoir for the Isolation Forest. Pass 2 transforms chunk by chunk
+        with the resulting state and appends to output_path. Peak memory is bounded by
+        the chunk size, the sketches and the reservoir.
+        
+        Differences from preprocess_pipeline: duplicates are dropped within chunks only,
+        numerical gaps are filled with global medians (no KNN, group or forward fills),
+        and quantiles are approximate once a column outgrows its sketch.
+        
+        Args:
+            input_path: CSV or Parquet file (Parquet needs pyarrow)
+            output_path: CSV or Parquet file to write (chosen by suffix)
+            chunksize: Rows per chunk
+            sample_size: Rows kept for fitting the Isolation Forest
+            max_categories: Distinct values counted per categorical column
+            
+        Returns:
+            Dictionary with row counts, chunk count and the output path
+        """
+        logger.info(f"Starting streaming preprocessing of {input_path}...")
+        
+        # Pass 1: accumulate statistics
+        stats = self._init_stream_stats(sample_size)
+        rows_in = 0
+        for chunk in _read_chunks(input_path, chunksize):
+            rows_in += len(chunk)
+            chunk = self.extract_physiological_features(self.clean_data_intelligent(chunk))
+            self._update_stream_stats(stats, chunk, max_categories)
+        
+        self.fitted_state = self._stream_stats_to_state(stats)
+        logger.info(f"Pass 1 complete: {rows_in} rows, {len(stats['numeric'])} numerical columns")
+        
+        # Pass 2: transform and write chunk by chunk
+        rows_out = 0
+        n_chunks = 0
+        with ChunkWriter(output_path) as writer:
+            for chunk in _read_chunks(input_path, chunksize):
+                chunk = self._coerce_stream_kinds(chunk, stats)
+                processed = self._transform_steps(chunk, drop_rows=True)
+                if self.fitted_state['output_columns'] is None:
+                    self.fitted_state['output_columns'] = processed.columns.tolist()
+                processed = processed.reindex(columns=self.fitted_state['output_columns'])
+                writer.write(processed)
+                rows_out += len(processed)
+                n_chunks += 1
+        
+        logger.info(f"Streaming preprocessing completed: {rows_in} rows in, {rows_out} rows out, {n_chunks} chunks")
+        
+        return {
+            'rows_in': rows_in,
+            'rows_out': rows_out,
+            'chunks': n_chunks,
+            'output_path': str(output_path)
+        }
+    
+    def _init_stream_stats(self, sample_size: int) -> Dict:
+        return {
+            'rows': 0,
+            'numeric': {},
+            'categorical': {},
+            'non_numeric': set(),
+            'reservoir': ReservoirSampler(sample_size)
+        }
+    
+    def _update_stream_stats(self, stats: Dict, chunk: pd.DataFrame, max_categories: int) -> None:
+        """Fold one cleaned chunk into the pass-1 statistics"""
+        stats['rows'] += len(chunk)
+        
+        numerical_cols = [col for col in chunk.select_dtypes(include=[np.number]).columns
+                         if not col.startswith(('data_quality', 'validation', 'invalid'))]
+        categorical_cols = [col for col in chunk.select_dtypes(include=['object']).columns
+                           if not col.startswith(('validation_flags',))]
+        
+        # A column with text values in any chunk is categorical for the whole file
+        for col in categorical_cols:
+            if chunk[col].notna().any() and col not in stats['non_numeric']:
+                stats['non_numeric'].add(col)
+                stats['numeric'].pop(col, None)
+        
+        for col in numerical_cols:
+            if col in stats['non_numeric']:
+                continue
+            col_stats = stats['numeric'].setdefault(col, {
+                'seen': 0, 'missing': 0, 'n': 0, 'mean': 0.0, 'm2': 0.0, 'sketch': QuantileSketch()
+            })
+            values = chunk[col].to_numpy(dtype=float)
+            observed = values[~np.isnan(values)]
+            col_stats['seen'] += len(values)
+            col_stats['missing'] += len(values) - len(observed)
+            col_stats['sketch'].update(observed)
+            _merge_moments(col_stats, len(observed), observed.mean() if len(observed) else 0.0,
+                           ((observed - observed.mean()) ** 2).sum() if len(observed) else 0.0)
+        
+        for col in categorical_cols:
+            col_stats = stats['categorical'].setdefault(col, {'seen': 0, 'missing': 0, 'counts': pd.Series(dtype=np.int64)})
+            col_stats['seen'] += len(chunk)
+            col_stats['missing'] += int(chunk[col].isnull().sum())
+            counts = col_stats['counts'].add(chunk[col].value_counts(), fill_value=0)
+            # Bounded memory: keep only the most frequent values
+            col_stats['counts'] = counts.nlargest(max_categories) if len(counts) > max_categories else counts
+        
+        stats['reservoir'].update(chunk[[col for col in numerical_cols if col not in stats['non_numeric']]])
+    
+    def _stream_stats_to_state(self, stats: Dict) -> Dict:
+        """Turn pass-1 statistics into the same state structure fit() produces"""
+        imputation_state = {
+            'dropped_columns': [],
+            'numeric_fill_values': {},
+            'group_fill_values': {},
+            'categorical_fill_values': {}
+        }
+        imputed = {}
+        
+        for col, col_stats in stats['numeric'].items():
+            # Rows in chunks where the column was absent count as missing
+            missing = col_stats['missing'] + stats['rows'] - col_stats['seen']
+            if missing / max(stats['rows'], 1) > 0.7:
+                imputation_state['dropped_columns'].append(col)
+                continue
+            
+            median = col_stats['sketch'].quantile(0.5)
+            imputation_state['numeric_fill_values'][col] = median
+            
+            # Statistics of the imputed column: missing values become `missing` copies of the median
+            sketch = col_stats['sketch'].copy()
+            sketch.add_weighted(median, missing)
+            moments = dict(col_stats)
+            _merge_moments(moments, missing, median if missing else 0.0, 0.0)
+            imputed[col] = {'sketch': sketch, 'mean': moments['mean'],
+                            'std': np.sqrt(moments['m2'] / (moments['n'] - 1)) if moments['n'] > 1 else np.nan}
+        
+        for col, col_stats in stats['categorical'].items():
+            missing = col_stats['missing'] + stats['rows'] - col_stats['seen']
+            if missing / max(stats['rows'], 1) < 0.3:
+                counts = col_stats['counts']
+                imputation_state['categorical_fill_values'][col] = counts.idxmax() if len(counts) > 0 else 'Unknown'
+            else:
+                imputation_state['categorical_fill_values'][col] = 'Missing'
+        
+        # Outlier model on the imputed numerical columns
+        outlier_cols = [col for col in imputed if not col.startswith('outlier')]
+        bounds = {}
+        for col in outlier_cols:
+            Q1 = imputed[col]['sketch'].quantile(0.25)
+            Q3 = imputed[col]['sketch'].quantile(0.75)
+            IQR = Q3 - Q1
+            bounds[col] = {
+                'iqr_lower': Q1 - 1.5 * IQR,
+                'iqr_upper': Q3 + 1.5 * IQR,
+                'mean': imputed[col]['mean'],
+                'std': imputed[col]['std']
+            }
+        medians = pd.Series({col: imputed[col]['sketch'].quantile(0.5) for col in outlier_cols}, dtype=float)
+        
+        iso_forest = None
+        sample = stats['reservoir'].sample
+        if len(outlier_cols) >= 2 and sample is not None and len(sample) > 0:
+            sample = self._apply_imputation(sample.reindex(columns=outlier_cols), imputation_state)[outlier_cols]
+            try:
+                iso_forest = self._fit_isolation_forest(sample, medians)
+            except:
+                iso_forest = None
+                logger.warning("Isolation Forest failed, skipping global outlier detection")
+        
+        outlier_state = {
+            'columns': outlier_cols,
+            'bounds': bounds,
+            'isolation_forest': iso_forest,
+            'isolation_fill_values': medians
+        }
+        
+        # RobustScaler from sketch quantiles (default 25-75 range, zero scale -> 1)
+        excluded_patterns = ['data_quality', 'validation', 'invalid', 'outlier', '_id', 'count']
+        feature_cols = [col for col in outlier_cols
+                       if not any(pattern in col.lower() for pattern in excluded_patterns)]
+        scaler = RobustScaler()
+        if feature_cols:
+            scale = np.array([imputed[col]['sketch'].quantile(0.75) - imputed[col]['sketch'].quantile(0.25)
+                              for col in feature_cols])
+            scaler.center_ = medians[feature_cols].to_numpy()
+            scaler.scale_ = np.where(scale == 0, 1.0, scale)
+            scaler.n_features_in_ = len(feature_cols)
+            scaler.feature_names_in_ = np.array(feature_cols, dtype=object)
+        
+        normalization_state = {
+            'feature_columns': feature_cols,
+            'fill_values': medians[feature_cols],
+            'scaler': scaler
+        }
+        
+        return {
+            'imputation': imputation_state,
+            'outliers': outlier_state,
+            'normalization': normalization_state,
+            'output_columns': None
+        }
+    
+    def _coerce_stream_kinds(self, chunk: pd.DataFrame, stats: Dict) -> pd.DataFrame:
+        """Give each column the kind (numerical or text) it had over the whole file in pass 1"""
+        chunk = chunk.copy()
+        for col in chunk.columns:
+            if col in stats['non_numeric'] and pd.api.types.is_numeric_dtype(chunk[col]):
+                chunk[col] = chunk[col].astype(object).where(chunk[col].notna(), None)
+            elif col in stats['numeric'] and not pd.api.types.is_numeric_dtype(chunk[col]):
+                chunk[col] = pd.to_numeric(chunk[col], errors='coerce')
+        return chunk
+    
+    def save_state(self, filepath: str) -> None:
+        """
+        Save the fitted preprocessing state to file
+        
+        Args:
+            filepath: Path to save the state
+        """
+        if self.fitted_state is None:
+            raise RuntimeError("Preprocessing state not fitted. Call fit() first.")
+        
+        joblib.dump(self.fitted_state, filepath)
+        logger.info(f"Preprocessing state saved to {filepath}")
+    
+    def load_state(self, filepath: str) -> None:
+        """
+        Load a fitted preprocessing state from file
+        
+        Args:
+            filepath: Path to load the state from
+        """
+        self.fitted_state = joblib.load(filepath)
+        self.robust_scaler = self.fitted_state['normalization']['scaler']
+        self.processed_features = self.fitted_state['normalization']['feature_columns']
+        
+        logger.info(f"Preprocessing state loaded from {filepath}")
+
+def _merge_moments(acc: Dict, n: int, mean: float, m2: float) -> None:
+    """Combine running count/mean/M2 with another group's (Chan et al. parallel update)"""
+    if n == 0:
+        return
+    total = acc['n'] + n
+    delta = mean - acc['mean']
+    acc['mean'] += delta * n / total
+    acc['m2'] += m2 + delta ** 2 * acc['n'] * n / total
+    acc['n'] = total
+
+def _read_chunks(path: str, chunksize: int) -> Iterator[pd.DataFrame]:
+    """Yield DataFrame chunks from a CSV or Parquet file"""
+    if Path(path).suffix.lower() in ['.parquet', '.pq']:
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Reading Parquet in streaming mode requires pyarrow (pip install pyarrow)") from e
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunksize)
+
+class ChunkWriter:
+    """Append processed chunks to a CSV or Parquet file"""
+    
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.parquet = self.path.suffix.lower() in ['.parquet', '.pq']
+        self._writer = None
+        self._schema = None
+        self._first = True
+    
+    def __enter__(self):
+        if self.parquet:
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError as e:
+                raise ImportError("Writing Parquet in streaming mode requires pyarrow (pip install pyarrow)") from e
+        return self
+    
+    def write(self, chunk: pd.DataFrame) -> None:
+        if self.parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(chunk, schema=self._schema, preserve_index=False)
+            if self._writer is None:
+                self._schema = table.schema
+                self._writer = pq.ParquetWriter(self.path, self._schema)
+            self._writer.write_table(table)
+        else:
+            chunk.to_csv(self.path, mode='w' if self._first else 'a', header=self._first, index=False)
+        self._first = False
+    
+    def __exit__(self, exc_type, exc, traceback):
+        if self._writer is not None:
+            self._writer.close()
+        return False
 
 if __name__ == "__main__":
     # Example usage
@@ -5,7 +5,10 @@ Implements regression models and predictive analytics for space medicine
 
 import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split, cross_val_score, GridSearchCV
+from sklearn.model_selection import train_test_split, GridSearchCV, KFold, RandomizedSearchCV, ParameterGrid, cross_val_score
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401 (enables HalvingGridSearchCV)
+from sklearn.model_selection import HalvingGridSearchCV
+from sklearn.base import clone
 from sklearn.linear_model import LinearRegression, Ridge, Lasso
 from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
 from sklearn.svm import SVR
@@ -15,10 +18,36 @@ from sklearn.preprocessing import StandardScaler
 import matplotlib.pyplot as plt
 import seaborn as sns
 import joblib
+from joblib import Parallel, delayed
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
+# Models fit on standardized features; the tree ensembles use the raw features
+SCALED_MODELS = ['linear_regression', 'ridge_regression', 'lasso_regression', 'svr']
+
+# cross_val_score(cv=5) for a regressor: unshuffled 5-fold split of the training set
+CV_FOLDS = 5
+
+# Hyperparameter search modes accepted by hyperparameter_tuning
+SEARCH_MODES = ['grid', 'halving', 'random']
+
+# Ensembles are halved over n_estimators (cheap partial forests), other models over samples
+HALVING_ESTIMATOR_MODELS = ['random_forest', 'gradient_boosting']
+
+def _fit_predict(name: str, model, X_fit, y_fit, X_eval, fold=None) -> tuple:
+    """Fit a fresh copy of model and predict X_eval (one unit of train_models' work)"""
+    try:
+        fitted = clone(model).fit(X_fit, y_fit)
+        return name, fold, fitted, fitted.predict(X_eval), None
+    except Exception as e:
+        return name, fold, None, None, e
+
+def _rows(X, indices):
+    """Select rows by position from a DataFrame or an array"""
+    return X.iloc[indices] if isinstance(X, pd.DataFrame) else X[indices]
+
 class CrewHealthPredictor:
     """Class for predictive modeling of crew health metrics"""
     
@@ -72,14 +101,20 @@ class CrewHealthPredictor:
         return X, y
     
     def train_models(self, X: pd.DataFrame, y: pd.Series, 
-                    test_size: float = 0.2) -> dict:
+                    test_size: float = 0.2, n_jobs: int = 1) -> dict:
         """
         Train multiple regression models
         
+        The hold-out fit and the cross-validation folds of every model are
+        independent tasks run over n_jobs worker processes. The split, the scaled
+        matrices and the fold indices are computed once and shared by all models,
+        so the metrics are identical to a sequential run.
+        
         Args:
             X: Features DataFrame
             y: Target Series
             test_size: Proportion of data for testing
+            n_jobs: Worker processes (1 = sequential, -1 = all cores)
             
         Returns:
             Dictionary containing model performance metrics
@@ -95,55 +130,65 @@ class CrewHealthPredictor:
         X_train_scaled = self.scaler.fit_transform(X_train)
         X_test_scaled = self.scaler.transform(X_test)
         
-        results = {}
+        # Same folds for every model
+        folds = list(KFold(n_splits=CV_FOLDS).split(X_train))
         
+        tasks = []
         for name, model in self.models.items():
-            logger.info(f"Training {name}...")
+            if name in SCALED_MODELS:
+                # These models benefit from scaling
+                X_fit, X_eval = X_train_scaled, X_test_scaled
+            else:
+                # Tree-based models don't need scaling
+                X_fit, X_eval = X_train, X_test
             
-            try:
-                # Train model
-                if name in ['linear_regression', 'ridge_regression', 'lasso_regression', 'svr']:
-                    # These models benefit from scaling
-                    model.fit(X_train_scaled, y_train)
-                    y_pred = model.predict(X_test_scaled)
-                else:
-                    # Tree-based models don't need scaling
-                    model.fit(X_train, y_train)
-                    y_pred = model.predict(X_test)
-                
-                # Calculate metrics
-                mse = mean_squared_error(y_test, y_pred)
-                rmse = np.sqrt(mse)
-                mae = mean_absolute_error(y_test, y_pred)
-                r2 = r2_score(y_test, y_pred)
-                
-                # Cross-validation
-                if name in ['linear_regression', 'ridge_regression', 'lasso_regression', 'svr']:
-                    cv_scores = cross_val_score(model, X_train_scaled, y_train, 
-                                              cv=5, scoring='r2')
-                else:
-                    cv_scores = cross_val_score(model, X_train, y_train, 
-                                              cv=5, scoring='r2')
-                
-                results[name] = {
-                    'mse': mse,
-                    'rmse': rmse,
-                    'mae': mae,
-                    'r2': r2,
-                    'cv_score_mean': cv_scores.mean(),
-                    'cv_score_std': cv_scores.std(),
-                    'predictions': y_pred,
-                    'actual': y_test.values
-                }
-                
-                # Store trained model
-                self.trained_models[name] = model
-                
-                logger.info(f"{name} - R²: {r2:.4f}, RMSE: {rmse:.4f}")
-                
-            except Exception as e:
-                logger.error(f"Error training {name}: {e}")
+            tasks.append(delayed(_fit_predict)(name, model, X_fit, y_train, X_eval))
+            for fold, (train_idx, test_idx) in enumerate(folds):
+                tasks.append(delayed(_fit_predict)(name, model, _rows(X_fit, train_idx), y_train.iloc[train_idx],
+                                                   _rows(X_fit, test_idx), fold))
+        
+        logger.info(f"Training {len(self.models)} models ({len(tasks)} fits) with n_jobs={n_jobs}...")
+        outputs = Parallel(n_jobs=n_jobs)(tasks)
+        
+        results = {}
+        
+        for name in self.models:
+            model_outputs = [output for output in outputs if output[0] == name]
+            errors = [output[4] for output in model_outputs if output[4] is not None]
+            if errors:
+                logger.error(f"Error training {name}: {errors[0]}")
                 continue
+            
+            _, _, model, y_pred, _ = next(output for output in model_outputs if output[1] is None)
+            
+            # Calculate metrics
+            mse = mean_squared_error(y_test, y_pred)
+            rmse = np.sqrt(mse)
+            mae = mean_absolute_error(y_test, y_pred)
+            r2 = r2_score(y_test, y_pred)
+            
+            # Cross-validation (R² per fold, in fold order)
+            cv_scores = np.zeros(CV_FOLDS)
+            for _, fold, _, fold_pred, _ in model_outputs:
+                if fold is not None:
+                    cv_scores[fold] = r2_score(y_train.iloc[folds[fold][1]], fold_pred)
+            
+            results[name] = {
+                'mse': mse,
+                'rmse': rmse,
+                'mae': mae,
+                'r2': r2,
+                'cv_score_mean': cv_scores.mean(),
+                'cv_score_std': cv_scores.std(),
+                'predictions': y_pred,
+                'actual': y_test.values
+            }
+            
+            # Store trained model
+            self.models[name] = model
+            self.trained_models[name] = model
+            
+            logger.info(f"{name} - R²: {r2:.4f}, RMSE: {rmse:.4f}")
         
         self.results = results
         return results
@@ -261,7 +306,8 @@ class CrewHealthPredictor:
         return feature_importance_df
     
     def hyperparameter_tuning(self, X: pd.DataFrame, y: pd.Series, 
-                             model_name: str) -> dict:
+                             model_name: str, search: str = 'grid',
+                             n_iter: int = 20, random_state: int = 42) -> dict:
         """
         Perform hyperparameter tuning for a specific model
         
@@ -269,6 +315,11 @@ class CrewHealthPredictor:
             X: Features DataFrame
             y: Target Series
             model_name: Name of the model to tune
+            search: 'grid' (exhaustive GridSearchCV), 'halving' (successive halving
+                    over n_estimators for ensembles, over samples otherwise) or
+                    'random' (RandomizedSearchCV with a budget of n_iter candidates)
+            n_iter: Candidate budget for the random search
+            random_state: Seed for the halving and random searches
             
         Returns:
             Dictionary containing best parameters and score
@@ -277,10 +328,117 @@ class CrewHealthPredictor:
             logger.error(f"Model {model_name} not found")
             return {}
         
-        logger.info(f"Performing hyperparameter tuning for {model_name}...")
+        if search not in SEARCH_MODES:
+            raise ValueError(f"Unknown search mode '{search}', expected one of {SEARCH_MODES}")
+        
+        logger.info(f"Performing {search} hyperparameter search for {model_name}...")
         
-        # Define parameter grids
-        param_grids = {
+        param_grid = self._param_grids().get(model_name)
+        if param_grid is None:
+            logger.warning(f"No parameter grid defined for {model_name}")
+            return {}
+        
+        # Perform the search
+        model = self.models[model_name]
+        n_candidates = len(ParameterGrid(param_grid))
+        
+        if search == 'grid':
+            searcher = GridSearchCV(
+                model, param_grid, cv=5, scoring='r2', n_jobs=-1
+            )
+        elif search == 'halving':
+            if model_name in HALVING_ESTIMATOR_MODELS:
+                # Grow n_estimators up to the grid maximum for the surviving candidates
+                halving_grid = {key: values for key, values in param_grid.items() if key != 'n_estimators'}
+                resource_kwargs = {'resource': 'n_estimators', 'max_resources': max(param_grid['n_estimators'])}
+            else:
+                halving_grid = param_grid
+                resource_kwargs = {'resource': 'n_samples'}
+            n_candidates = len(ParameterGrid(halving_grid))
+            searcher = HalvingGridSearchCV(
+                model, halving_grid, cv=5, scoring='r2', factor=3, min_resources='exhaust',
+                random_state=random_state, n_jobs=-1, **resource_kwargs
+            )
+        else:
+            n_candidates = min(n_iter, n_candidates)
+            searcher = RandomizedSearchCV(
+                model, param_grid, n_iter=n_candidates, cv=5, scoring='r2',
+                random_state=random_state, n_jobs=-1
+            )
+        
+        start = time.perf_counter()
+        
+        # Scale data for models that need it
+        if model_name in ['ridge_regression', 'lasso_regression']:
+            X_scaled = self.scaler.fit_transform(X)
+            searcher.fit(X_scaled, y)
+        else:
+            searcher.fit(X, y)
+        
+        elapsed = time.perf_counter() - start
+        
+        results = {
+            'search': search,
+            'best_params': searcher.best_params_,
+            'best_score': searcher.best_score_,
+            'best_estimator': searcher.best_estimator_,
+            'n_candidates': n_candidates,
+            'elapsed_seconds': elapsed
+        }
+        
+        logger.info(f"Best parameters for {model_name}: {results['best_params']}")
+        logger.info(f"Best score: {results['best_score']:.4f} ({n_candidates} candidates, {elapsed:.1f}s)")
+        
+        return results
+    
+    def compare_search_strategies(self, X: pd.DataFrame, y: pd.Series, model_name: str,
+                                  searches: list = None, n_iter: int = 20) -> pd.DataFrame:
+        """
+        Compare search modes on wall-clock time and best-score parity with the exhaustive grid
+        
+        Each search's best parameters are re-scored with the same 5-fold CV on the full
+        data, because the halving search reports its best score at a reduced resource.
+        
+        Args:
+            X: Features DataFrame
+            y: Target Series
+            model_name: Name of the model to tune
+            searches: Search modes to compare (default: all, 'grid' first as the reference)
+            n_iter: Candidate budget for the random search
+            
+        Returns:
+            DataFrame with one row per search mode
+        """
+        searches = searches or SEARCH_MODES
+        X_eval = self.scaler.fit_transform(X) if model_name in ['ridge_regression', 'lasso_regression'] else X
+        
+        rows = []
+        for search in searches:
+            results = self.hyperparameter_tuning(X, y, model_name, search=search, n_iter=n_iter)
+            if not results:
+                return pd.DataFrame()
+            
+            estimator = clone(self.models[model_name]).set_params(**results['best_params'])
+            cv_r2 = cross_val_score(estimator, X_eval, y, cv=5, scoring='r2', n_jobs=-1).mean()
+            rows.append({
+                'search': search,
+                'n_candidates': results['n_candidates'],
+                'elapsed_seconds': results['elapsed_seconds'],
+                'best_params': results['best_params'],
+                'cv_r2': cv_r2
+            })
+        
+        comparison = pd.DataFrame(rows).set_index('search')
+        if 'grid' in comparison.index:
+            comparison['speedup_vs_grid'] = comparison.loc['grid', 'elapsed_seconds'] / comparison['elapsed_seconds']
+            comparison['cv_r2_gap_vs_grid'] = comparison['cv_r2'] - comparison.loc['grid', 'cv_r2']
+        
+        logger.info(f"Search strategy comparison for {model_name}:\n{comparison.drop(columns='best_params')}")
+        return comparison
+    
+    def _param_grids(self) -> dict:
+        """Hyperparameter grids searched by hyperparameter_tuning"""
+        return {
             'random_forest': {
                 'n_estimators': [50, 100, 200],
                 'max_depth': [None, 10, 20, 30],
@@ -300,36 +458,6 @@ class CrewHealthPredictor:
                 'alpha': [0.01, 0.1, 1.0, 10.0, 100.0]
             }
         }
-        
-        if model_name not in param_grids:
-            logger.warning(f"No parameter grid defined for {model_name}")
-            return {}
-        
-        # Perform grid search
-        model = self.models[model_name]
-        param_grid = param_grids[model_name]
-        
-        grid_search = GridSearchCV(
-            model, param_grid, cv=5, scoring='r2', n_jobs=-1
-        )
-        
-        # Scale data for models that need it
-        if model_name in ['ridge_regression', 'lasso_regression']:
-            X_scaled = self.scaler.fit_transform(X)
-            grid_search.fit(X_scaled, y)
-        else:
-            grid_search.fit(X, y)
-        
-        results = {
-            'best_params': grid_search.best_params_,
-            'best_score': grid_search.best_score_,
-            'best_estimator': grid_search.best_estimator_
-        }
-        
-        logger.info(f"Best parameters for {model_name}: {results['best_params']}")
-        logger.info(f"Best score: {results['best_score']:.4f}")
-        
-        return results
     
     def predict_mars_mission_effects(self, mars_duration_days: int = 780) -> dict:
         """
@@ -0,0 +1,145 @@
+"""
+Compact dtype schema for ISS crew health frames
+Declares category, float32 and small-integer dtypes for the crew health, astronaut
+profile and bone density tables, and reports the memory saved when applying them
+"""
+
+import pandas as pd
+import numpy as np
+import logging
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+BONE_SITES = ['femoral_neck', 'trochanter', 'pelvis', 'lumbar_spine', 'calcaneus']
+
+# Column -> storage dtype. Integer dtypes are the smallest that hold the column's
+# physiological range; they are only used when the values really are whole numbers.
+CREW_HEALTH_SCHEMA = {
+    # Low-cardinality text
+    'astronaut_id': 'category',
+    'gender': 'category',
+    'mission_type': 'category',
+    'crew_role': 'category',
+    'crew_type': 'category',
+    'data_source': 'category',
+    'primary_data_source': 'category',
+    'study_references': 'category',
+    'study_source': 'category',
+    'measurement_method': 'category',
+    'data_quality': 'category',
+
+    # Whole numbers
+    'age': 'Int8',
+    'mission_duration_days': 'Int16',
+    **{f'{site}_recovery_days': 'Int16' for site in BONE_SITES},
+
+    # Measurements
+    'crew_age': 'float32',
+    'crew_age_numeric': 'float32',
+    'height_cm': 'float32',
+    'weight_kg': 'float32',
+    'pre_flight_bone_density': 'float32',
+    'exercise_hours_per_week': 'float32',
+    'bone_density_change': 'float32',
+    'muscle_mass_change': 'float32',
+    'cardiovascular_change': 'float32',
+    'psychological_score_change': 'float32',
+    **{f'{site}_bmd_loss_percent': 'float32' for site in BONE_SITES},
+    'tibia_failure_load_loss_percent': 'float32',
+    'tibia_total_bmd_loss_percent': 'float32',
+    'tibia_trabecular_bmd_loss_percent': 'float32',
+    'tibia_cortical_bmd_loss_percent': 'float32'
+}
+
+def apply_schema(df: pd.DataFrame, schema: Optional[Dict[str, str]] = None,
+                 float_dtype: Optional[str] = 'float32') -> pd.DataFrame:
+    """
+    Convert a frame to the compact storage dtypes
+
+    Declared integer columns become NumPy ints when complete and nullable Int types
+    when they have gaps; columns that are not whole numbers in range stay floats.
+    Undeclared float64 columns (wide telemetry tables) are downcast to float_dtype too.
+
+    Args:
+        df: Frame as loaded (default pandas dtypes)
+        schema: Column -> dtype mapping (default CREW_HEALTH_SCHEMA)
+        float_dtype: Dtype for measurement columns; None keeps float64, e.g. where
+            values are published as-is
+
+    Returns:
+        New frame with compact dtypes
+    """
+    schema = CREW_HEALTH_SCHEMA if schema is None else schema
+    df_compact = df.copy()
+
+    for col in df_compact.columns:
+        dtype = schema.get(col)
+        series = df_compact[col]
+
+        if dtype == 'category':
+            if series.dtype == object or pd.api.types.is_string_dtype(series):
+                df_compact[col] = series.astype('category')
+        elif dtype is not None and dtype.startswith('Int'):
+            df_compact[col] = _to_small_int(series, dtype, float_dtype)
+        elif dtype is not None or pd.api.types.is_float_dtype(series):
+            if float_dtype is not None and pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+                df_compact[col] = series.astype(float_dtype)
+
+    return df_compact
+
+def _to_small_int(series: pd.Series, dtype: str, float_dtype: Optional[str]) -> pd.Series:
+    """Integer column in the declared width, or a float column if that would lose information"""
+    values = pd.to_numeric(series, errors='coerce')
+    observed = values.dropna()
+    limits = np.iinfo(dtype.lower())
+
+    if observed.eq(observed.round()).all() and observed.between(limits.min, limits.max).all():
+        # Nullable type only when needed, so NumPy consumers keep a native dtype
+        return values.astype(dtype if values.isna().any() else dtype.lower())
+
+    logger.info(f"{series.name} is not whole numbers within {dtype}, keeping it as float")
+    return values.astype(float_dtype or 'float64')
+
+def memory_report(before: pd.DataFrame, after: pd.DataFrame, label: str = "frame") -> Dict:
+    """
+    Log and return the deep memory usage of a frame before and after apply_schema
+
+    Args:
+        before: Frame with the original dtypes
+        after: Frame with compact dtypes
+        label: Name used in the log line
+
+    Returns:
+        Dictionary with byte counts and the reduction factor
+    """
+    before_bytes = int(before.memory_usage(deep=True).sum())
+    after_bytes = int(after.memory_usage(deep=True).sum())
+    reduction = before_bytes / after_bytes if after_bytes else 1.0
+
+    logger.info(f"💾 {label}: {before_bytes / 1e6:.2f} MB -> {after_bytes / 1e6:.2f} MB ({reduction:.1f}x smaller)")
+
+    return {
+        'before_bytes': before_bytes,
+        'after_bytes': after_bytes,
+        'reduction': reduction
+    }
+
+def read_compact_csv(path, schema: Optional[Dict[str, str]] = None,
+                     float_dtype: Optional[str] = 'float32', **read_csv_kwargs) -> pd.DataFrame:
+    """
+    Read a CSV and apply the compact schema, logging the memory report
+
+    Args:
+        path: CSV file
+        schema: Column -> dtype mapping (default CREW_HEALTH_SCHEMA)
+        float_dtype: Dtype for measurement columns (None keeps float64)
+        **read_csv_kwargs: Passed through to pd.read_csv
+
+    Returns:
+        Frame with compact dtypes
+    """
+    df = pd.read_csv(path, **read_csv_kwargs)
+    df_compact = apply_schema(df, schema, float_dtype)
+    memory_report(df, df_compact, label=str(path))
+    return df_compact
@@ -0,0 +1,91 @@
+"""
+Shared fixtures: a local stub of the NASA OSDR search endpoint
+"""
+
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+
+class StubOSDR:
+    """
+    Paginating OSDR search stub with ETag support
+
+    Each query has `totals[query]` hits (default_total if absent), served in pages
+    of the requested size from the requested offset. Responses carry an ETag per
+    (query, offset, size); a matching If-None-Match gets a 304. Every request is
+    recorded in `requests` as (query, offset, status).
+    """
+
+    def __init__(self, latency: float = 0.0, default_total: int = 3):
+        self.latency = latency
+        self.default_total = default_total
+        self.totals = {}
+        self.requests = []
+        self.lock = threading.Lock()
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub.handle(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/search"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def handle(self, handler: BaseHTTPRequestHandler):
+        params = parse_qs(urlparse(handler.path).query)
+        query = params.get('q', [''])[0]
+        offset = int(params.get('from', ['0'])[0])
+        size = int(params.get('size', ['100'])[0])
+        time.sleep(self.latency)
+
+        etag = f'"{query}-{offset}-{size}"'
+        if handler.headers.get('If-None-Match') == etag:
+            self._record(query, offset, 304)
+            handler.send_response(304)
+            handler.end_headers()
+            return
+
+        total = self.totals.get(query, self.default_total)
+        hits = [{'_id': f"{query}-{i}", '_source': {'title': f"{query} study {i}"}}
+                for i in range(offset, min(offset + size, total))]
+        body = json.dumps({'hits': {'total': {'value': total}, 'hits': hits}}).encode()
+        self._record(query, offset, 200)
+        handler.send_response(200)
+        handler.send_header('Content-Type', 'application/json')
+        handler.send_header('Content-Length', str(len(body)))
+        handler.send_header('ETag', etag)
+        handler.end_headers()
+        handler.wfile.write(body)
+
+    def _record(self, query: str, offset: int, status: int):
+        with self.lock:
+            self.requests.append((query, offset, status))
+
+    def statuses(self) -> list:
+        with self.lock:
+            return [status for _, _, status in self.requests]
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def osdr_stub():
+    stub = StubOSDR()
+    yield stub
+    stub.stop()
@@ -0,0 +1,91 @@
+"""
+Compiled flat forests: exactness and safe re-export under concurrent readers
+"""
+
+import json
+import threading
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.preprocessing import StandardScaler
+
+from forest_compiler import (FLAT_CURRENT, FLAT_KEEP_VERSIONS, FLAT_META, compile_forest, flat_artifact_mtime,
+                             load_flat_forest, save_flat_forest)
+
+
+@pytest.fixture(scope="module")
+def fitted():
+    rng = np.random.default_rng(42)
+    X = rng.normal(size=(300, 5))
+    y = X[:, 0] * 2 - X[:, 1] + rng.normal(0, 0.1, 300)
+    scaler = StandardScaler().fit(X)
+    model = RandomForestRegressor(n_estimators=20, max_depth=6, random_state=42).fit(scaler.transform(X), y)
+    return model, scaler, X
+
+
+def test_flat_forest_matches_sklearn(fitted, tmp_path):
+    model, scaler, X = fitted
+    forest, flat_scaler, sites = load_flat_forest(save_flat_forest(tmp_path / "m.flat", model, scaler))
+
+    np.testing.assert_array_equal(forest.predict(flat_scaler.transform(X)), model.predict(scaler.transform(X)))
+    assert sites is None
+
+
+def test_reexport_switches_current_and_prunes_old_versions(fitted, tmp_path):
+    model, scaler, _ = fitted
+    path = tmp_path / "m.flat"
+    for _ in range(4):
+        save_flat_forest(path, model, scaler)
+
+    versions = [entry for entry in path.iterdir() if entry.is_dir()]
+    assert len(versions) == FLAT_KEEP_VERSIONS
+    assert (path / FLAT_CURRENT).read_text() in {version.name for version in versions}
+    assert flat_artifact_mtime(path) is not None
+
+
+def test_unversioned_artifacts_still_load_and_are_migrated(fitted, tmp_path):
+    model, scaler, X = fitted
+    path = tmp_path / "m.flat"
+    path.mkdir()
+    arrays = compile_forest(model)
+    meta = {'format_version': 1, 'max_depth': int(arrays.pop('max_depth')),
+            'n_features': int(arrays.pop('n_features')), 'sites': None}
+    for name, array in arrays.items():
+        np.save(path / f"{name}.npy", array)
+    with open(path / FLAT_META, 'w') as f:
+        json.dump(meta, f)
+
+    forest, _, _ = load_flat_forest(path)
+    np.testing.assert_array_equal(forest.predict(X), model.predict(X))
+
+    save_flat_forest(path, model, scaler)
+    assert not list(path.glob("*.npy")) and not (path / FLAT_META).exists()
+    assert load_flat_forest(path)[1] is not None
+
+
+def test_readers_never_miss_the_artifact_during_reexport(fitted, tmp_path):
+    model, scaler, X = fitted
+    path = save_flat_forest(tmp_path / "m.flat", model, scaler)
+    expected = model.predict(scaler.transform(X[:10]))
+    stop = threading.Event()
+    errors = []
+
+    def reader():
+        while not stop.is_set():
+            try:
+                forest, flat_scaler, _ = load_flat_forest(path, mmap_mode=None)
+                np.testing.assert_array_equal(forest.predict(flat_scaler.transform(X[:10])), expected)
+            except Exception as e:
+                errors.append(e)
+
+    readers = [threading.Thread(target=reader) for _ in range(3)]
+    for thread in readers:
+        thread.start()
+    for _ in range(30):
+        save_flat_forest(path, model, scaler)
+    stop.set()
+    for thread in readers:
+        thread.join()
+
+    assert errors == []
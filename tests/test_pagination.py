@@ -0,0 +1,85 @@
+"""
+Paginated, streaming study ingestion against a local OSDR stub
+"""
+
+import time
+
+import pandas as pd
+
+from src.data_acquisition import STUDY_COLUMNS, NASALSDAClient
+
+KEYWORDS = ["bone density", "muscle atrophy", "cardiovascular", "physiology", "microgravity", "crew health"]
+
+
+def make_client(stub, **kwargs) -> NASALSDAClient:
+    kwargs.setdefault('requests_per_second', 1000)
+    kwargs.setdefault('burst', 20)
+    return NASALSDAClient(base_url=stub.url, cache_dir=None, page_size=40, **kwargs)
+
+
+def captured_studies(client: NASALSDAClient, keywords) -> pd.DataFrame:
+    captured = []
+    client.convert_studies_to_crew_metrics = lambda studies_df: captured.append(studies_df) or studies_df
+    client.get_crew_health_data(keywords)
+    return captured[0]
+
+
+def test_pages_walk_the_full_result_set(osdr_stub):
+    osdr_stub.totals = {"bone density": 125}
+    studies = list(make_client(osdr_stub).iter_studies("bone density"))
+
+    assert [study['study_id'] for study in studies] == [f"bone density-{i}" for i in range(125)]
+    assert [offset for _, offset, _ in osdr_stub.requests] == [0, 40, 80, 120]
+
+
+def test_pagination_stops_at_the_reported_total(osdr_stub):
+    osdr_stub.totals = {"bone density": 80}
+    assert len(list(make_client(osdr_stub).iter_studies("bone density"))) == 80
+    # A full last page ends on the total, without requesting an empty page
+    assert [offset for _, offset, _ in osdr_stub.requests] == [0, 40]
+
+
+def test_max_results_per_keyword_caps_the_walk(osdr_stub):
+    osdr_stub.totals = {"bone density": 500}
+    studies = list(make_client(osdr_stub, max_results_per_keyword=90).iter_studies("bone density"))
+
+    assert len(studies) == 90
+    assert [offset for _, offset, _ in osdr_stub.requests] == [0, 40, 80]
+
+
+def test_concurrent_pages_keep_the_sequential_order(osdr_stub):
+    osdr_stub.totals = {keyword: 30 + 25 * i for i, keyword in enumerate(KEYWORDS)}
+    sequential = captured_studies(make_client(osdr_stub, max_workers=1), KEYWORDS)
+    concurrent = captured_studies(make_client(osdr_stub, max_workers=4), KEYWORDS)
+
+    assert len(sequential) == sum(osdr_stub.totals.values())
+    pd.testing.assert_frame_equal(sequential, concurrent)
+
+
+def test_ingest_writes_every_record_in_batches(osdr_stub, tmp_path):
+    osdr_stub.totals = {keyword: 30 + 25 * i for i, keyword in enumerate(KEYWORDS)}
+    output_path = tmp_path / "studies.csv"
+    n_written = make_client(osdr_stub, max_workers=3).ingest_studies(str(output_path), KEYWORDS, batch_size=50)
+
+    written = pd.read_csv(output_path)
+    assert n_written == len(written) == sum(osdr_stub.totals.values())
+    assert written.columns.tolist() == STUDY_COLUMNS
+    assert written['study_id'].is_unique
+
+
+def test_early_close_stops_further_requests(osdr_stub):
+    osdr_stub.latency = 0.1
+    osdr_stub.totals = {keyword: 400 for keyword in KEYWORDS}
+    workers = 2
+    studies = make_client(osdr_stub, max_workers=workers).iter_crew_health_studies(KEYWORDS)
+
+    next(studies)
+    sent_before_close = len(osdr_stub.requests)
+    start = time.perf_counter()
+    studies.close()
+    close_s = time.perf_counter() - start
+    time.sleep(0.3)
+
+    # Only the requests already in flight may complete; queued keywords never start
+    assert len(osdr_stub.requests) - sent_before_close <= workers
+    assert close_s < 1.0
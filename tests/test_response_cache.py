@@ -0,0 +1,94 @@
+"""
+ResponseCache and NASALSDAClient.search_studies against a local OSDR stub
+"""
+
+import os
+
+import pandas as pd
+
+from src.data_acquisition import DEFAULT_KEYWORDS, NASALSDAClient, ResponseCache
+
+
+def make_client(stub, cache_dir, **kwargs) -> NASALSDAClient:
+    return NASALSDAClient(base_url=stub.url, cache_dir=str(cache_dir),
+                          requests_per_second=1000, burst=len(DEFAULT_KEYWORDS), **kwargs)
+
+
+def study_frame(client: NASALSDAClient) -> pd.DataFrame:
+    return pd.DataFrame(list(client.iter_crew_health_studies()))
+
+
+def test_cold_run_fetches_every_keyword(osdr_stub, tmp_path):
+    studies = study_frame(make_client(osdr_stub, tmp_path))
+
+    assert osdr_stub.statuses() == [200] * len(DEFAULT_KEYWORDS)
+    assert len(studies) == len(DEFAULT_KEYWORDS) * osdr_stub.default_total
+
+
+def test_warm_run_skips_the_network(osdr_stub, tmp_path):
+    cold = study_frame(make_client(osdr_stub, tmp_path, max_workers=1))
+    warm = study_frame(make_client(osdr_stub, tmp_path, max_workers=1))
+
+    assert len(osdr_stub.requests) == len(DEFAULT_KEYWORDS)
+    pd.testing.assert_frame_equal(cold, warm)
+
+
+def test_expired_entries_are_revalidated(osdr_stub, tmp_path):
+    cold = study_frame(make_client(osdr_stub, tmp_path, max_workers=1))
+    revalidated = study_frame(make_client(osdr_stub, tmp_path, max_workers=1, cache_ttl=0))
+
+    assert osdr_stub.statuses() == [200] * len(DEFAULT_KEYWORDS) + [304] * len(DEFAULT_KEYWORDS)
+    pd.testing.assert_frame_equal(cold, revalidated)
+
+
+def test_304_restarts_the_ttl(osdr_stub, tmp_path):
+    make_client(osdr_stub, tmp_path).search_studies("bone density")
+    make_client(osdr_stub, tmp_path, cache_ttl=0).search_studies("bone density")
+    make_client(osdr_stub, tmp_path).search_studies("bone density")
+
+    assert osdr_stub.statuses() == [200, 304]
+
+
+def test_offline_serves_only_from_cache(osdr_stub, tmp_path):
+    cold = study_frame(make_client(osdr_stub, tmp_path, max_workers=1))
+    offline = study_frame(make_client(osdr_stub, tmp_path, max_workers=1, cache_ttl=0, offline=True))
+
+    assert len(osdr_stub.requests) == len(DEFAULT_KEYWORDS)
+    pd.testing.assert_frame_equal(cold, offline)
+
+
+def test_offline_without_cache_entries_returns_nothing(osdr_stub, tmp_path):
+    client = make_client(osdr_stub, tmp_path, offline=True)
+
+    assert client.search_studies("bone density") == {}
+    assert osdr_stub.requests == []
+
+
+def test_stale_entries_are_served_when_the_server_fails(osdr_stub, tmp_path):
+    cold = study_frame(make_client(osdr_stub, tmp_path, max_workers=1))
+    osdr_stub.stop()
+    stale = study_frame(make_client(osdr_stub, tmp_path, max_workers=1, cache_ttl=0, timeout=2))
+
+    pd.testing.assert_frame_equal(cold, stale)
+
+
+def test_eviction_keeps_the_cache_under_its_size_limit(tmp_path):
+    cache = ResponseCache(tmp_path, max_bytes=2_000)
+    payload = {'hits': {'hits': [{'_id': 'x' * 200}]}}
+    for i in range(20):
+        cache.put("http://stub/search", {'q': str(i)}, payload)
+
+    sizes = [entry.stat().st_size for entry in os.scandir(tmp_path)]
+    assert sum(sizes) <= 2_000
+    # The most recent entry survives, the oldest is evicted
+    assert cache.get("http://stub/search", {'q': '19'}) is not None
+    assert cache.get("http://stub/search", {'q': '0'}) is None
+
+
+def test_cache_key_includes_the_parameters(tmp_path):
+    cache = ResponseCache(tmp_path)
+    cache.put("http://stub/search", {'q': 'a', 'from': 0}, {'page': 0})
+    cache.put("http://stub/search", {'q': 'a', 'from': 100}, {'page': 1})
+
+    assert cache.get("http://stub/search", {'from': 100, 'q': 'a'})['payload'] == {'page': 1}
+    assert cache.get("http://stub/search", {'q': 'a', 'from': 0})['payload'] == {'page': 0}
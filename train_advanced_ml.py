@@ -18,6 +18,8 @@ from pathlib import Path
 import matplotlib.pyplot as plt
 import seaborn as sns
 
+from src.schema import read_compact_csv
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -34,7 +36,7 @@ class AdvancedSpaceMedicinePredictor:
     def load_and_prepare_data(self, data_path: str):
         """Load and prepare expanded dataset"""
         logger.info("Loading expanded dataset...")
-        df = pd.read_csv(data_path)
+        df = read_compact_csv(data_path)
         
         # Select features for ML training
         feature_cols = [
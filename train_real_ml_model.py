@@ -18,26 +18,42 @@ License: NASA Open Data
 
 import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split, cross_val_score
+from sklearn.model_selection import train_test_split, cross_val_score, KFold
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.preprocessing import StandardScaler, LabelEncoder
 from sklearn.metrics import mean_squared_error, r2_score, mean_absolute_error
 import joblib
+from joblib import Parallel, delayed
 import json
 import logging
+import argparse
+import shutil
+import time
 from pathlib import Path
 
+from forest_compiler import export_models, flat_path_for
+from src.schema import read_compact_csv
+
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def load_and_prepare_real_data(data_path: str):
+# Same as cross_val_score(cv=5) for a regressor: unshuffled 5-fold split of the training set
+CV_FOLDS = 5
+
+def load_and_prepare_real_data(data_path: str, profiles_path: str = "data/real_astronaut_profiles.csv"):
     """Load and prepare REAL NASA astronaut bone density data for ML training"""
     logger.info("Loading REAL NASA bone density data...")
-    df = pd.read_csv(data_path)
+    df = read_compact_csv(data_path)
     logger.info(f"✅ Loaded {len(df)} real astronaut bone density measurements")
     logger.info("📚 Sources: Sibonga 2007, Gabel 2022, Coulombe 2023, NASA Bone Lab")
     
+    # Bone measurements do not carry anthropometrics; join them from the profiles
+    if not {'height_cm', 'weight_kg'}.issubset(df.columns):
+        profiles = read_compact_csv(profiles_path)
+        df = df.merge(profiles[['astronaut_id', 'height_cm', 'weight_kg']], on='astronaut_id', how='left')
+        logger.info(f"✅ Joined height/weight from {profiles_path}")
+    
     # Calculate BMI from real measurements
     df['bmi'] = df['weight_kg'] / (df['height_cm'] / 100) ** 2
     
@@ -69,54 +85,81 @@ def train_model(X, y):
     """Train Random Forest model"""
     logger.info("Training Random Forest model...")
     
-    # Split data
+    # Split data and scale features
+    X_train_scaled, X_test_scaled, y_train, y_test, scaler = _split_and_scale(X, y)
+    
+    # Train Random Forest and score the hold-out set
+    rf_model, metrics = _fit_holdout(X_train_scaled, X_test_scaled, y_train, y_test, n_jobs=-1)
+    
+    # Cross-validation
+    cv_scores = np.array([
+        _fit_cv_fold(X_train_scaled, y_train, train_idx, test_idx, n_jobs=-1)
+        for train_idx, test_idx in KFold(n_splits=CV_FOLDS).split(X_train_scaled)
+    ])
+    metrics.update(_cv_metrics(cv_scores))
+    
+    _log_metrics(metrics)
+    
+    return rf_model, scaler, metrics, X.columns.tolist()
+
+def _split_and_scale(X, y):
+    """Hold-out split (random_state=42) with a scaler fit on the training part"""
     X_train, X_test, y_train, y_test = train_test_split(
         X, y, test_size=0.2, random_state=42
     )
     
-    # Scale features
+    # Fit on plain arrays: the predictor scales NumPy feature matrices at inference
     scaler = StandardScaler()
-    X_train_scaled = scaler.fit_transform(X_train)
-    X_test_scaled = scaler.transform(X_test)
+    X_train_scaled = scaler.fit_transform(X_train.to_numpy())
+    X_test_scaled = scaler.transform(X_test.to_numpy())
     
-    # Train Random Forest
-    rf_model = RandomForestRegressor(
+    return X_train_scaled, X_test_scaled, y_train.to_numpy(), y_test.to_numpy(), scaler
+
+def _new_forest(n_jobs: int):
+    """Random Forest with the hyperparameters shared by every site and fold"""
+    return RandomForestRegressor(
         n_estimators=100,
         max_depth=10,
         random_state=42,
-        n_jobs=-1
+        n_jobs=n_jobs
     )
+
+def _fit_holdout(X_train, X_test, y_train, y_test, n_jobs: int):
+    """Fit on the training split and compute hold-out metrics"""
+    rf_model = _new_forest(n_jobs)
+    rf_model.fit(X_train, y_train)
     
-    rf_model.fit(X_train_scaled, y_train)
-    
-    # Make predictions
-    y_pred = rf_model.predict(X_test_scaled)
+    # Predict single-threaded so tree outputs are summed in a fixed order
+    y_pred = rf_model.set_params(n_jobs=1).predict(X_test)
+    rf_model.set_params(n_jobs=n_jobs)
     
-    # Calculate metrics
     mse = mean_squared_error(y_test, y_pred)
-    rmse = np.sqrt(mse)
-    mae = mean_absolute_error(y_test, y_pred)
-    r2 = r2_score(y_test, y_pred)
-    
-    # Cross-validation
-    cv_scores = cross_val_score(rf_model, X_train_scaled, y_train, cv=5, scoring='r2')
-    
     metrics = {
         'mse': float(mse),
-        'rmse': float(rmse),
-        'mae': float(mae),
-        'r2': float(r2),
+        'rmse': float(np.sqrt(mse)),
+        'mae': float(mean_absolute_error(y_test, y_pred)),
+        'r2': float(r2_score(y_test, y_pred))
+    }
+    return rf_model, metrics
+
+def _fit_cv_fold(X_train, y_train, train_idx, test_idx, n_jobs: int) -> float:
+    """R² of one cross-validation fold (what cross_val_score computes per fold)"""
+    rf_model = _new_forest(n_jobs)
+    rf_model.fit(X_train[train_idx], y_train[train_idx])
+    return float(r2_score(y_train[test_idx], rf_model.set_params(n_jobs=1).predict(X_train[test_idx])))
+
+def _cv_metrics(cv_scores):
+    return {
         'cv_mean': float(cv_scores.mean()),
         'cv_std': float(cv_scores.std())
     }
-    
+
+def _log_metrics(metrics):
     logger.info("Model Performance:")
-    logger.info(f"R² Score: {r2:.4f}")
-    logger.info(f"RMSE: {rmse:.4f}")
-    logger.info(f"MAE: {mae:.4f}")
-    logger.info(f"CV R² (mean ± std): {cv_scores.mean():.4f} ± {cv_scores.std():.4f}")
-    
-    return rf_model, scaler, metrics, X_train.columns.tolist()
+    logger.info(f"R² Score: {metrics['r2']:.4f}")
+    logger.info(f"RMSE: {metrics['rmse']:.4f}")
+    logger.info(f"MAE: {metrics['mae']:.4f}")
+    logger.info(f"CV R² (mean ± std): {metrics['cv_mean']:.4f} ± {metrics['cv_std']:.4f}")
 
 def save_model(model, scaler, metrics, feature_names, model_dir_path: str):
     """Save trained model and metadata"""
@@ -154,29 +197,285 @@ def save_model(model, scaler, metrics, feature_names, model_dir_path: str):
     
     return metadata
 
-def main():
+def train_site_models(X, df, targets, workers: int = 1):
+    """
+    Train one Random Forest and scaler per bone site.
+    
+    The hold-out fit and every cross-validation fold of every site are
+    independent tasks, spread over `workers` processes (1 trains serially in
+    this process). Seeds and fold indices are fixed, so the models and metrics
+    are identical whatever the worker count.
+    """
+    # Each worker process fits single-threaded; serial training uses all cores per forest
+    forest_jobs = -1 if workers == 1 else 1
+    
+    prepared = {site: _split_and_scale(X, df[target_col]) for site, target_col in targets.items()}
+    
+    tasks = []
+    for site, (X_train, X_test, y_train, y_test, _) in prepared.items():
+        tasks.append(delayed(_site_holdout_task)(site, X_train, X_test, y_train, y_test, forest_jobs))
+        for fold, (train_idx, test_idx) in enumerate(KFold(n_splits=CV_FOLDS).split(X_train)):
+            tasks.append(delayed(_site_cv_fold_task)(site, fold, X_train, y_train, train_idx, test_idx, forest_jobs))
+    
+    logger.info(f"🦴 Training {len(targets)} site models ({len(tasks)} fits) with {workers} worker(s)...")
+    results = Parallel(n_jobs=workers)(tasks)
+    
+    holdout = {result[1]: result[2:] for result in results if result[0] == 'holdout'}
+    cv_scores = {site: np.zeros(CV_FOLDS) for site in targets}
+    for _, site, fold, score in (result for result in results if result[0] == 'cv'):
+        cv_scores[site][fold] = score
+    
+    site_models = {}
+    for site in targets:
+        model, metrics = holdout[site]
+        metrics.update(_cv_metrics(cv_scores[site]))
+        logger.info(f"🦴 {site}:")
+        _log_metrics(metrics)
+        site_models[site] = {
+            'model': model,
+            'scaler': prepared[site][4],
+            'metrics': metrics,
+            'feature_importance': _feature_importance(model, X.columns.tolist())
+        }
+    
+    return site_models
+
+def _site_holdout_task(site, X_train, X_test, y_train, y_test, n_jobs):
+    model, metrics = _fit_holdout(X_train, X_test, y_train, y_test, n_jobs)
+    return 'holdout', site, model, metrics
+
+def _site_cv_fold_task(site, fold, X_train, y_train, train_idx, test_idx, n_jobs):
+    return 'cv', site, fold, _fit_cv_fold(X_train, y_train, train_idx, test_idx, n_jobs)
+
+def compare_training_speed(X, df, targets, workers: int):
+    """Train the site models serially and with `workers` processes; report the speedup"""
+    start = time.perf_counter()
+    serial = train_site_models(X, df, targets, workers=1)
+    serial_s = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    parallel = train_site_models(X, df, targets, workers=workers)
+    parallel_s = time.perf_counter() - start
+    
+    identical = all(
+        serial[site]['metrics'] == parallel[site]['metrics']
+        and all(np.array_equal(a.tree_.value, b.tree_.value) and np.array_equal(a.tree_.threshold, b.tree_.threshold)
+                for a, b in zip(serial[site]['model'].estimators_, parallel[site]['model'].estimators_))
+        for site in targets
+    )
+    
+    report = {
+        'workers': workers,
+        'serial_seconds': round(serial_s, 3),
+        'parallel_seconds': round(parallel_s, 3),
+        'speedup': round(serial_s / parallel_s, 2),
+        'identical_results': identical
+    }
+    logger.info(f"⏱️ Serial {serial_s:.2f}s vs {workers} workers {parallel_s:.2f}s "
+                f"(speedup {report['speedup']:.2f}x)")
+    if identical:
+        logger.info("✅ Parallel models and metrics identical to serial training")
+    else:
+        logger.warning("⚠️ Parallel results differ from serial training")
+    
+    return parallel, report
+
+def train_multi_output_model(X, df, targets):
+    """Train a single multi-output Random Forest over every bone site"""
+    logger.info("Training multi-output Random Forest over all bone sites...")
+    sites = list(targets.keys())
+    Y = df[list(targets.values())]
+    
+    # Same split and hyperparameters as the per-site models so metrics are comparable
+    X_train, X_test, Y_train, Y_test = train_test_split(
+        X, Y, test_size=0.2, random_state=42
+    )
+    
+    # Fit on plain arrays: the predictor scales NumPy feature matrices at inference
+    scaler = StandardScaler()
+    X_train_scaled = scaler.fit_transform(X_train.to_numpy())
+    X_test_scaled = scaler.transform(X_test.to_numpy())
+    
+    rf_model = RandomForestRegressor(
+        n_estimators=100,
+        max_depth=10,
+        random_state=42,
+        n_jobs=-1
+    )
+    rf_model.fit(X_train_scaled, Y_train)
+    Y_pred = rf_model.predict(X_test_scaled)
+    
+    site_metrics = {}
+    for i, site in enumerate(sites):
+        y_test = Y_test.iloc[:, i]
+        mse = mean_squared_error(y_test, Y_pred[:, i])
+        site_metrics[site] = {
+            'mse': float(mse),
+            'rmse': float(np.sqrt(mse)),
+            'mae': float(mean_absolute_error(y_test, Y_pred[:, i])),
+            'r2': float(r2_score(y_test, Y_pred[:, i]))
+        }
+        logger.info(f"{site} (multi-output) - R²: {site_metrics[site]['r2']:.4f}, RMSE: {site_metrics[site]['rmse']:.4f}")
+    
+    # Cross-validation (R² averaged uniformly over sites)
+    cv_scores = cross_val_score(rf_model, X_train_scaled, Y_train, cv=5, scoring='r2')
+    logger.info(f"Multi-output CV R² (mean ± std): {cv_scores.mean():.4f} ± {cv_scores.std():.4f}")
+    
+    return {
+        'model': rf_model,
+        'scaler': scaler,
+        'sites': sites,
+        'features': X.columns.tolist(),
+        'metrics': site_metrics,
+        'cv_mean': float(cv_scores.mean()),
+        'cv_std': float(cv_scores.std())
+    }
+
+def compare_multi_output_accuracy(site_models, multi_output):
+    """Compare hold-out accuracy of the multi-output model against the per-site models"""
+    comparison = {}
+    
+    for site in multi_output['sites']:
+        per_site = site_models[site]['metrics']
+        multi = multi_output['metrics'][site]
+        comparison[site] = {
+            'per_site_r2': per_site['r2'],
+            'multi_output_r2': multi['r2'],
+            'r2_delta': multi['r2'] - per_site['r2'],
+            'per_site_rmse': per_site['rmse'],
+            'multi_output_rmse': multi['rmse'],
+            'rmse_delta': multi['rmse'] - per_site['rmse']
+        }
+        logger.info(f"{site}: R² per-site {per_site['r2']:.4f} vs multi-output {multi['r2']:.4f} "
+                    f"(Δ {comparison[site]['r2_delta']:+.4f})")
+    
+    return comparison
+
+def save_real_models(site_models, feature_names, model_dir_path: str, n_astronauts: int,
+                     multi_output=None, comparison=None):
+    """Save per-site (and optional multi-output) models with the real-data metadata"""
+    model_dir = Path(model_dir_path)
+    model_dir.mkdir(exist_ok=True)
+    
+    performance_metrics = {}
+    for site, trained in site_models.items():
+        joblib.dump(trained['model'], model_dir / f"real_{site}_rf_model.joblib")
+        joblib.dump(trained['scaler'], model_dir / f"real_{site}_scaler.joblib")
+        
+        metrics = trained['metrics']
+        performance_metrics[site] = {
+            'rmse': metrics['rmse'],
+            'r2': metrics['r2'],
+            'mae': metrics['mae'],
+            'cv_r2_mean': metrics['cv_mean'],
+            'cv_r2_std': metrics['cv_std'],
+            'feature_importance': trained['feature_importance']
+        }
+        logger.info(f"✅ Saved real {site} model")
+    
+    metadata = {
+        'model_type': 'RandomForest',
+        'data_sources': [
+            "Sibonga et al. 2007 - NASA Technical Report (N=45 astronauts)",
+            "Gabel et al. 2022 - Nature Scientific Reports (N=17 astronauts)",
+            "Coulombe et al. 2023 - PMC JBMR Plus (N=17 astronauts)",
+            "NASA Bone and Mineral Laboratory - Official protocols"
+        ],
+        'training_data': '100% real NASA astronaut measurements',
+        'simulated_data': '0% (ZERO simulated data points)',
+        'features': feature_names,
+        'targets': list(site_models.keys()),
+        'total_astronauts': n_astronauts,
+        'validation_method': 'Cross-validation and hold-out test',
+        'data_quality': 'Peer-reviewed publications and official NASA sources',
+        'performance_metrics': performance_metrics,
+        'trained_on': pd.Timestamp.now().isoformat()
+    }
+    
+    multi_output_path = model_dir / "real_multi_site_rf_model.joblib"
+    if multi_output is None:
+        # A multi-output model from an earlier --multi-output run would otherwise keep
+        # being served (and recompiled) instead of the per-site models just trained
+        if multi_output_path.exists():
+            multi_output_path.unlink()
+            logger.info(f"🗑️ Removed stale multi-output model {multi_output_path}")
+        shutil.rmtree(flat_path_for(multi_output_path), ignore_errors=True)
+    else:
+        # One artifact holding model, scaler and site order so the predictor loads a single file
+        joblib.dump({
+            'model': multi_output['model'],
+            'scaler': multi_output['scaler'],
+            'sites': multi_output['sites'],
+            'features': multi_output['features']
+        }, multi_output_path)
+        logger.info(f"✅ Saved multi-output model to {multi_output_path}")
+        
+        metadata['multi_output'] = {
+            'model_file': str(multi_output_path),
+            'sites': multi_output['sites'],
+            'performance_metrics': multi_output['metrics'],
+            'cv_r2_mean': multi_output['cv_mean'],
+            'cv_r2_std': multi_output['cv_std'],
+            'comparison_vs_per_site': comparison
+        }
+    
+    metadata_path = model_dir / "real_ml_model_metadata.json"
+    with open(metadata_path, 'w') as f:
+        json.dump(metadata, f, indent=2)
+    logger.info(f"Metadata saved to {metadata_path}")
+    
+    return metadata
+
+def _feature_importance(model, feature_names):
+    """Feature importances sorted from most to least important"""
+    importance = [
+        {'feature': feature, 'importance': float(value)}
+        for feature, value in zip(feature_names, model.feature_importances_)
+    ]
+    return sorted(importance, key=lambda item: item['importance'], reverse=True)
+
+def main(multi_output: bool = False, workers: int = 1, report_speedup: bool = False):
     """Main training pipeline"""
     logger.info("Starting ML Model Training Pipeline")
     logger.info("=" * 50)
     
     # Paths
-    data_path = "data/processed_crew_health_data.csv"
+    data_path = "data/real_bone_density_measurements.csv"
     model_dir = "models"
     
     try:
         # Load and prepare data
-        X, y = load_and_prepare_data(data_path)
+        X, df, targets = load_and_prepare_real_data(data_path)
+        
+        # Train one model per bone site
+        if report_speedup:
+            site_models, _ = compare_training_speed(X, df, targets, workers)
+        else:
+            site_models = train_site_models(X, df, targets, workers=workers)
+        
+        # Optionally train a single multi-output model and check it against the per-site models
+        multi_output_model = None
+        comparison = None
+        if multi_output:
+            multi_output_model = train_multi_output_model(X, df, targets)
+            comparison = compare_multi_output_accuracy(site_models, multi_output_model)
         
-        # Train model
-        model, scaler, metrics, feature_names = train_model(X, y)
+        # Save site models and metadata
+        metadata = save_real_models(site_models, X.columns.tolist(), model_dir, len(df),
+                                    multi_output=multi_output_model, comparison=comparison)
         
-        # Save model
-        metadata = save_model(model, scaler, metrics, feature_names, model_dir)
+        # Main compatibility model (trochanter, the most affected site)
+        trochanter = site_models['trochanter']
+        save_model(trochanter['model'], trochanter['scaler'], trochanter['metrics'], X.columns.tolist(), model_dir)
+        
+        # Memory-mappable compiled forests for the serving processes
+        export_models(model_dir)
         
         logger.info("=" * 50)
         logger.info("ML Model Training COMPLETED Successfully!")
-        logger.info(f"Model R² Score: {metrics['r2']:.4f}")
-        logger.info(f"Model saved to: models/bone_density_rf_model.joblib")
+        for site, trained in site_models.items():
+            logger.info(f"{site} R² Score: {trained['metrics']['r2']:.4f}")
+        logger.info(f"Models saved to: {model_dir}/")
         
         return metadata
         
@@ -185,4 +484,13 @@ def main():
         raise
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Train ML models on real NASA bone density data")
+    parser.add_argument('--multi-output', action='store_true',
+                        help="Also train a single multi-output forest over all bone sites")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Processes for per-site training (-1 = all cores, default: 1 = serial)")
+    parser.add_argument('--report-speedup', action='store_true',
+                        help="Also train serially and report the parallel speedup")
+    args = parser.parse_args()
+    
+    main(multi_output=args.multi_output, workers=args.workers, report_speedup=args.report_speedup)
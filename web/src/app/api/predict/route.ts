@@ -1,8 +1,31 @@
 import { NextRequest, NextResponse } from 'next/server';
-import { exec } from 'child_process';
-import { promisify } from 'util';
+import fs from 'fs';
+import path from 'path';
+import { PredictionGrid } from '@/lib/predictionGrid';
 
-const execAsync = promisify(exec);
+// Resident Python prediction server (see prediction_server.py in the repo root)
+const PREDICTION_SERVER_URL = process.env.PREDICTION_SERVER_URL || 'http://127.0.0.1:8765';
+const PREDICTION_TIMEOUT_MS = parseInt(process.env.PREDICTION_TIMEOUT_MS || '2000');
+
+// Precomputed lookup grid (see build_prediction_grid.py in the repo root)
+const PREDICTION_GRID_DIR = process.env.PREDICTION_GRID_DIR || path.join(process.cwd(), 'public', 'data', 'prediction_grid');
+
+let predictionGridPromise: Promise<PredictionGrid | null> | null = null;
+
+function getPredictionGrid(): Promise<PredictionGrid | null> {
+  if (!predictionGridPromise) {
+    predictionGridPromise = fs.promises.readFile(path.join(PREDICTION_GRID_DIR, 'manifest.json'), 'utf8')
+      .then(manifest => new PredictionGrid(JSON.parse(manifest), async (fileName: string) => {
+        const shard = await fs.promises.readFile(path.join(PREDICTION_GRID_DIR, fileName));
+        return shard.buffer.slice(shard.byteOffset, shard.byteOffset + shard.byteLength) as ArrayBuffer;
+      }))
+      .catch(error => {
+        console.warn('Prediction grid unavailable, using the prediction server:', error.message);
+        return null;
+      });
+  }
+  return predictionGridPromise;
+}
 
 export async function POST(request: NextRequest) {
   try {
@@ -16,29 +39,55 @@ export async function POST(request: NextRequest) {
       );
     }
     
+    // Answer from the precomputed grid when the profile lies inside it
     try {
-      // Call the real NASA ML predictor using Python
-      const pythonScript = `
-import sys
-sys.path.append('.')
-from ml_predictor import predict_bone_loss
-import json
-
-try:
-    result = predict_bone_loss(
-        age=${parseInt(age)},
-        mission_duration_days=${parseInt(missionDuration)},
-        gender='${gender}',
-        height_cm=${parseFloat(height) || 175.0},
-        weight_kg=${parseFloat(weight) || 77.0}
-    )
-    print(json.dumps(result))
-except Exception as e:
-    print(json.dumps({"error": str(e)}))
-`;
-
-      const { stdout } = await execAsync(`cd "../.." && python -c "${pythonScript.replace(/"/g, '\\"')}"`);
-      const prediction = JSON.parse(stdout.trim());
+      const grid = await getPredictionGrid();
+      const gridPrediction = grid && await grid.lookup(
+        parseInt(age),
+        parseInt(missionDuration),
+        gender,
+        parseFloat(height) || 175.0,
+        parseFloat(weight) || 77.0
+      );
+      
+      if (grid && gridPrediction) {
+        return NextResponse.json({
+          success: true,
+          prediction: buildGridPrediction(
+            grid,
+            gridPrediction.sitePredictions,
+            parseInt(age),
+            parseInt(missionDuration),
+            gender,
+            parseFloat(height) || 175.0,
+            parseFloat(weight) || 77.0
+          ),
+          timestamp: new Date().toISOString(),
+          model_type: gridPrediction.exact
+            ? "Real NASA ML (Random Forest, precomputed grid)"
+            : "Real NASA ML (Random Forest, precomputed grid, interpolated height/weight)",
+          data_authenticity: "100% real peer-reviewed NASA data"
+        });
+      }
+    } catch (gridError) {
+      console.warn('Prediction grid lookup failed, using the prediction server:', gridError);
+    }
+    
+    try {
+      // Call the resident real NASA ML prediction server
+      const response = await fetch(`${PREDICTION_SERVER_URL}/predict`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({
+          age: parseInt(age),
+          mission_duration_days: parseInt(missionDuration),
+          gender,
+          height_cm: parseFloat(height) || 175.0,
+          weight_kg: parseFloat(weight) || 77.0
+        }),
+        signal: AbortSignal.timeout(PREDICTION_TIMEOUT_MS)
+      });
+      const prediction = await response.json();
       
       if (prediction.error) {
         throw new Error(prediction.error);
@@ -83,6 +132,55 @@ except Exception as e:
   }
 }
 
+function buildGridPrediction(
+  grid: PredictionGrid,
+  sitePredictions: Record<string, number>,
+  age: number,
+  missionDuration: number,
+  gender: string,
+  height: number,
+  weight: number
+) {
+  // Same response shape as RealNASAMLPredictor.predict_bone_loss
+  const bmi = weight / (height / 100) ** 2;
+  const predictions: Record<string, {
+    bone_loss_percent: number;
+    severity: string;
+    site_description: string;
+  }> = {};
+  
+  Object.entries(sitePredictions).forEach(([site, boneLoss]) => {
+    predictions[site] = {
+      bone_loss_percent: boneLoss,
+      severity: classifySeverity(boneLoss),
+      site_description: getSiteDescription(site)
+    };
+  });
+  
+  const losses = Object.values(sitePredictions);
+  const avgLoss = Math.round(losses.reduce((sum, loss) => sum + loss, 0) / losses.length * 100) / 100;
+  
+  return {
+    input_parameters: {
+      age,
+      mission_duration_days: missionDuration,
+      gender,
+      height_cm: height,
+      weight_kg: weight,
+      bmi: Math.round(bmi * 10) / 10
+    },
+    predictions,
+    data_sources: grid.manifest.data_sources,
+    model_quality: "100% real NASA data, 0% simulated",
+    prediction_confidence: "High (trained on peer-reviewed data)",
+    overall_assessment: {
+      average_bone_loss_percent: avgLoss,
+      risk_level: assessRisk(avgLoss),
+      recommendations: getRecommendations(avgLoss, missionDuration)
+    }
+  };
+}
+
 function generateResearchBasedPrediction(
   age: number, 
   missionDuration: number, 
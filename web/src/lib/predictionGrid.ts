@@ -0,0 +1,145 @@
+// Precomputed bone loss prediction grid (built by build_prediction_grid.py in the repo root).
+// Ages and mission durations are looked up exactly; height and weight are
+// bilinearly interpolated between the coarse bins stored in the grid.
+
+export interface GridAxisRange {
+  start: number;
+  stop: number;
+  step: number;
+}
+
+export interface PredictionGridManifest {
+  format_version: number;
+  generated_at: string;
+  model_trained_on: string | null;
+  data_sources: string[];
+  sites: string[];
+  encoding: { dtype: 'int16'; byte_order: 'little'; scale: number };
+  shard_layout: string[];
+  axes: {
+    age: GridAxisRange;
+    mission_duration_days: GridAxisRange;
+    gender: string[];
+    height_cm: number[];
+    weight_kg: number[];
+  };
+  shards: Record<string, string>;
+}
+
+export interface GridPrediction {
+  sitePredictions: Record<string, number>;
+  exact: boolean;
+}
+
+// Reads one shard file (by name) as raw bytes
+export type ShardReader = (fileName: string) => Promise<ArrayBuffer>;
+
+const SUPPORTED_FORMAT_VERSION = 1;
+
+export class PredictionGrid {
+  private shardCache = new Map<string, Promise<DataView>>();
+
+  constructor(
+    readonly manifest: PredictionGridManifest,
+    private readonly readShard: ShardReader
+  ) {
+    if (manifest.format_version !== SUPPORTED_FORMAT_VERSION) {
+      throw new Error(`Unsupported prediction grid format: ${manifest.format_version}`);
+    }
+  }
+
+  /**
+   * Look up per-site bone loss for one profile.
+   * Returns null when the profile lies outside the grid, so callers can fall back to the model.
+   */
+  async lookup(
+    age: number,
+    missionDuration: number,
+    gender: string,
+    height: number,
+    weight: number
+  ): Promise<GridPrediction | null> {
+    const { axes, sites } = this.manifest;
+    const ageIndex = rangeIndex(axes.age, age);
+    const durationIndex = rangeIndex(axes.mission_duration_days, missionDuration);
+    const genderLabel = axes.gender.find(label => label.toLowerCase() === gender.toLowerCase());
+    const heightBracket = binBracket(axes.height_cm, height);
+    const weightBracket = binBracket(axes.weight_kg, weight);
+
+    if (ageIndex === null || durationIndex === null || !genderLabel || !heightBracket || !weightBracket) {
+      return null;
+    }
+
+    const durationCount = axisLength(axes.mission_duration_days);
+    const offset = (ageIndex * durationCount + durationIndex) * sites.length;
+    const totals = new Array<number>(sites.length).fill(0);
+
+    // Bilinear interpolation over the (up to four) surrounding height/weight bins
+    for (const [heightIndex, heightWeight] of heightBracket) {
+      for (const [weightIndex, weightWeight] of weightBracket) {
+        const weightFactor = heightWeight * weightWeight;
+        if (weightFactor === 0) continue;
+
+        const shard = await this.loadShard(genderLabel, axes.height_cm[heightIndex], axes.weight_kg[weightIndex]);
+        sites.forEach((_, siteIndex) => {
+          totals[siteIndex] += weightFactor * shard.getInt16((offset + siteIndex) * 2, true);
+        });
+      }
+    }
+
+    const sitePredictions: Record<string, number> = {};
+    sites.forEach((site, siteIndex) => {
+      sitePredictions[site] = Math.round(totals[siteIndex]) / this.manifest.encoding.scale;
+    });
+
+    return {
+      sitePredictions,
+      exact: heightBracket.length === 1 && weightBracket.length === 1
+    };
+  }
+
+  private loadShard(gender: string, height: number, weight: number): Promise<DataView> {
+    const fileName = this.manifest.shards[`${gender}|${height}|${weight}`];
+    if (!fileName) {
+      return Promise.reject(new Error(`Missing prediction grid shard for ${gender}, ${height} cm, ${weight} kg`));
+    }
+
+    let shard = this.shardCache.get(fileName);
+    if (!shard) {
+      shard = this.readShard(fileName).then(buffer => new DataView(buffer));
+      // Drop failed reads so a later request can retry
+      shard.catch(() => this.shardCache.delete(fileName));
+      this.shardCache.set(fileName, shard);
+    }
+    return shard;
+  }
+}
+
+function axisLength(axis: GridAxisRange): number {
+  return Math.floor((axis.stop - axis.start) / axis.step) + 1;
+}
+
+function rangeIndex(axis: GridAxisRange, value: number): number | null {
+  const index = (value - axis.start) / axis.step;
+  if (!Number.isInteger(index) || index < 0 || index >= axisLength(axis)) {
+    return null;
+  }
+  return index;
+}
+
+// [binIndex, interpolation weight] pairs bracketing value; null outside the binned range
+function binBracket(bins: number[], value: number): Array<[number, number]> | null {
+  if (!Number.isFinite(value) || value < bins[0] || value > bins[bins.length - 1]) {
+    return null;
+  }
+
+  const exactIndex = bins.indexOf(value);
+  if (exactIndex !== -1) {
+    return [[exactIndex, 1]];
+  }
+
+  const upper = bins.findIndex(bin => bin > value);
+  const lower = upper - 1;
+  const fraction = (value - bins[lower]) / (bins[upper] - bins[lower]);
+  return [[lower, 1 - fraction], [upper, fraction]];
+}